@@ -0,0 +1,32 @@
+"""Operations shared by migrations
+
+Revisions import these instead of each other, and the alembic directory is
+on sys.path through prepend_sys_path in alembic.ini. Every revision that
+imports a helper runs it again on upgrade, so a change must keep the old
+behaviour.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+def drop_invalid_index(name: str) -> None:
+    """
+    Drop an index left INVALID by an interrupted CREATE INDEX CONCURRENTLY
+
+    IF NOT EXISTS would otherwise keep the broken index. PostgreSQL only;
+    does nothing in offline mode, where the catalog cannot be read.
+
+    Args:
+        name (str): Name of the index
+    """
+    if context.is_offline_mode():
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
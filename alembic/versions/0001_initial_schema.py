@@ -0,0 +1,92 @@
+"""Initial schema: users, vacancies and responses
+
+Databases created earlier with ``Base.metadata.create_all`` already have
+these tables; existing tables are left untouched so this revision can be
+applied to them directly instead of being stamped by hand.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-02 12:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    if context.is_offline_mode():
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("phone", sa.String()),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("surname", sa.String()),
+            sa.Column("patronymic", sa.String()),
+            sa.Column("cv_text", sa.Text()),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("created", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated", sa.DateTime(timezone=True)),
+            sa.Column("status", sa.Enum("CREATED", "BANNED", name="userstatus"), nullable=False),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_phone", "users", ["phone"], unique=True)
+
+    if not _has_table("vacancies"):
+        op.create_table(
+            "vacancies",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("salary", sa.Float()),
+            sa.Column("short_description", sa.String(), nullable=False),
+            sa.Column("full_description", sa.Text()),
+            sa.Column("created", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated", sa.DateTime(timezone=True)),
+            sa.Column(
+                "status",
+                sa.Enum("CREATED", "OPENED", "CLOSED", "DELETED", name="vacancystatus"),
+                nullable=False,
+            ),
+        )
+        op.create_index("ix_vacancies_id", "vacancies", ["id"])
+        op.create_index("ix_vacancies_name", "vacancies", ["name"])
+
+    if not _has_table("responses"):
+        op.create_table(
+            "responses",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("vacancy_id", sa.Integer(), sa.ForeignKey("vacancies.id"), nullable=False),
+            sa.Column("created", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated", sa.DateTime(timezone=True)),
+            sa.Column(
+                "status",
+                sa.Enum("CREATED", "VIEWED", "APPROVED", "REJECTED", name="responsestatus"),
+                nullable=False,
+            ),
+        )
+        op.create_index("ix_responses_id", "responses", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("responses")
+    op.drop_table("vacancies")
+    op.drop_table("users")
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for enum_name in ("responsestatus", "vacancystatus", "userstatus"):
+            sa.Enum(name=enum_name).drop(bind, checkfirst=True)
@@ -0,0 +1,118 @@
+"""Composite indexes for hot filters and unique (user_id, vacancy_id) on responses
+
+On PostgreSQL every index is built with CREATE INDEX CONCURRENTLY outside of
+a transaction, so reads and writes keep flowing while it runs. A build that
+was interrupted leaves an INVALID index behind; it is dropped and rebuilt
+when the migration is re-run. The unique constraint is attached to an
+already built unique index, which only needs a short lock on the table.
+
+Existing duplicate responses are removed first, keeping the earliest one
+for each user/vacancy pair. If the application inserts a new duplicate
+while the unique index is being built, the build fails and the migration
+can simply be re-run.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-05-02 12:30:00
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from migration_helpers import drop_invalid_index
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Give up instead of queueing behind long transactions, which would block
+# every other query on the table while we wait for the lock
+LOCK_TIMEOUT = "5s"
+
+UNIQUE_NAME = "uq_responses_user_vacancy"
+
+# (name, table, columns, covering columns)
+INDEXES = (
+    ("ix_responses_vacancy_status_created", "responses", ["vacancy_id", "status", "created"], ["user_id"]),
+    ("ix_responses_user_status", "responses", ["user_id", "status"], ["vacancy_id", "created"]),
+    ("ix_vacancies_status_salary", "vacancies", ["status", "salary"], None),
+)
+
+
+def _create_index_online(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    include: Optional[Sequence[str]] = None,
+    unique: bool = False,
+) -> None:
+    drop_invalid_index(name)
+    op.create_index(
+        name,
+        table,
+        columns,
+        unique=unique,
+        if_not_exists=True,
+        postgresql_concurrently=True,
+        postgresql_include=include or [],
+    )
+
+
+def _has_constraint(table: str, name: str) -> bool:
+    if context.is_offline_mode():
+        return False
+    constraints = sa.inspect(op.get_bind()).get_unique_constraints(table)
+    return any(constraint["name"] == name for constraint in constraints)
+
+
+def _upgrade_postgresql() -> None:
+    op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute(
+        "DELETE FROM responses r USING responses d "
+        "WHERE r.user_id = d.user_id AND r.vacancy_id = d.vacancy_id AND r.id > d.id"
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            _create_index_online(name, table, columns, include)
+
+        if not _has_constraint("responses", UNIQUE_NAME):
+            _create_index_online(UNIQUE_NAME, "responses", ["user_id", "vacancy_id"], unique=True)
+            op.execute(
+                f"ALTER TABLE responses ADD CONSTRAINT {UNIQUE_NAME} UNIQUE USING INDEX {UNIQUE_NAME}"
+            )
+        op.execute("RESET lock_timeout")
+
+
+def _upgrade_generic() -> None:
+    op.execute(
+        "DELETE FROM responses WHERE id NOT IN "
+        "(SELECT MIN(id) FROM responses GROUP BY user_id, vacancy_id)"
+    )
+    for name, table, columns, _ in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    # SQLite cannot add constraints to an existing table; a unique index
+    # enforces the same rule and is what ON CONFLICT targets
+    op.create_index(UNIQUE_NAME, "responses", ["user_id", "vacancy_id"], unique=True, if_not_exists=True)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        _upgrade_postgresql()
+    else:
+        _upgrade_generic()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(f"ALTER TABLE responses DROP CONSTRAINT IF EXISTS {UNIQUE_NAME}")
+        with op.get_context().autocommit_block():
+            for name, _, _, _ in INDEXES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    else:
+        op.drop_index(UNIQUE_NAME, table_name="responses", if_exists=True)
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
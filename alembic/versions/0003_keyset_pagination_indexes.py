@@ -0,0 +1,52 @@
+"""Indexes for keyset pagination ordered on (created, id)
+
+Built online on PostgreSQL, see revision 0002 for details.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-05-09 10:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_helpers import drop_invalid_index
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOCK_TIMEOUT = "5s"
+
+# (name, table, columns)
+INDEXES = (
+    ("ix_vacancies_created_id", "vacancies", ["created", "id"]),
+    ("ix_users_created_id", "users", ["created", "id"]),
+    ("ix_responses_vacancy_created_id", "responses", ["vacancy_id", "created", "id"]),
+    ("ix_responses_user_created_id", "responses", ["user_id", "created", "id"]),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+            for name, table, columns in INDEXES:
+                drop_invalid_index(name)
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+            op.execute("RESET lock_timeout")
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, _, _ in INDEXES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    else:
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
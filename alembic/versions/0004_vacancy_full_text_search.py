@@ -0,0 +1,93 @@
+"""Full-text search for vacancies
+
+PostgreSQL: a GIN expression index over a weighted tsvector of name,
+short_description and full_description, stemmed with both the Russian and
+English configurations. The expression must stay identical to
+app.db.search.VACANCY_SEARCH_DOCUMENT. Built online, see revision 0002.
+
+SQLite: an external-content FTS5 table kept in sync by triggers and filled
+from the existing rows.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-05-16 10:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_helpers import drop_invalid_index
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOCK_TIMEOUT = "5s"
+
+INDEX_NAME = "ix_vacancies_search"
+
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(full_description, '')), 'C') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(full_description, '')), 'C')"
+)
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_fts USING fts5("
+    "name, short_description, full_description, content='vacancies', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS vacancies_fts_ai AFTER INSERT ON vacancies BEGIN "
+    "INSERT INTO vacancies_fts(rowid, name, short_description, full_description) "
+    "VALUES (new.id, new.name, new.short_description, new.full_description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS vacancies_fts_ad AFTER DELETE ON vacancies BEGIN "
+    "INSERT INTO vacancies_fts(vacancies_fts, rowid, name, short_description, full_description) "
+    "VALUES ('delete', old.id, old.name, old.short_description, old.full_description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS vacancies_fts_au "
+    "AFTER UPDATE OF name, short_description, full_description ON vacancies BEGIN "
+    "INSERT INTO vacancies_fts(vacancies_fts, rowid, name, short_description, full_description) "
+    "VALUES ('delete', old.id, old.name, old.short_description, old.full_description); "
+    "INSERT INTO vacancies_fts(rowid, name, short_description, full_description) "
+    "VALUES (new.id, new.name, new.short_description, new.full_description); "
+    "END",
+    "INSERT INTO vacancies_fts(vacancies_fts) VALUES ('rebuild')",
+)
+
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS vacancies_fts_au",
+    "DROP TRIGGER IF EXISTS vacancies_fts_ad",
+    "DROP TRIGGER IF EXISTS vacancies_fts_ai",
+    "DROP TABLE IF EXISTS vacancies_fts",
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+            drop_invalid_index(INDEX_NAME)
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON vacancies "
+                f"USING gin (({SEARCH_DOCUMENT}))"
+            )
+            op.execute("RESET lock_timeout")
+    elif dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+    elif dialect == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
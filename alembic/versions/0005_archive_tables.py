@@ -0,0 +1,63 @@
+"""Archive tables for closed and deleted vacancies and their responses
+
+New, empty tables: nothing is locked on the hot tables. The enum types
+already exist on PostgreSQL and are reused.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-05-23 10:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VACANCY_STATUS = postgresql.ENUM(
+    "CREATED", "OPENED", "CLOSED", "DELETED", name="vacancystatus", create_type=False
+)
+RESPONSE_STATUS = postgresql.ENUM(
+    "CREATED", "VIEWED", "APPROVED", "REJECTED", name="responsestatus", create_type=False
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vacancies_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("salary", sa.Float()),
+        sa.Column("short_description", sa.String(), nullable=False),
+        sa.Column("full_description", sa.Text()),
+        sa.Column("created", sa.DateTime(timezone=True)),
+        sa.Column("updated", sa.DateTime(timezone=True)),
+        sa.Column("status", VACANCY_STATUS, nullable=False),
+        sa.Column("archived", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_vacancies_archive_archived", "vacancies_archive", ["archived"])
+
+    op.create_table(
+        "responses_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("vacancy_id", sa.Integer(), nullable=False),
+        sa.Column("created", sa.DateTime(timezone=True)),
+        sa.Column("updated", sa.DateTime(timezone=True)),
+        sa.Column("status", RESPONSE_STATUS, nullable=False),
+        sa.Column("archived", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "ix_responses_archive_vacancy_created_id", "responses_archive", ["vacancy_id", "created", "id"]
+    )
+    op.create_index("ix_responses_archive_user_id", "responses_archive", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("responses_archive")
+    op.drop_table("vacancies_archive")
@@ -0,0 +1,29 @@
+"""Row version counters on vacancies and responses
+
+Used for HTTP ETags. Adding a NOT NULL column with a constant default is a
+catalog-only change on PostgreSQL 11+ (no table rewrite) and on SQLite.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-05-30 10:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("vacancies", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    op.add_column("responses", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("responses", "version")
+    op.drop_column("vacancies", "version")
@@ -1,54 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Form
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import timedelta
 import logging
+import math
 
 from app.schemas.requests import (
     UserCreate,
     UserUpdate,
     UserResponse,
     Token,
+    RefreshTokenRequest,
 )
-from app.db.session import get_db
-from app.services.factory import ServiceFactory
-from app.services.user import UserService
+from app.db.session import autocommit_async_db
+from app.services.factory import container
+from app.services.refresh_token import AsyncRefreshTokenService
+from app.services.user import AsyncUserService
 from app.core.auth import (
     authenticate_user,
     create_access_token,
     get_current_user,
+    get_token_claims,
+    login_throttle,
+    revocation_list,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
-from app.db.models import User
+from app.core.cache import CacheFullError
+from app.core.passwords import PasswordHasherBusy
+from app.core.tokens import TokenClaims
+from app.db.models import User, UserStatus
 
 router = APIRouter(tags=["auth"])
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 @router.post("/register", response_model=UserResponse)
-def register_user(
+async def register_user(
     user: UserCreate,
-    db: Session = Depends(get_db),
-    user_service: UserService = Depends(ServiceFactory.create_user_service)
+    user_service: AsyncUserService = Depends(container.provider("async_user_service"))
 ):
-    logger.info(f"Registration attempt for email: {user.email}")
-    db_user = user_service.get_user_by_email(user.email)
+    logger.debug("Registration attempt for email: %s", user.email)
+    db_user = await user_service.get_user_by_email(user.email)
     if db_user:
-        logger.warning(f"Registration failed: Email {user.email} already registered.")
+        logger.warning("Registration failed: Email %s already registered.", user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
     try:
-        created_user = user_service.create_user(user)
-        logger.info(f"User registered successfully with ID: {created_user.id} and email: {created_user.email}")
+        created_user = await user_service.create_user(user)
+        logger.info("User registered successfully with ID: %s and email: %s", created_user.id, created_user.email)
         return created_user
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
-        logger.error(f"Error during user registration for email {user.email}: {e}", exc_info=True)
+        logger.error("Error during user registration for email %s: %s", user.email, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Registration failed due to an internal error.",
@@ -56,24 +63,98 @@ def register_user(
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    user_service: AsyncUserService = Depends(container.provider("async_user_service")),
+    refresh_tokens: AsyncRefreshTokenService = Depends(container.provider("async_refresh_token_service")),
 ):
-    logger.info(f"Login attempt for username: {form_data.username}")
-    user = authenticate_user(db, form_data.username, form_data.password)
+    logger.debug("Login attempt for username: %s", form_data.username)
+    client_ip = request.client.host if request.client else "unknown"
+    if login_throttle is not None:
+        retry_after = await login_throttle.check(form_data.username, client_ip)
+        if retry_after is not None:
+            logger.warning("Login throttled for username: %s from %s.", form_data.username, client_ip)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+    
+    user = await authenticate_user(user_service, form_data.username, form_data.password)
     if not user:
-        logger.warning(f"Login failed for username: {form_data.username}. Incorrect email or password.")
+        logger.warning("Login failed for username: %s. Incorrect email or password.", form_data.username)
+        if login_throttle is not None:
+            await login_throttle.record_failure(form_data.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    logger.info(f"User {form_data.username} authenticated successfully.")
+    logger.info("User %s authenticated successfully.", form_data.username)
+    if login_throttle is not None:
+        await login_throttle.record_success(form_data.username, client_ip)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
     )
-    logger.info(f"Access token generated for user: {form_data.username}")
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await refresh_tokens.issue(user.id)
+    logger.debug("Access token generated for user: %s", form_data.username)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+# Autocommit: revoking a session on token reuse must persist despite the 401
+@router.post("/refresh", response_model=Token, dependencies=[Depends(autocommit_async_db)])
+async def refresh_access_token(
+    body: RefreshTokenRequest,
+    refresh_tokens: AsyncRefreshTokenService = Depends(container.provider("async_refresh_token_service")),
+    user_service: AsyncUserService = Depends(container.provider("async_user_service")),
+):
+    """Exchange a refresh token for a new access token and refresh token, without a password check"""
+    rotated = await refresh_tokens.rotate(body.refresh_token)
+    if rotated is None:
+        logger.warning("Refresh failed: invalid, expired or reused refresh token.")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal = await user_service.get_principal(rotated.user_id)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if principal.status == UserStatus.BANNED:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is banned")
+    access_token = create_access_token(
+        data={"sub": str(rotated.user_id)}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    logger.info("Access token refreshed for user ID: %s", rotated.user_id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": rotated.token}
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    body: Optional[RefreshTokenRequest] = None,
+    claims: TokenClaims = Depends(get_token_claims),
+    refresh_tokens: AsyncRefreshTokenService = Depends(container.provider("async_refresh_token_service")),
+):
+    """Revoke the access token used for this request, and end the session of the given refresh token"""
+    if body is not None and claims.subject.isdigit():
+        await refresh_tokens.revoke(body.refresh_token, int(claims.subject))
+    try:
+        if claims.jti is not None:
+            await revocation_list.arevoke_token(claims.jti, claims.expires_at)
+        else:
+            # Tokens issued before token IDs existed can only be revoked per user
+            await revocation_list.arevoke_subject(claims.subject)
+    except CacheFullError:
+        logger.error("Revocation list is full; logout of user %s refused", claims.subject)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Logout is temporarily unavailable, try again later",
+        )
+    logger.info("User %s logged out.", claims.subject)
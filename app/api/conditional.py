@@ -0,0 +1,158 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+# Cache-Control policies. Vacancies are public: shared caches may store them
+# but must revalidate, which costs a 304 while nothing changed. Responses
+# belong to one user and must never be stored by shared caches.
+VACANCY_CACHE_CONTROL = "public, no-cache"
+ARCHIVED_VACANCY_CACHE_CONTROL = "public, max-age=3600"
+RESPONSE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values that determine a representation
+
+    The API version is always mixed in, so a deploy that changes a schema
+    does not revalidate old representations.
+
+    Args:
+        *parts (Any): Values identifying the representation, e.g. ID and row version
+
+    Returns:
+        str: Quoted entity tag
+    """
+    key = "|".join(str(part) for part in (settings.PROJECT_VERSION, *parts))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def collection_etag(request: Request, kind: str, items: Iterable[Any], *parts: Any) -> str:
+    """
+    Build a strong ETag for a page of versioned rows
+
+    Args:
+        request (Request): Request whose query string selects the page
+        kind (str): Resource name
+        items (Iterable[Any]): Rows with id and version attributes
+        *parts (Any): Further values the page depends on, e.g. the next cursor
+
+    Returns:
+        str: Quoted entity tag
+    """
+    query = sorted(request.query_params.multi_items())
+    return make_etag(kind, query, [(item.id, item.version) for item in items], *parts)
+
+
+def last_modified(items: Iterable[Any]) -> Optional[datetime]:
+    """
+    Get the latest modification time of rows with created and updated columns
+
+    Args:
+        items (Iterable[Any]): Rows
+
+    Returns:
+        Optional[datetime]: Latest change or None if unknown
+    """
+    changes = [item.updated or item.created for item in items if item.updated or item.created]
+    return max(changes, key=_as_utc) if changes else None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive timestamps, which are UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def _not_modified_since(header: str, modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have one-second resolution
+    return _as_utc(modified).replace(microsecond=0) <= since
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    modified: Optional[datetime] = None,
+    use_modified_since: bool = True,
+) -> bool:
+    """
+    Evaluate If-None-Match and If-Modified-Since against the current validators
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    it is absent (RFC 9110, section 13.2.2).
+
+    Args:
+        request (Request): Incoming request
+        etag (str): Current entity tag
+        modified (Optional[datetime]): Current modification time
+        use_modified_since (bool): Whether If-Modified-Since is reliable for
+            the resource; it is not for collections, where removing an item
+            does not advance the modification time
+
+    Returns:
+        bool: True if the client's copy is current and 304 may be returned
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and modified is not None and use_modified_since:
+        return _not_modified_since(if_modified_since, modified)
+    return False
+
+
+def _validator_headers(etag: str, modified: Optional[datetime], cache_control: str) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(modified), usegmt=True)
+    if cache_control.startswith("private"):
+        headers["Vary"] = "Authorization"
+    return headers
+
+
+def set_validators(response: Response, etag: str, modified: Optional[datetime], cache_control: str) -> None:
+    """
+    Add ETag, Last-Modified and Cache-Control headers to a response
+
+    Args:
+        response (Response): Response the route's return value is rendered into
+        etag (str): Entity tag
+        modified (Optional[datetime]): Modification time
+        cache_control (str): Cache-Control policy of the route
+    """
+    response.headers.update(_validator_headers(etag, modified, cache_control))
+
+
+def not_modified(etag: str, modified: Optional[datetime], cache_control: str) -> Response:
+    """
+    Build a 304 Not Modified response carrying the current validators
+
+    Args:
+        etag (str): Entity tag
+        modified (Optional[datetime]): Modification time
+        cache_control (str): Cache-Control policy of the route
+
+    Returns:
+        Response: Response without a body
+    """
+    return Response(status_code=304, headers=_validator_headers(etag, modified, cache_control))
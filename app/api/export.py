@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Optional, Sequence
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.export import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, AsyncExportService, encode_rows, gzip_chunks
+from app.services.factory import ServiceFactory
+
+logger = logging.getLogger(__name__)
+
+
+def export_format(fmt: Optional[str], request: Request) -> str:
+    """
+    Pick the export format from the format parameter or the Accept header
+
+    Args:
+        fmt (Optional[str]): Requested format, if any
+        request (Request): Request whose Accept header is used otherwise
+
+    Returns:
+        str: "ndjson" or "csv"
+
+    Raises:
+        HTTPException: If the requested format is not supported
+    """
+    fmt = fmt or ("csv" if "text/csv" in request.headers.get("accept", "") else "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Valid values are: {', '.join(EXPORT_FORMATS)}"
+        )
+    return fmt
+
+
+def accepts_gzip(request: Request) -> bool:
+    """
+    Check whether the client accepts a gzip-encoded response
+
+    Args:
+        request (Request): Request
+
+    Returns:
+        bool: True if Accept-Encoding lists gzip (or *) without q=0
+    """
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def export_response(
+    request: Request,
+    kind: str,
+    fmt: str,
+    columns: Sequence[str],
+    fetch: Callable[[AsyncExportService], AsyncIterator[Sequence[Any]]],
+) -> StreamingResponse:
+    """
+    Stream an export as the response body
+
+    The body is produced after the endpoint has returned, when the
+    request's own session is already closed, so the export opens a session
+    of its own. It holds a connection only while rows are being sent, and
+    gives it back as soon as the export ends or the client disconnects.
+
+    Args:
+        request (Request): Request, for content negotiation
+        kind (str): Exported resource, used in the file name
+        fmt (str): "ndjson" or "csv"
+        columns (Sequence[str]): Exported columns, in the order fetch returns them
+        fetch (Callable[[AsyncExportService], AsyncIterator[Sequence[Any]]]):
+            Streams the batches of rows from the export service
+
+    Returns:
+        StreamingResponse: Response streaming the export
+    """
+    compress = accepts_gzip(request)
+
+    async def body() -> AsyncIterator[bytes]:
+        async with AsyncSessionLocal() as db:
+            chunks = encode_rows(fetch(ServiceFactory.create_async_export_service(db)), columns, fmt)
+            if compress:
+                chunks = gzip_chunks(chunks, settings.EXPORT_GZIP_LEVEL)
+            try:
+                async for chunk in chunks:
+                    yield chunk
+            except Exception as e:
+                # The status line is already sent: the client sees a cut-off body
+                logger.error("%s export failed: %s", kind, e, exc_info=True)
+                raise
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    headers = {
+        "Content-Disposition": f'attachment; filename="{kind}-{timestamp}.{fmt}"',
+        "Cache-Control": "private, no-store",
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body(), media_type=EXPORT_MEDIA_TYPES[fmt], headers=headers)
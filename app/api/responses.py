@@ -1,26 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 from typing import List, Optional
 
+from app.api.conditional import (
+    RESPONSE_CACHE_CONTROL,
+    collection_etag,
+    is_not_modified,
+    last_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from app.api.export import export_format, export_response
 from app.schemas.requests import (
     ResponseCreate,
     ResponseUpdate,
     ResponseResponse,
+    ResponseStatusBulkUpdate,
+    ResponseStatusBulkResult,
+    Page,
     PaginationParams,
 )
-from app.db.session import get_db
-from app.services import response as response_service
+from app.services.factory import container
+from app.services.pagination import InvalidCursorError, next_cursor
+from app.services.archive import AsyncArchiveService
+from app.services.export import RESPONSE_EXPORT_COLUMNS
+from app.services.response import AsyncResponseService, InvalidStatusTransition
+from app.services.user import Principal
 from app.core.auth import get_current_user
-from app.db.models import User, ResponseStatus
+from app.db.models import ResponseStatus
 
 router = APIRouter(tags=["responses"])
 
 
 @router.post("/", response_model=ResponseResponse)
-def create_response(
+async def create_response(
     response: ResponseCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response_service: AsyncResponseService = Depends(container.provider("async_response_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Create a new response to a vacancy"""
     # Ensure the user can only create responses for themselves
@@ -29,15 +47,20 @@ def create_response(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only create responses for yourself"
         )
-    return response_service.create_response(db=db, response=response)
+    db_response = await response_service.create_response(response)
+    if db_response is None:
+        raise HTTPException(status_code=404, detail="Vacancy not found")
+    return db_response
 
 
-@router.get("/user", response_model=List[ResponseResponse])
-def get_user_responses(
+@router.get("/user", response_model=Page[ResponseResponse])
+async def get_user_responses(
+    request: Request,
+    response: Response,
     pagination: PaginationParams = Depends(),
     status: Optional[str] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response_service: AsyncResponseService = Depends(container.provider("async_response_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Get list of user's responses (filtered and paginated)"""
     skip = (pagination.page - 1) * pagination.per_page
@@ -53,23 +76,37 @@ def get_user_responses(
                 detail=f"Invalid status value. Valid values are: {', '.join([s.name for s in ResponseStatus])}"
             )
     
-    responses = response_service.get_responses_for_user(
-        db=db,
-        user_id=current_user.id,
-        skip=skip,
-        limit=pagination.per_page,
-        status=status_enum
-    )
-    return responses
+    try:
+        responses = await response_service.get_responses_for_user(
+            user_id=current_user.id,
+            skip=skip,
+            limit=pagination.per_page,
+            status=status_enum,
+            cursor=pagination.cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Response rows are narrow, so the validators are computed from the page
+    # itself; a 304 still saves serializing and sending it
+    cursor = next_cursor(responses, pagination.per_page)
+    etag = collection_etag(request, "user-responses", responses, current_user.id, cursor)
+    modified = last_modified(responses)
+    if is_not_modified(request, etag, use_modified_since=False):
+        return not_modified(etag, modified, RESPONSE_CACHE_CONTROL)
+    set_validators(response, etag, modified, RESPONSE_CACHE_CONTROL)
+    return {"items": responses, "next_cursor": cursor}
 
 
-@router.get("/vacancy/{vacancy_id}", response_model=List[ResponseResponse])
-def get_vacancy_responses(
+@router.get("/vacancy/{vacancy_id}", response_model=Page[ResponseResponse])
+async def get_vacancy_responses(
     vacancy_id: int,
     pagination: PaginationParams = Depends(),
     status: Optional[str] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    include_archived: bool = Query(False, description="Read responses of an archived vacancy"),
+    response_service: AsyncResponseService = Depends(container.provider("async_response_service")),
+    archive_service: AsyncArchiveService = Depends(container.provider("async_archive_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Get list of responses for a vacancy (for employers)"""
     skip = (pagination.page - 1) * pagination.per_page
@@ -85,24 +122,71 @@ def get_vacancy_responses(
                 detail=f"Invalid status value. Valid values are: {', '.join([s.name for s in ResponseStatus])}"
             )
     
-    responses = response_service.get_responses_for_vacancy(
-        db=db,
-        vacancy_id=vacancy_id,
-        skip=skip,
-        limit=pagination.per_page,
-        status=status_enum
+    try:
+        if include_archived and await archive_service.get_archived_vacancy(vacancy_id):
+            responses = await archive_service.get_archived_responses_for_vacancy(
+                vacancy_id=vacancy_id,
+                skip=skip,
+                limit=pagination.per_page,
+                status=status_enum,
+                cursor=pagination.cursor
+            )
+        else:
+            responses = await response_service.get_responses_for_vacancy(
+                vacancy_id=vacancy_id,
+                skip=skip,
+                limit=pagination.per_page,
+                status=status_enum,
+                cursor=pagination.cursor
+            )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": responses, "next_cursor": next_cursor(responses, pagination.per_page)}
+
+
+@router.get("/vacancy/{vacancy_id}/export", response_class=StreamingResponse)
+async def export_vacancy_responses(
+    request: Request,
+    vacancy_id: int,
+    fmt: Optional[str] = Query(None, alias="format", description="ndjson or csv; taken from Accept if omitted"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    created_from: Optional[datetime] = Query(None, description="Only responses created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only responses created before this time"),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Stream all responses to a vacancy as NDJSON or CSV, gzipped if the client accepts it (for employers)"""
+    fmt = export_format(fmt, request)
+    
+    # Convert string status to enum if provided
+    status_enum = None
+    if status:
+        try:
+            status_enum = ResponseStatus[status.upper()]
+        except KeyError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status value. Valid values are: {', '.join([s.name for s in ResponseStatus])}"
+            )
+    
+    return export_response(
+        request,
+        "responses",
+        fmt,
+        RESPONSE_EXPORT_COLUMNS,
+        lambda export_service: export_service.stream_responses(vacancy_id, status_enum, created_from, created_to),
     )
-    return responses
 
 
 @router.get("/{response_id}", response_model=ResponseResponse)
-def get_response_by_id(
+async def get_response_by_id(
+    request: Request,
+    response: Response,
     response_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response_service: AsyncResponseService = Depends(container.provider("async_response_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Get response by ID"""
-    db_response = response_service.get_response(db, response_id=response_id)
+    db_response = await response_service.get_response(response_id)
     if db_response is None:
         raise HTTPException(status_code=404, detail="Response not found")
     
@@ -111,15 +195,40 @@ def get_response_by_id(
         # TODO: Check if current user is the employer for this vacancy
         pass
     
+    etag = make_etag("response", response_id, db_response.version)
+    modified = db_response.updated or db_response.created
+    if is_not_modified(request, etag, modified):
+        return not_modified(etag, modified, RESPONSE_CACHE_CONTROL)
+    set_validators(response, etag, modified, RESPONSE_CACHE_CONTROL)
     return db_response
 
 
+@router.patch("/status", response_model=ResponseStatusBulkResult)
+async def update_response_statuses(
+    body: ResponseStatusBulkUpdate,
+    response_service: AsyncResponseService = Depends(container.provider("async_response_service")),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Move many responses to a new status at once (for employers)"""
+    # Only listed responses, with the same access as changing them one by
+    # one: there is no vacancy ownership to authorize a vacancy-wide change
+    changes = await response_service.update_response_statuses(
+        status=ResponseStatus[body.status.name],
+        ids=body.ids,
+        from_status=ResponseStatus[body.from_status.name] if body.from_status else None,
+    )
+    return {
+        "updated": sum(change.outcome == "updated" for change in changes),
+        "results": [change._asdict() for change in changes],
+    }
+
+
 @router.patch("/{response_id}/status/{status}", response_model=ResponseResponse)
-def update_response_status(
+async def update_response_status(
     response_id: int,
     status: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response_service: AsyncResponseService = Depends(container.provider("async_response_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Update response status by ID (for employers)"""
     try:
@@ -130,9 +239,12 @@ def update_response_status(
             detail=f"Invalid status value. Valid values are: {', '.join([s.name for s in ResponseStatus])}"
         )
     
-    db_response = response_service.update_response_status(
-        db, response_id=response_id, status=status_enum
-    )
+    try:
+        db_response = await response_service.update_response_status(
+            response_id=response_id, status=status_enum
+        )
+    except InvalidStatusTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if db_response is None:
         raise HTTPException(status_code=404, detail="Response not found")
     
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.schemas.requests import (
     UserUpdate,
     UserResponse,
+    UserSummary,
+    USER_SUMMARY_FIELDS,
+    Page,
 )
-from app.db.session import get_db
-from app.services.factory import ServiceFactory
-from app.services.user import UserService
+from app.services.factory import container
+from app.services.pagination import InvalidCursorError, next_cursor
+from app.services.projection import InvalidFieldsError, parse_fields, project
+from app.services.user import AsyncUserService, Principal
 from app.core.auth import get_current_user
-from app.db.models import User
 
 router = APIRouter(tags=["users"])
 
@@ -20,49 +22,68 @@ class PaginationParams:
         self,
         page: int = Query(1, ge=1, description="Page number"),
         per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+        cursor: Optional[str] = Query(None, description="Cursor from the previous page; takes precedence over page"),
     ):
         self.page = page
         self.per_page = per_page
+        self.cursor = cursor
 
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(
+    current_user: Principal = Depends(get_current_user),
+    user_service: AsyncUserService = Depends(container.provider("async_user_service")),
+):
     """Get current user profile"""
-    return current_user
+    db_user = await user_service.get_user(current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
 
 
 @router.put("/me", response_model=UserResponse)
-def update_user_me(
+async def update_user_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    user_service: UserService = Depends(ServiceFactory.create_user_service),
+    current_user: Principal = Depends(get_current_user),
+    user_service: AsyncUserService = Depends(container.provider("async_user_service")),
 ):
     """Update current user profile"""
-    return user_service.update_user(current_user.id, user_update)
+    return await user_service.update_user(current_user.id, user_update)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user_by_id(
+async def get_user_by_id(
     user_id: int,
-    user_service: UserService = Depends(ServiceFactory.create_user_service),
-    current_user: User = Depends(get_current_user),
+    user_service: AsyncUserService = Depends(container.provider("async_user_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Get user by ID"""
-    db_user = user_service.get_user(user_id)
+    db_user = await user_service.get_user(user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 
-@router.get("/", response_model=List[UserResponse])
-def get_users(
+@router.get("/", response_model=Page[UserSummary], response_model_exclude_unset=True)
+async def get_users(
     pagination: PaginationParams = Depends(),
-    user_service: UserService = Depends(ServiceFactory.create_user_service),
-    current_user: User = Depends(get_current_user),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return; defaults to all but cv_text",
+    ),
+    user_service: AsyncUserService = Depends(container.provider("async_user_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Get list of users (paginated)"""
     skip = (pagination.page - 1) * pagination.per_page
-    users = user_service.get_users(
-        skip=skip, limit=pagination.per_page
-    )
-    return users
+    try:
+        selected_fields = parse_fields(fields, UserResponse.model_fields, USER_SUMMARY_FIELDS)
+        users = await user_service.get_users(
+            skip=skip, limit=pagination.per_page, cursor=pagination.cursor, fields=selected_fields
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {
+        "items": project(users, selected_fields),
+        "next_cursor": next_cursor(users, pagination.per_page),
+    }
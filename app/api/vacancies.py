@@ -1,43 +1,242 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Any, BinaryIO, List, Optional
+import asyncio
+import io
 
+from app.api.conditional import (
+    ARCHIVED_VACANCY_CACHE_CONTROL,
+    VACANCY_CACHE_CONTROL,
+    collection_etag,
+    is_not_modified,
+    last_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from app.api.export import export_format, export_response
 from app.schemas.requests import (
     VacancyCreate,
     VacancyUpdate,
     VacancyResponse,
+    VacancySummary,
+    VACANCY_SUMMARY_FIELDS,
+    ImportReport,
+    Page,
     PaginationParams,
 )
-from app.db.session import get_db
-from app.services import vacancy as vacancy_service
+from app.services.factory import ServiceFactory, container
+from app.services.pagination import InvalidCursorError, next_cursor
+from app.services.projection import InvalidFieldsError, parse_fields, project
+from app.services.archive import AsyncArchiveService
+from app.services.export import VACANCY_EXPORT_COLUMNS
+from app.services.importer import IMPORT_FORMATS, ImportResult
+from app.services.user import Principal
+from app.services.vacancy import AsyncVacancyService
 from app.core.auth import get_current_user
-from app.db.models import User, VacancyStatus
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.models import VacancyStatus
 
 router = APIRouter(tags=["vacancies"])
 
+# Body chunks read ahead of the import thread, bounding the memory in flight
+IMPORT_QUEUE_CHUNKS = 16
+
 
 @router.post("/", response_model=VacancyResponse)
-def create_vacancy(
+async def create_vacancy(
     vacancy: VacancyCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    vacancy_service: AsyncVacancyService = Depends(container.provider("async_vacancy_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Create a new vacancy"""
-    return vacancy_service.create_vacancy(db=db, vacancy=vacancy)
+    return await vacancy_service.create_vacancy(vacancy)
+
+
+class ImportBodyTooLarge(Exception):
+    """
+    Raised to the import thread when the request body exceeds IMPORT_MAX_BODY_MB
+    """
+
+
+class _BodyReader(io.RawIOBase):
+    """
+    Blocking file-like view, for a worker thread, of a request body that the
+    event loop feeds chunk by chunk into a queue
+
+    A None item ends the body; an exception item is raised to the reader.
+    """
+
+    def __init__(self, chunks: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self._chunks = chunks
+        self._loop = loop
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            chunk = asyncio.run_coroutine_threadsafe(self._chunks.get(), self._loop).result()
+            if chunk is None:
+                return 0
+            if isinstance(chunk, Exception):
+                raise chunk
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+async def _feed(chunks: asyncio.Queue, item: Any, worker: "asyncio.Future[Any]") -> bool:
+    # Wait for room in the queue, unless the import stopped reading
+    put = asyncio.ensure_future(chunks.put(item))
+    await asyncio.wait({put, worker}, return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+        return False
+    return True
+
+
+def _import_vacancies(source: BinaryIO, fmt: str, start_line: int) -> ImportResult:
+    lines = io.TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline="")
+    db = SessionLocal()
+    try:
+        return ServiceFactory.create_import_service(db).import_vacancies(
+            lines,
+            fmt,
+            chunk_size=settings.IMPORT_CHUNK_SIZE,
+            start_line=start_line,
+            max_errors=settings.IMPORT_MAX_ERRORS,
+        )
+    finally:
+        db.close()
+        lines.detach()
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_vacancies(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", description="jsonl or csv; taken from Content-Type if omitted"),
+    start_line: int = Query(1, ge=1, description="Skip records before this line, to resume a stopped import"),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Bulk import vacancies from a JSON Lines or CSV (with header) request body"""
+    fmt = fmt or ("csv" if "csv" in request.headers.get("content-type", "") else "jsonl")
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Valid values are: {', '.join(IMPORT_FORMATS)}"
+        )
+    
+    max_bytes = settings.IMPORT_MAX_BODY_MB * 1024 * 1024
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import body is larger than {settings.IMPORT_MAX_BODY_MB} MB"
+        )
+    
+    # The body is parsed on a worker thread as it arrives, through a bounded
+    # queue, so memory stays bounded and the event loop never blocks on it
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=IMPORT_QUEUE_CHUNKS)
+    source = io.BufferedReader(_BodyReader(chunks, asyncio.get_running_loop()))
+    worker = asyncio.ensure_future(asyncio.to_thread(_import_vacancies, source, fmt, start_line))
+    received = 0
+    end: Any = None
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                end = ImportBodyTooLarge(f"Body exceeds {settings.IMPORT_MAX_BODY_MB} MB")
+                break
+            if chunk and not await _feed(chunks, chunk, worker):
+                # The import stopped reading, e.g. on a database error
+                break
+        else:
+            await _feed(chunks, None, worker)
+    except BaseException as e:
+        # E.g. the client disconnected: stop the import where it is
+        end = e if isinstance(e, Exception) else RuntimeError("Import request cancelled")
+        raise
+    finally:
+        if end is not None and not worker.done():
+            # Drop what the thread has not read yet and make it stop
+            while not chunks.empty():
+                chunks.get_nowait()
+            chunks.put_nowait(end)
+        result = await worker
+    
+    report = {**result._asdict(), "errors": [error._asdict() for error in result.errors]}
+    if isinstance(end, ImportBodyTooLarge):
+        # Rows through last_line are committed
+        report["aborted"] = f"Import body is larger than {settings.IMPORT_MAX_BODY_MB} MB"
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=report)
+    if result.aborted is not None:
+        # The cause is logged; rows through last_line are committed
+        report["aborted"] = "Import stopped by a database error"
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=report)
+    return report
 
 
-@router.get("/", response_model=List[VacancyResponse])
-def get_vacancies(
+@router.get("/export", response_class=StreamingResponse)
+async def export_vacancies(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", description="ndjson or csv; taken from Accept if omitted"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    created_from: Optional[datetime] = Query(None, description="Only vacancies created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only vacancies created before this time"),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Stream all matching vacancies as NDJSON or CSV, gzipped if the client accepts it"""
+    fmt = export_format(fmt, request)
+    
+    # Convert string status to enum if provided
+    status_enum = None
+    if status:
+        try:
+            status_enum = VacancyStatus[status.upper()]
+        except KeyError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status value. Valid values are: {', '.join([s.name for s in VacancyStatus])}"
+            )
+    
+    return export_response(
+        request,
+        "vacancies",
+        fmt,
+        VACANCY_EXPORT_COLUMNS,
+        lambda export_service: export_service.stream_vacancies(status_enum, created_from, created_to),
+    )
+
+
+@router.get("/", response_model=Page[VacancySummary], response_model_exclude_unset=True)
+async def get_vacancies(
+    request: Request,
+    response: Response,
     pagination: PaginationParams = Depends(),
     status: Optional[str] = Query(None, description="Filter by status"),
     min_salary: Optional[float] = Query(None, description="Minimum salary"),
     max_salary: Optional[float] = Query(None, description="Maximum salary"),
     q: Optional[str] = Query(None, description="Search term"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return; defaults to all but full_description",
+    ),
+    vacancy_service: AsyncVacancyService = Depends(container.provider("async_vacancy_service")),
 ):
     """Get list of vacancies (filtered and paginated)"""
     skip = (pagination.page - 1) * pagination.per_page
     
+    try:
+        selected_fields = parse_fields(fields, VacancyResponse.model_fields, VACANCY_SUMMARY_FIELDS)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Convert string status to enum if provided
     status_enum = None
     if status:
@@ -49,40 +248,85 @@ def get_vacancies(
                 detail=f"Invalid status value. Valid values are: {', '.join([s.name for s in VacancyStatus])}"
             )
     
-    vacancies = vacancy_service.get_vacancies(
-        db=db,
+    filters = dict(
         skip=skip,
         limit=pagination.per_page,
         status=status_enum,
         min_salary=min_salary,
         max_salary=max_salary,
-        search_term=q
+        search_term=q,
+        cursor=pagination.cursor,
     )
-    return vacancies
+    try:
+        if "if-none-match" in request.headers:
+            # Revalidate against a page of versions before loading full rows
+            versions = await vacancy_service.get_vacancies(**filters, fields=["version", "updated"])
+            cursor = next_cursor(versions, pagination.per_page)
+            etag = collection_etag(request, "vacancies", versions, cursor)
+            if is_not_modified(request, etag):
+                return not_modified(etag, last_modified(versions), VACANCY_CACHE_CONTROL)
+        vacancies = await vacancy_service.get_vacancies(
+            **filters, fields=[*selected_fields, "version", "updated"]
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cursor = next_cursor(vacancies, pagination.per_page)
+    set_validators(
+        response,
+        collection_etag(request, "vacancies", vacancies, cursor),
+        last_modified(vacancies),
+        VACANCY_CACHE_CONTROL,
+    )
+    return {"items": project(vacancies, selected_fields), "next_cursor": cursor}
 
 
 @router.get("/{vacancy_id}", response_model=VacancyResponse)
-def get_vacancy_by_id(
+async def get_vacancy_by_id(
+    request: Request,
+    response: Response,
     vacancy_id: int,
-    db: Session = Depends(get_db),
+    include_archived: bool = Query(False, description="Also look up archived vacancies"),
+    vacancy_service: AsyncVacancyService = Depends(container.provider("async_vacancy_service")),
+    archive_service: AsyncArchiveService = Depends(container.provider("async_archive_service")),
 ):
     """Get vacancy by ID"""
-    db_vacancy = vacancy_service.get_vacancy(db, vacancy_id=vacancy_id)
-    if db_vacancy is None:
-        raise HTTPException(status_code=404, detail="Vacancy not found")
-    return db_vacancy
+    current = await vacancy_service.get_vacancy_version(vacancy_id)
+    if current is not None:
+        etag = make_etag("vacancy", vacancy_id, current.version)
+        if is_not_modified(request, etag, current.modified):
+            return not_modified(etag, current.modified, VACANCY_CACHE_CONTROL)
+        db_vacancy = await vacancy_service.get_vacancy(vacancy_id)
+        if db_vacancy is not None:
+            set_validators(
+                response,
+                make_etag("vacancy", vacancy_id, db_vacancy.version),
+                db_vacancy.updated or db_vacancy.created,
+                VACANCY_CACHE_CONTROL,
+            )
+            return db_vacancy
+    
+    if include_archived:
+        archived = await archive_service.get_archived_vacancy(vacancy_id)
+        if archived is not None:
+            # Archived rows never change
+            etag = make_etag("archived-vacancy", vacancy_id, archived.archived.isoformat())
+            if is_not_modified(request, etag, archived.archived):
+                return not_modified(etag, archived.archived, ARCHIVED_VACANCY_CACHE_CONTROL)
+            set_validators(response, etag, archived.archived, ARCHIVED_VACANCY_CACHE_CONTROL)
+            return archived
+    raise HTTPException(status_code=404, detail="Vacancy not found")
 
 
 @router.put("/{vacancy_id}", response_model=VacancyResponse)
-def update_vacancy_by_id(
+async def update_vacancy_by_id(
     vacancy_id: int,
     vacancy_update: VacancyUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    vacancy_service: AsyncVacancyService = Depends(container.provider("async_vacancy_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Update vacancy by ID"""
-    db_vacancy = vacancy_service.update_vacancy(
-        db, vacancy_id=vacancy_id, vacancy=vacancy_update
+    db_vacancy = await vacancy_service.update_vacancy(
+        vacancy_id=vacancy_id, vacancy=vacancy_update
     )
     if db_vacancy is None:
         raise HTTPException(status_code=404, detail="Vacancy not found")
@@ -90,24 +334,24 @@ def update_vacancy_by_id(
 
 
 @router.delete("/{vacancy_id}", response_model=VacancyResponse)
-def delete_vacancy_by_id(
+async def delete_vacancy_by_id(
     vacancy_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    vacancy_service: AsyncVacancyService = Depends(container.provider("async_vacancy_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Delete vacancy by ID (soft delete)"""
-    db_vacancy = vacancy_service.delete_vacancy(db, vacancy_id=vacancy_id)
+    db_vacancy = await vacancy_service.delete_vacancy(vacancy_id)
     if db_vacancy is None:
         raise HTTPException(status_code=404, detail="Vacancy not found")
     return db_vacancy
 
 
 @router.post("/{vacancy_id}/status/{status}", response_model=VacancyResponse)
-def update_vacancy_status(
+async def update_vacancy_status(
     vacancy_id: int,
     status: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    vacancy_service: AsyncVacancyService = Depends(container.provider("async_vacancy_service")),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Update vacancy status by ID"""
     try:
@@ -118,8 +362,8 @@ def update_vacancy_status(
             detail=f"Invalid status value. Valid values are: {', '.join([s.name for s in VacancyStatus])}"
         )
     
-    db_vacancy = vacancy_service.update_vacancy_status(
-        db, vacancy_id=vacancy_id, status=status_enum
+    db_vacancy = await vacancy_service.update_vacancy_status(
+        vacancy_id=vacancy_id, status=status_enum
     )
     if db_vacancy is None:
         raise HTTPException(status_code=404, detail="Vacancy not found")
@@ -4,7 +4,6 @@ from typing import Optional, Dict, Any, List
 from app.factory import AppFactory
 from app.core.config import settings
 from app.core.container import container
-from app.services.factory import ServiceFactory
 
 
 class Application:
@@ -23,19 +22,9 @@ class Application:
     
     def _initialize(self):
         """Initialize the application components"""
-        # Register services
-        self._register_services()
-    
-    def _register_services(self):
-        """Register services in the container"""
-        # Register user service
-        container.register("user_service", ServiceFactory.create_user_service)
-        
-        # Register vacancy service
-        container.register("vacancy_service", ServiceFactory.create_vacancy_service)
-        
-        # Register response service
-        container.register("response_service", ServiceFactory.create_response_service)
+        # Services are registered in the container by app.services.factory,
+        # before the routers that resolve them are defined
+        self.container = container
     
     @property
     def app(self) -> FastAPI:
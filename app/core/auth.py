@@ -1,68 +1,118 @@
+import uuid
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models import User
+from app.db.models import User, UserStatus
 from app.core.config import settings
+from app.core.container import container
+from app.core.passwords import create_password_hasher
+from app.core.throttle import create_login_throttle
+from app.core.tokens import TokenClaims, TokenVerifier, create_revocation_list
+
+if TYPE_CHECKING:
+    # app.services.user imports this module
+    from app.services.user import AsyncUserService
 
 # JWT Configuration from settings
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs on its own bounded pool, see app/core/passwords.py
+password_hasher = create_password_hasher(settings)
+pwd_context = password_hasher.context
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Login attempt limits, checked before any password is hashed
+login_throttle = create_login_throttle(settings)
+
+# Process-wide verified-token cache and token denylist
+token_verifier = TokenVerifier(SECRET_KEY, ALGORITHM, max_size=settings.TOKEN_CACHE_MAX_SIZE)
+revocation_list = create_revocation_list(settings)
+
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
-def authenticate_user(db: Session, email: str, password: str):
-    from app.services.factory import ServiceFactory
-    user_service = ServiceFactory.create_user_service(db)
-    user = user_service.get_user_by_email(email)
-    if not user or not verify_password(password, user.password):
+async def authenticate_user(user_service: "AsyncUserService", email: str, password: str):
+    user = await user_service.get_user_by_email(email)
+    if not user:
+        await password_hasher.averify_dummy(password)
         return False
+    verified, new_hash = await password_hasher.averify_and_update(password, user.password)
+    if not verified:
+        return False
+    if new_hash is not None:
+        # Stored with an outdated cost factor; the password is at hand now
+        await user_service.set_password_hash(user, new_hash)
     return user
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # jti lets a single token be revoked, iat all tokens of a user issued so far
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> TokenClaims:
+    """
+    Verify the bearer token and check that it was not revoked
+
+    Signatures are only checked the first time a token is seen; later
+    requests with it are answered from the verified-token cache.
+    """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        claims = token_verifier.verify(token)
     except JWTError:
+        raise _credentials_exception()
+    if await revocation_list.ais_revoked(claims):
+        raise _credentials_exception()
+    return claims
+
+
+async def get_current_user(
+    claims: TokenClaims = Depends(get_token_claims),
+    # Registered by app.services.factory, which imports this module
+    user_service: "AsyncUserService" = Depends(container.deferred_provider("async_user_service")),
+):
+    """
+    Resolve the bearer token to the authenticated, non-banned user
+
+    Returns a Principal (ID, email and status) from the principal cache;
+    routes that need the full profile load it through UserService.
+    """
+    credentials_exception = _credentials_exception()
+    try:
+        user_id = int(claims.subject)
+    except ValueError:
         raise credentials_exception
     
-    from app.services.factory import ServiceFactory
-    user_service = ServiceFactory.create_user_service(db)
-    user = user_service.get_user(int(user_id))
+    principal = await user_service.get_principal(user_id)
     
-    if user is None:
+    if principal is None:
         raise credentials_exception
-    return user
+    if principal.status == UserStatus.BANNED:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is banned")
+    return principal
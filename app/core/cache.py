@@ -0,0 +1,315 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import Settings
+
+# Value left by invalidate(); reads treat it as a miss, add() cannot replace it
+_TOMBSTONE = object()
+
+
+class CacheFullError(Exception):
+    """
+    Raised by a cache that must not evict when it has no room for an entry
+    """
+
+
+class CacheStats:
+    """
+    Thread-safe hit, miss and eviction counters of a cache
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
+
+    def record(self, counter: str, count: int = 1) -> None:
+        """
+        Increment a counter
+
+        Args:
+            counter (str): Counter name, e.g. "hits"
+            count (int): Amount to add
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + count)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a consistent copy of the counters
+
+        Returns:
+            Dict[str, Any]: Counters and the hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class CacheBackend(ABC):
+    """
+    Key-value cache for JSON-serializable values
+
+    The async methods default to the sync ones, which is right for
+    in-process backends; network backends override them.
+
+    For read-through caching that must never serve a value older than a
+    committed write, readers fill the cache with add() and writers call
+    invalidate() after committing: a reader that loaded the old value before
+    the commit can then no longer store it.
+    """
+
+    # Whether all worker processes see the same entries, so that one
+    # invalidation reaches every worker
+    shared = False
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live value, or None on a miss"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value for ttl seconds, or the cache's TTL if not given"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry"""
+
+    @abstractmethod
+    def add(self, key: str, value: Any) -> bool:
+        """Store a value unless the key holds a live entry or tombstone"""
+
+    @abstractmethod
+    def invalidate(self, key: str) -> None:
+        """Replace the entry with a tombstone that lives for one TTL"""
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+    async def adelete(self, key: str) -> None:
+        self.delete(key)
+
+    async def aadd(self, key: str, value: Any) -> bool:
+        return self.add(key, value)
+
+    async def ainvalidate(self, key: str) -> None:
+        self.invalidate(key)
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Describe the cache and its counters
+
+        Returns:
+            Dict[str, Any]: Backend name, TTL and statistics
+        """
+        return {"backend": self.__class__.__name__, "ttl": self.ttl, **self.stats.snapshot()}
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with a size bound and a TTL
+
+    With evict=False live entries are never dropped before they expire:
+    when the cache is full of them, storing a new key raises CacheFullError.
+    """
+
+    def __init__(self, max_size: int, ttl: float, evict: bool = True):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self.evict = evict
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.stats.record("expirations")
+                entry = None
+            if entry is None or entry[1] is _TOMBSTONE:
+                self.stats.record("misses")
+                return None
+            self._entries.move_to_end(key)
+        self.stats.record("hits")
+        return entry[1]
+
+    def _store_locked(self, key: str, value: Any, ttl: Optional[float] = None) -> int:
+        now = time.monotonic()
+        if not self.evict and key not in self._entries and len(self._entries) >= self.max_size:
+            expired = [name for name, (expires, _) in self._entries.items() if expires <= now]
+            for name in expired:
+                del self._entries[name]
+            if expired:
+                self.stats.record("expirations", len(expired))
+            if len(self._entries) >= self.max_size:
+                raise CacheFullError(f"Cache is full ({self.max_size} live entries)")
+        self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            evicted = self._store_locked(key, value, ttl)
+        if evicted:
+            self.stats.record("evictions", evicted)
+
+    def add(self, key: str, value: Any) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            evicted = self._store_locked(key, value)
+        if evicted:
+            self.stats.record("evictions", evicted)
+        return True
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            evicted = self._store_locked(key, _TOMBSTONE)
+        self.stats.record("invalidations")
+        if evicted:
+            self.stats.record("evictions", evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+        if removed:
+            self.stats.record("invalidations")
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "size": len(self._entries), "max_size": self.max_size}
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache in Redis (or any server speaking its protocol), shared by all
+    workers so invalidations apply everywhere at once
+
+    Size bound and eviction policy are server settings (maxmemory and
+    maxmemory-policy allkeys-lru), so evictions are not counted here.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        ttl: float,
+        url: Optional[str] = None,
+        prefix: str = "",
+        client: Any = None,
+        async_client: Any = None,
+    ):
+        super().__init__(ttl)
+        self.prefix = prefix
+        if client is None or async_client is None:
+            try:
+                import redis
+                import redis.asyncio
+            except ImportError as e:
+                raise RuntimeError("The redis package is required for the redis cache backend") from e
+            client = client or redis.Redis.from_url(url)
+            async_client = async_client or redis.asyncio.Redis.from_url(url)
+        self.client = client
+        self.async_client = async_client
+
+    def _decode(self, raw: Optional[bytes]) -> Optional[Any]:
+        # An empty value is a tombstone
+        if not raw:
+            self.stats.record("misses")
+            return None
+        self.stats.record("hits")
+        return json.loads(raw)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._decode(self.client.get(self.prefix + key))
+
+    def _px(self, ttl: Optional[float] = None) -> int:
+        return max(1, int((self.ttl if ttl is None else ttl) * 1000))
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), px=self._px(ttl))
+
+    def delete(self, key: str) -> None:
+        if self.client.delete(self.prefix + key):
+            self.stats.record("invalidations")
+
+    def add(self, key: str, value: Any) -> bool:
+        return bool(self.client.set(self.prefix + key, json.dumps(value), px=self._px(), nx=True))
+
+    def invalidate(self, key: str) -> None:
+        self.client.set(self.prefix + key, b"", px=self._px())
+        self.stats.record("invalidations")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return self._decode(await self.async_client.get(self.prefix + key))
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.async_client.set(self.prefix + key, json.dumps(value), px=self._px(ttl))
+
+    async def adelete(self, key: str) -> None:
+        if await self.async_client.delete(self.prefix + key):
+            self.stats.record("invalidations")
+
+    async def aadd(self, key: str, value: Any) -> bool:
+        return bool(
+            await self.async_client.set(self.prefix + key, json.dumps(value), px=self._px(), nx=True)
+        )
+
+    async def ainvalidate(self, key: str) -> None:
+        await self.async_client.set(self.prefix + key, b"", px=self._px())
+        self.stats.record("invalidations")
+
+
+def create_cache(config: Settings, namespace: str, ttl: Optional[float] = None) -> Optional[CacheBackend]:
+    """
+    Create the cache backend selected in settings
+
+    Args:
+        config (Settings): Settings providing the cache options
+        namespace (str): Prefix separating this cache's keys in shared backends
+        ttl (Optional[float]): Entry lifetime; defaults to CACHE_TTL_SECONDS
+
+    Returns:
+        Optional[CacheBackend]: Cache backend, or None if caching is disabled
+    """
+    backend = config.CACHE_BACKEND.lower()
+    ttl = config.CACHE_TTL_SECONDS if ttl is None else ttl
+    if backend == "memory":
+        return MemoryCache(max_size=config.CACHE_MAX_SIZE, ttl=ttl)
+    if backend == "redis":
+        return RedisCache(ttl=ttl, url=config.REDIS_URL, prefix=f"ravamet:{namespace}:")
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown cache backend '{config.CACHE_BACKEND}'")
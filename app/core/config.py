@@ -1,7 +1,11 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
+# Load environment variables from .env file before the defaults below are read
+from dotenv import load_dotenv
+load_dotenv()
+
 
 class Settings(BaseModel):
     API_V1_STR: str = "/api/v1"
@@ -19,15 +23,113 @@ class Settings(BaseModel):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "ravamet")
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
     
+    # Read replicas (comma-separated URLs); reads fall back to the primary
+    # while a replica lags more than DB_REPLICA_MAX_LAG_SECONDS
+    DATABASE_REPLICA_URLS: List[str] = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+    DB_REPLICA_CHECK_SECONDS: float = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "10"))
+    
+    # Connection Pool Configuration
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_SLOW_CHECKOUT_MS: float = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "100"))
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    
+    # SQLite Configuration (applied when DATABASE_URL is a sqlite:/// URL)
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_POOL_SIZE: int = int(os.getenv("SQLITE_POOL_SIZE", "5"))
+    
+    # In-memory vacancy search index
+    VACANCY_INDEX_ENABLED: bool = os.getenv("VACANCY_INDEX_ENABLED", "false").lower() == "true"
+    VACANCY_INDEX_REFRESH_SECONDS: float = float(os.getenv("VACANCY_INDEX_REFRESH_SECONDS", "30"))
+    VACANCY_INDEX_BATCH_SIZE: int = int(os.getenv("VACANCY_INDEX_BATCH_SIZE", "1000"))
+    
+    # Caching: "memory" (per process, only used with WEB_CONCURRENCY=1),
+    # "redis" (shared by all workers) or "none"
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_MAX_SIZE: int = int(os.getenv("CACHE_MAX_SIZE", "10000"))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Authenticated users looked up by get_current_user; cached in memory
+    # only with WEB_CONCURRENCY=1, since a ban must reach every worker at once
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    
+    # Bulk imports (import_data.py, POST /vacancies/import): rows per
+    # insert and commit, and most row errors listed in the report
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+    IMPORT_MAX_ERRORS: int = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+    # Largest body POST /vacancies/import accepts; larger ones get 413
+    IMPORT_MAX_BODY_MB: int = int(os.getenv("IMPORT_MAX_BODY_MB", "100"))
+    
+    # Streaming exports (GET /vacancies/export, GET /responses/vacancy/{id}/export): rows
+    # fetched per cursor batch and gzip level when the client accepts gzip
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    EXPORT_GZIP_LEVEL: int = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+    
+    # Archival of closed and deleted vacancies
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+    
     # JWT Configuration
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-must-be-changed-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Refresh tokens: a session ends after this many days without a refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: float = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    # Password hashing: bcrypt cost factor and the dedicated worker pool;
+    # logins beyond workers + queue size get 503 instead of waiting
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+    # Login throttling, checked before any password is hashed: a token bucket
+    # per client IP, failures per account and IP, and an account-wide lock
+    # that IPs the account logged in from before are exempt from
+    LOGIN_THROTTLE_ENABLED: bool = os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() == "true"
+    LOGIN_IP_BURST: int = int(os.getenv("LOGIN_IP_BURST", "20"))
+    LOGIN_IP_PER_MINUTE: float = float(os.getenv("LOGIN_IP_PER_MINUTE", "10"))
+    LOGIN_MAX_FAILURES: int = int(os.getenv("LOGIN_MAX_FAILURES", "5"))
+    LOGIN_ACCOUNT_LOCK_FAILURES: int = int(os.getenv("LOGIN_ACCOUNT_LOCK_FAILURES", "50"))
+    LOGIN_FAILURE_WINDOW_SECONDS: float = float(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "900"))
+    LOGIN_TRUSTED_IP_DAYS: float = float(os.getenv("LOGIN_TRUSTED_IP_DAYS", "30"))
+    LOGIN_THROTTLE_MAX_KEYS: int = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+    # Verified tokens remembered per process, so signatures are checked once
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+    # Revoked tokens and users kept in memory when CACHE_BACKEND is not redis;
+    # never evicted early, so logouts fail with 503 while the list is full
+    TOKEN_REVOCATION_MAX_SIZE: int = int(os.getenv("TOKEN_REVOCATION_MAX_SIZE", "100000"))
+    # Worker processes, as read by uvicorn and gunicorn; more than one
+    # requires CACHE_BACKEND=redis so revocations reach all of them
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
+    # Logging: records are written by a background thread; a full queue drops them
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Share of records below WARNING kept per logger, e.g. "app.services.user=0.1"
+    LOG_SAMPLING: Dict[str, float] = {
+        name.strip(): float(rate)
+        for name, _, rate in (pair.partition("=") for pair in os.getenv("LOG_SAMPLING", "").split(","))
+        if name.strip()
+    }
+    # Most records below WARNING per logger and second; 0 for no limit
+    LOG_RATE_LIMIT_PER_SECOND: float = float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", "100"))
     
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
     RELOAD: bool = os.getenv("RELOAD", "true").lower() == "true"
+    # Proxies trusted to set X-Forwarded-For, comma-separated ("*" for any);
+    # the client IP is taken from that header only for requests from them
+    FORWARDED_ALLOW_IPS: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
     
     def get_database_url(self) -> str:
         if self.DATABASE_URL:
@@ -35,8 +137,4 @@ class Settings(BaseModel):
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
 
-# Load environment variables from .env file
-from dotenv import load_dotenv
-load_dotenv()
-
 settings = Settings()
@@ -0,0 +1,233 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from app.core.config import Settings
+
+# ID of the request being handled, attached to every record logged for it
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "request_id", "color_message"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record, with extra= fields as top-level keys
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Plain text, with the request ID when there is one
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(request)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        request_id = getattr(record, "request_id", None)
+        record.request = f" [{request_id}]" if request_id else ""
+        return super().format(record)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thin out records below WARNING on hot paths
+
+    Each logger (or logger prefix) in rates keeps only that share of its
+    records, and every logger is held to per_second records a second.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float], per_second: float = 0):
+        super().__init__()
+        self.rates = rates
+        self.per_second = per_second
+        self._resolved: Dict[str, float] = {}
+        self._windows: Dict[str, list] = {}
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+        if self.per_second > 0:
+            second = int(record.created)
+            window = self._windows.get(record.name)
+            if window is None or window[0] != second:
+                window = self._windows[record.name] = [second, 0]
+            # Racy under threads, which only lets a few extra records through
+            window[1] += 1
+            if window[1] > self.per_second:
+                self.rate_limited += 1
+                return False
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never waits for the writer thread
+
+    The record is queued as is: its message is formatted by the writer, so
+    the request only pays for creating the record. Arguments must not be
+    mutated after logging them. When the queue is full the record is
+    dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Context variables are only visible here, in the thread that logged
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_sampling: Optional[SamplingFilter] = None
+
+
+def configure_logging(config: Settings) -> None:
+    """
+    Route the root logger through a queue to a background writer thread
+
+    Safe to call more than once; only the first call has an effect.
+
+    Args:
+        config (Settings): Settings providing the LOG_* options
+    """
+    global _handler, _listener, _sampling
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if config.LOG_FORMAT == "json" else TextFormatter())
+    log_queue: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    _sampling = SamplingFilter(config.LOG_SAMPLING, config.LOG_RATE_LIMIT_PER_SECOND)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(_sampling)
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(config.LOG_LEVEL)
+    # uvicorn writes its own logs, access log included, synchronously
+    for name in ("uvicorn", "uvicorn.access"):
+        server_logger = logging.getLogger(name)
+        server_logger.handlers.clear()
+        server_logger.propagate = True
+    _listener.start()
+    # Write out what is still queued when the process exits
+    atexit.register(_listener.stop)
+
+
+def logging_info() -> Dict[str, Any]:
+    """
+    Report queue and sampling statistics
+
+    Returns:
+        Dict[str, Any]: Queued, dropped, sampled-out and rate-limited record
+        counts, or only configured=False before configure_logging
+    """
+    if _handler is None or _sampling is None:
+        return {"configured": False}
+    return {
+        "configured": True,
+        "queued": _handler.queue.qsize(),
+        "dropped": _handler.dropped,
+        "sampled_out": _sampling.sampled_out,
+        "rate_limited": _sampling.rate_limited,
+    }
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving each request an ID for log correlation
+
+    A valid X-Request-ID from the client (or a proxy) is kept, otherwise a
+    new one is generated; either way it is returned in the response.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if 0 < len(candidate) <= 128 and candidate.isprintable():
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        header = (REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1"))
+
+        async def send_with_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [header]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
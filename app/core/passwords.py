@@ -0,0 +1,212 @@
+import asyncio
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import Settings
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the password hashing queue is full
+    """
+
+
+class HashStats:
+    """
+    Thread-safe counters and timings of password hashing jobs
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+
+    def record(self, queued: float, hashed: float) -> None:
+        """
+        Record a finished job
+
+        Args:
+            queued (float): Seconds spent waiting for a worker
+            hashed (float): Seconds spent hashing
+        """
+        with self._lock:
+            self.completed += 1
+            self.queue_seconds += queued
+            self.max_queue_seconds = max(self.max_queue_seconds, queued)
+            self.hash_seconds += hashed
+            self.max_hash_seconds = max(self.max_hash_seconds, hashed)
+
+    def reject(self) -> None:
+        """Record a job refused because the queue was full"""
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a consistent copy of the counters
+
+        Returns:
+            Dict[str, Any]: Counts and average and maximum timings in milliseconds
+        """
+        with self._lock:
+            done = self.completed
+            return {
+                "completed": done,
+                "rejected": self.rejected,
+                "avg_queue_ms": round(self.queue_seconds / done * 1000, 2) if done else None,
+                "max_queue_ms": round(self.max_queue_seconds * 1000, 2),
+                "avg_hash_ms": round(self.hash_seconds / done * 1000, 2) if done else None,
+                "max_hash_ms": round(self.max_hash_seconds * 1000, 2),
+            }
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, size-limited thread pool
+
+    bcrypt releases the GIL, so the workers hash in parallel without
+    occupying the threadpool that serves sync routes and database calls.
+    At most workers + max_queue jobs are admitted; further jobs fail at
+    once with PasswordHasherBusy instead of piling up behind a login burst.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int):
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self.stats = HashStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._dummy_hash: Optional[str] = None
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.stats.reject()
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def job() -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.stats.record(started - submitted, time.perf_counter() - started)
+
+        def release(_: Future) -> None:
+            with self._lock:
+                self._pending -= 1
+
+        future = self._executor.submit(job)
+        future.add_done_callback(release)
+        return future
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password, blocking until a worker is done
+
+        Args:
+            password (str): Plain password
+
+        Returns:
+            str: Password hash
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        return self._submit(self.context.hash, password).result()
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Check a password against its hash, blocking until a worker is done
+
+        Args:
+            password (str): Plain password
+            password_hash (str): Stored hash
+
+        Returns:
+            bool: True if the password matches
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        return self._submit(self.context.verify, password, password_hash).result()
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def averify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password and rehash it if the stored hash is outdated
+
+        Args:
+            password (str): Plain password
+            password_hash (str): Stored hash
+
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the password matches, and a new
+            hash to store if the old one uses fewer rounds or another scheme
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        return await asyncio.wrap_future(
+            self._submit(self.context.verify_and_update, password, password_hash)
+        )
+
+    async def averify_dummy(self, password: str) -> None:
+        """
+        Spend the time of a verification without a stored hash
+
+        Used for unknown accounts, so response times do not reveal which
+        emails are registered.
+
+        Args:
+            password (str): Submitted password
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.ahash(secrets.token_urlsafe(16))
+        await asyncio.wrap_future(self._submit(self.context.verify, password, self._dummy_hash))
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Describe the pool and its counters
+
+        Returns:
+            Dict[str, Any]: Pool size, queue occupancy and statistics
+        """
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rounds": self.context.to_dict().get("bcrypt__rounds"),
+            **self.stats.snapshot(),
+        }
+
+
+def create_password_hasher(config: Settings) -> PasswordHasher:
+    """
+    Create the password hasher configured in settings
+
+    Args:
+        config (Settings): Settings providing the hashing options
+
+    Returns:
+        PasswordHasher: Password hasher
+    """
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
+    return PasswordHasher(context, workers=config.PASSWORD_HASH_WORKERS, max_queue=config.PASSWORD_HASH_QUEUE_SIZE)
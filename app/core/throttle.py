@@ -0,0 +1,320 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.core.config import Settings
+
+
+class ThrottleBackend(ABC):
+    """
+    Storage for rate-limiting counters
+
+    Counters use two algorithms: token buckets, which allow a burst and then
+    a steady rate, and sliding-window counters, which estimate the number
+    of events in the last window from the current and previous fixed
+    windows in O(1) space per key.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, capacity: float, per_second: float, now: float) -> float:
+        """
+        Take one token from a bucket
+
+        Args:
+            key (str): Bucket key
+            capacity (float): Bucket size, i.e. the allowed burst
+            per_second (float): Refill rate
+            now (float): Current Unix time
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+
+    @abstractmethod
+    async def count(self, key: str, window: float, now: float) -> float:
+        """
+        Estimate the number of events recorded in the last window
+
+        Args:
+            key (str): Counter key
+            window (float): Window length in seconds
+            now (float): Current Unix time
+
+        Returns:
+            float: Weighted event count
+        """
+
+    @abstractmethod
+    async def record(self, key: str, window: float, now: float) -> None:
+        """Record one event in a sliding-window counter"""
+
+    @abstractmethod
+    async def mark(self, key: str, ttl: float) -> None:
+        """Set a flag for ttl seconds"""
+
+    @abstractmethod
+    async def marked(self, key: str) -> bool:
+        """Check whether a flag is set"""
+
+
+def _sliding_estimate(previous: float, current: float, window: float, now: float) -> float:
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """
+    Per-process counters in LRU-bounded dictionaries
+
+    Only the event loop thread touches them, so no locking is needed. Each
+    key namespace (the part before the first colon) holds up to max_keys
+    counters and forgets its least recently used ones beyond that, so
+    spraying one kind of key cannot evict another.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._states: Dict[str, "OrderedDict[str, List[float]]"] = {}
+
+    def _namespace(self, key: str) -> "OrderedDict[str, List[float]]":
+        return self._states.setdefault(key.split(":", 1)[0], OrderedDict())
+
+    def _get(self, key: str) -> Optional[List[float]]:
+        states = self._namespace(key)
+        state = states.get(key)
+        if state is not None:
+            states.move_to_end(key)
+        return state
+
+    def _put(self, key: str, state: List[float]) -> None:
+        states = self._namespace(key)
+        states[key] = state
+        states.move_to_end(key)
+        while len(states) > self.max_keys:
+            states.popitem(last=False)
+
+    async def take(self, key: str, capacity: float, per_second: float, now: float) -> float:
+        state = self._get(key)
+        tokens, updated = (capacity, now) if state is None else state
+        tokens = min(capacity, tokens + (now - updated) * per_second)
+        if tokens < 1:
+            self._put(key, [tokens, now])
+            return (1 - tokens) / per_second
+        self._put(key, [tokens - 1, now])
+        return 0.0
+
+    def _window_counts(self, key: str, window: float, now: float) -> List[float]:
+        # [window index, previous window count, current window count]
+        index = math.floor(now / window)
+        state = self._get(key)
+        if state is None or state[0] < index - 1:
+            return [index, 0, 0]
+        if state[0] == index - 1:
+            return [index, state[2], 0]
+        return list(state)
+
+    async def count(self, key: str, window: float, now: float) -> float:
+        _, previous, current = self._window_counts(key, window, now)
+        return _sliding_estimate(previous, current, window, now)
+
+    async def record(self, key: str, window: float, now: float) -> None:
+        state = self._window_counts(key, window, now)
+        state[2] += 1
+        self._put(key, state)
+
+    async def mark(self, key: str, ttl: float) -> None:
+        self._put(key, [time.time() + ttl])
+
+    async def marked(self, key: str) -> bool:
+        state = self._get(key)
+        return state is not None and state[0] > time.time()
+
+
+# KEYS[1] bucket; ARGV: capacity, per_second, now. Returns milliseconds to wait.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = math.ceil((1 - tokens) / rate * 1000)
+else
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return wait
+"""
+
+
+class RedisThrottleBackend(ThrottleBackend):
+    """
+    Counters in Redis, shared by all workers
+
+    Token buckets are updated by a Lua script so concurrent workers cannot
+    both take the last token.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "", client: Any = None):
+        if client is None:
+            try:
+                import redis.asyncio
+            except ImportError as e:
+                raise RuntimeError("The redis package is required for the redis throttle backend") from e
+            client = redis.asyncio.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: float, per_second: float, now: float) -> float:
+        wait = await self._take(keys=[self.prefix + key], args=[capacity, per_second, now])
+        return int(wait) / 1000
+
+    async def count(self, key: str, window: float, now: float) -> float:
+        index = math.floor(now / window)
+        previous, current = await self.client.mget(
+            f"{self.prefix}{key}:{index - 1}", f"{self.prefix}{key}:{index}"
+        )
+        return _sliding_estimate(int(previous or 0), int(current or 0), window, now)
+
+    async def record(self, key: str, window: float, now: float) -> None:
+        name = f"{self.prefix}{key}:{math.floor(now / window)}"
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.incr(name)
+            pipe.pexpire(name, int(window * 2000))
+            await pipe.execute()
+
+    async def mark(self, key: str, ttl: float) -> None:
+        await self.client.set(self.prefix + key, b"1", px=int(ttl * 1000))
+
+    async def marked(self, key: str) -> bool:
+        return bool(await self.client.exists(self.prefix + key))
+
+
+class LoginThrottle:
+    """
+    Throttling of password logins, checked before any password is hashed
+
+    Three limits apply:
+
+    - a token bucket per client IP, charged for every attempt;
+    - a sliding-window limit on failures per account and IP;
+    - a higher sliding-window limit on failures per account from all IPs,
+      which locks the account against distributed guessing.
+
+    The account-wide lock does not apply to IPs the account logged in from
+    successfully before, so its owner can still log in during an attack.
+    """
+
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        ip_burst: int,
+        ip_per_minute: float,
+        max_failures: int,
+        lock_failures: int,
+        window: float,
+        trusted_ttl: float,
+    ):
+        self.backend = backend
+        self.ip_burst = ip_burst
+        self.ip_per_second = ip_per_minute / 60
+        self.max_failures = max_failures
+        self.lock_failures = lock_failures
+        self.window = window
+        self.trusted_ttl = trusted_ttl
+        self.rejected = 0
+
+    @staticmethod
+    def _account(email: str) -> str:
+        return email.strip().lower()
+
+    async def check(self, email: str, ip: str) -> Optional[float]:
+        """
+        Admit or reject a login attempt
+
+        Args:
+            email (str): Submitted email
+            ip (str): Client IP address
+
+        Returns:
+            Optional[float]: None if the attempt may proceed, otherwise seconds
+            the client should wait
+        """
+        now = time.time()
+        account = self._account(email)
+        retry_after = await self.backend.take(f"ip:{ip}", self.ip_burst, self.ip_per_second, now)
+        if not retry_after:
+            next_window = self.window - now % self.window
+            if await self.backend.count(f"fail:{account}:{ip}", self.window, now) >= self.max_failures:
+                retry_after = next_window
+            elif (
+                await self.backend.count(f"fail:{account}", self.window, now) >= self.lock_failures
+                and not await self.backend.marked(f"trusted:{account}:{ip}")
+            ):
+                retry_after = next_window
+        if retry_after:
+            self.rejected += 1
+            return retry_after
+        return None
+
+    async def record_failure(self, email: str, ip: str) -> None:
+        """
+        Count a failed login against the account
+
+        Args:
+            email (str): Submitted email
+            ip (str): Client IP address
+        """
+        now = time.time()
+        account = self._account(email)
+        await self.backend.record(f"fail:{account}:{ip}", self.window, now)
+        await self.backend.record(f"fail:{account}", self.window, now)
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.backend.__class__.__name__, "rejected": self.rejected}
+
+    async def record_success(self, email: str, ip: str) -> None:
+        """
+        Remember the IP as one the account's owner logs in from
+
+        Args:
+            email (str): Submitted email
+            ip (str): Client IP address
+        """
+        await self.backend.mark(f"trusted:{self._account(email)}:{ip}", self.trusted_ttl)
+
+
+def create_login_throttle(config: Settings) -> Optional[LoginThrottle]:
+    """
+    Create the login throttle configured in settings
+
+    Counters are shared through Redis when that is the cache backend.
+
+    Args:
+        config (Settings): Settings providing the throttling options
+
+    Returns:
+        Optional[LoginThrottle]: Login throttle, or None if disabled
+    """
+    if not config.LOGIN_THROTTLE_ENABLED:
+        return None
+    if config.CACHE_BACKEND.lower() == "redis":
+        backend: ThrottleBackend = RedisThrottleBackend(url=config.REDIS_URL, prefix="ravamet:throttle:")
+    else:
+        backend = MemoryThrottleBackend(max_keys=config.LOGIN_THROTTLE_MAX_KEYS)
+    return LoginThrottle(
+        backend,
+        ip_burst=config.LOGIN_IP_BURST,
+        ip_per_minute=config.LOGIN_IP_PER_MINUTE,
+        max_failures=config.LOGIN_MAX_FAILURES,
+        lock_failures=config.LOGIN_ACCOUNT_LOCK_FAILURES,
+        window=config.LOGIN_FAILURE_WINDOW_SECONDS,
+        trusted_ttl=config.LOGIN_TRUSTED_IP_DAYS * 86400,
+    )
@@ -0,0 +1,159 @@
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from jose import JWTError, jwt
+
+from app.core.cache import CacheBackend, MemoryCache, RedisCache
+from app.core.config import Settings
+
+
+class TokenClaims(NamedTuple):
+    """
+    Verified claims of an access token
+    """
+    subject: str
+    jti: Optional[str]
+    issued_at: float
+    expires_at: float
+
+
+class TokenVerifier:
+    """
+    Verifies access tokens, remembering the claims of recently seen ones
+
+    A token is only decoded and its signature checked the first time it is
+    seen; the claims are then served from an in-process LRU cache until the
+    token expires. Revocation is checked separately on every request.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str, max_size: int):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.cache = MemoryCache(max_size=max_size, ttl=0)
+
+    def verify(self, token: str) -> TokenClaims:
+        """
+        Verify a token and return its claims
+
+        Args:
+            token (str): Encoded JWT
+
+        Returns:
+            TokenClaims: Subject, token ID, issue and expiry times
+
+        Raises:
+            JWTError: If the token is malformed, forged, expired or has no subject
+        """
+        claims = self.cache.get(token)
+        if claims is not None:
+            return claims
+        payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        if payload.get("sub") is None or payload.get("exp") is None:
+            raise JWTError("Token has no subject or expiry")
+        claims = TokenClaims(
+            subject=str(payload["sub"]),
+            jti=payload.get("jti"),
+            issued_at=float(payload.get("iat", 0)),
+            expires_at=float(payload["exp"]),
+        )
+        self.cache.set(token, claims, ttl=claims.expires_at - time.time())
+        return claims
+
+
+class RevocationList:
+    """
+    Denylist of revoked tokens, by token ID (logout) or by subject (ban)
+
+    Revoking a subject rejects every token issued to it up to that moment.
+    Entries live only as long as the tokens they reject could still be valid,
+    so the list stays as small as the number of recent revocations. They are
+    never evicted before that: a store with no room left makes revoking
+    raise CacheFullError instead of silently un-revoking older tokens.
+    """
+
+    def __init__(self, store: CacheBackend, token_lifetime: float):
+        self.store = store
+        self.token_lifetime = token_lifetime
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        """
+        Revoke a single token until it expires
+
+        Args:
+            jti (str): Token ID
+            expires_at (float): Token expiry as a Unix timestamp
+        """
+        self.store.set(f"jti:{jti}", True, ttl=expires_at - time.time())
+
+    def revoke_subject(self, subject: str) -> None:
+        """
+        Revoke every token issued to a subject so far
+
+        Args:
+            subject (str): Token subject (user ID)
+        """
+        # iat has one-second resolution, so tokens issued in the same second
+        # as the revocation are rejected too
+        self.store.set(f"sub:{subject}", {"before": time.time()}, ttl=self.token_lifetime)
+
+    async def arevoke_token(self, jti: str, expires_at: float) -> None:
+        await self.store.aset(f"jti:{jti}", True, ttl=expires_at - time.time())
+
+    async def arevoke_subject(self, subject: str) -> None:
+        await self.store.aset(f"sub:{subject}", {"before": time.time()}, ttl=self.token_lifetime)
+
+    def _revoked(self, claims: TokenClaims, by_jti: Any, by_subject: Any) -> bool:
+        if claims.jti is not None and by_jti:
+            return True
+        return by_subject is not None and claims.issued_at <= by_subject["before"]
+
+    def is_revoked(self, claims: TokenClaims) -> bool:
+        """
+        Check whether a token was revoked
+
+        Args:
+            claims (TokenClaims): Verified token claims
+
+        Returns:
+            bool: True if the token must be rejected
+        """
+        by_jti = self.store.get(f"jti:{claims.jti}") if claims.jti is not None else None
+        return self._revoked(claims, by_jti, self.store.get(f"sub:{claims.subject}"))
+
+    async def ais_revoked(self, claims: TokenClaims) -> bool:
+        by_jti = await self.store.aget(f"jti:{claims.jti}") if claims.jti is not None else None
+        return self._revoked(claims, by_jti, await self.store.aget(f"sub:{claims.subject}"))
+
+    def info(self) -> Dict[str, Any]:
+        return self.store.info()
+
+
+def create_revocation_list(config: Settings) -> RevocationList:
+    """
+    Create the revocation list, shared through Redis when that is the cache backend
+
+    Unlike the caches it is never disabled: CACHE_BACKEND=none still keeps
+    revocations in process memory. Every worker checks every request against
+    the list, so a process-local list is refused when WEB_CONCURRENCY says
+    there are several workers: a logout would only apply in one of them.
+
+    Args:
+        config (Settings): Settings providing the cache and token options
+
+    Returns:
+        RevocationList: Revocation list
+
+    Raises:
+        ValueError: If several workers would each keep a list of their own
+    """
+    lifetime = config.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    if config.CACHE_BACKEND.lower() == "redis":
+        store: CacheBackend = RedisCache(ttl=lifetime, url=config.REDIS_URL, prefix="ravamet:revoked:")
+    elif config.WEB_CONCURRENCY > 1:
+        raise ValueError(
+            f"WEB_CONCURRENCY={config.WEB_CONCURRENCY} requires CACHE_BACKEND=redis, "
+            "so that token revocations reach every worker"
+        )
+    else:
+        store = MemoryCache(max_size=config.TOKEN_REVOCATION_MAX_SIZE, ttl=lifetime, evict=False)
+    return RevocationList(store, lifetime)
@@ -1,10 +1,33 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, Index, UniqueConstraint
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import enum
 
+from app.db.search import register_search_ddl
+
 Base = declarative_base()
 
+# SQLite fills server defaults with CURRENT_TIMESTAMP, which has no fractional
+# seconds; bind timestamps in the same format so they compare correctly
+# against stored values (e.g. in keyset pagination).
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
+
+def version_column() -> Column:
+    """
+    Counter bumped by every UPDATE of the row, ORM or bulk
+
+    Unlike the updated timestamp it changes even for edits within the same
+    second, so it can back strong HTTP validators (ETags).
+    """
+    return Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
+
 
 class UserStatus(enum.Enum):
     CREATED = "created"
@@ -13,6 +36,9 @@ class UserStatus(enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_id", "created", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -22,11 +48,23 @@ class User(Base):
     patronymic = Column(String)
     cv_text = Column(Text)
     password = Column(String, nullable=False)
-    created = Column(DateTime(timezone=True), server_default=func.now())
-    updated = Column(DateTime(timezone=True), onupdate=func.now())
+    created = Column(Timestamp, server_default=func.now())
+    updated = Column(Timestamp, onupdate=func.now())
     status = Column(Enum(UserStatus), default=UserStatus.CREATED, nullable=False)
 
 
+# One row per login session. Refreshing replaces token_hash, so the row
+# always holds the only refresh token of its session that is still valid.
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False)
+    created = Column(Timestamp, server_default=func.now())
+    expires = Column(Timestamp, nullable=False)
+
+
 class ResponseStatus(enum.Enum):
     CREATED = "created"
     VIEWED = "viewed"
@@ -36,13 +74,29 @@ class ResponseStatus(enum.Enum):
 
 class Response(Base):
     __tablename__ = "responses"
+    __table_args__ = (
+        UniqueConstraint("user_id", "vacancy_id", name="uq_responses_user_vacancy"),
+        Index(
+            "ix_responses_vacancy_status_created",
+            "vacancy_id", "status", "created",
+            postgresql_include=["user_id"],
+        ),
+        Index(
+            "ix_responses_user_status",
+            "user_id", "status",
+            postgresql_include=["vacancy_id", "created"],
+        ),
+        Index("ix_responses_vacancy_created_id", "vacancy_id", "created", "id"),
+        Index("ix_responses_user_created_id", "user_id", "created", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     vacancy_id = Column(Integer, ForeignKey("vacancies.id"), nullable=False)
-    created = Column(DateTime(timezone=True), server_default=func.now())
-    updated = Column(DateTime(timezone=True), onupdate=func.now())
+    created = Column(Timestamp, server_default=func.now())
+    updated = Column(Timestamp, onupdate=func.now())
     status = Column(Enum(ResponseStatus), default=ResponseStatus.CREATED, nullable=False)
+    version = version_column()
 
 
 class VacancyStatus(enum.Enum):
@@ -54,12 +108,55 @@ class VacancyStatus(enum.Enum):
 
 class Vacancy(Base):
     __tablename__ = "vacancies"
+    __table_args__ = (
+        Index("ix_vacancies_status_salary", "status", "salary"),
+        Index("ix_vacancies_created_id", "created", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
     salary = Column(Float)
     short_description = Column(String, nullable=False)
     full_description = Column(Text)
-    created = Column(DateTime(timezone=True), server_default=func.now())
-    updated = Column(DateTime(timezone=True), onupdate=func.now())
+    created = Column(Timestamp, server_default=func.now())
+    updated = Column(Timestamp, onupdate=func.now())
     status = Column(Enum(VacancyStatus), default=VacancyStatus.CREATED, nullable=False)
+    version = version_column()
+
+
+register_search_ddl(Vacancy.__table__)
+
+
+# Cold storage for closed and deleted vacancies and their responses, filled
+# by the archival job (app/services/archive.py). Rows keep their original IDs.
+class ArchivedVacancy(Base):
+    __tablename__ = "vacancies_archive"
+    __table_args__ = (
+        Index("ix_vacancies_archive_archived", "archived"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    salary = Column(Float)
+    short_description = Column(String, nullable=False)
+    full_description = Column(Text)
+    created = Column(Timestamp)
+    updated = Column(Timestamp)
+    status = Column(Enum(VacancyStatus), nullable=False)
+    archived = Column(Timestamp, server_default=func.now(), nullable=False)
+
+
+class ArchivedResponse(Base):
+    __tablename__ = "responses_archive"
+    __table_args__ = (
+        Index("ix_responses_archive_vacancy_created_id", "vacancy_id", "created", "id"),
+        Index("ix_responses_archive_user_id", "user_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    vacancy_id = Column(Integer, nullable=False)
+    created = Column(Timestamp)
+    updated = Column(Timestamp)
+    status = Column(Enum(ResponseStatus), nullable=False)
+    archived = Column(Timestamp, server_default=func.now(), nullable=False)
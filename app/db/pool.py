@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters for connection pool checkout wait times
+    """
+
+    def __init__(self, slow_checkout_ms: float = 100.0):
+        self.slow_checkout_ms = slow_checkout_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters"""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.slow_checkouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record_checkout(self, wait: float) -> None:
+        """
+        Record a successful checkout
+
+        Args:
+            wait (float): Time spent waiting for a connection, in seconds
+        """
+        wait_ms = wait * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+            if wait_ms >= self.slow_checkout_ms:
+                self.slow_checkouts += 1
+        if wait_ms >= self.slow_checkout_ms:
+            logger.warning("Slow connection pool checkout: %.1f ms", wait_ms)
+
+    def record_timeout(self, wait: float) -> None:
+        """
+        Record a checkout that gave up waiting for a connection
+
+        Args:
+            wait (float): Time spent waiting before the timeout, in seconds
+        """
+        with self._lock:
+            self.timeouts += 1
+        logger.error("Connection pool checkout timed out after %.1f ms", wait * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of the current counters
+
+        Returns:
+            Dict[str, Any]: Checkout counts and wait times in milliseconds
+        """
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class TimedPoolMixin:
+    """
+    Pool mixin that reports how long each checkout waited for a connection
+    """
+
+    def __init__(self, *args, metrics: PoolMetrics = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    """
+    QueuePool with checkout wait metrics
+    """
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool with checkout wait metrics, used by async engines
+    """
@@ -0,0 +1,177 @@
+import itertools
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Session.info key set once a session has written; later reads stay on the
+# primary so a request always sees its own writes
+WROTE_KEY = "routing_wrote"
+# Session.info key to send every statement of a session to the primary
+USE_PRIMARY_KEY = "routing_use_primary"
+# Execution option sending one SELECT to the primary, for reads that must not lag
+READ_PRIMARY_OPTION = "routing_read_primary"
+
+# Replication delay of a PostgreSQL standby; zero on a primary and on a
+# standby that has replayed everything it received
+POSTGRESQL_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """
+    A read replica with its sync and async engines and last known health
+    """
+
+    def __init__(self, engine: Engine, async_engine: AsyncEngine):
+        self.engine = engine
+        self.async_engine = async_engine
+        self.lag: Optional[float] = None
+        self.healthy = True
+        self.error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def measure_lag(self) -> Optional[float]:
+        """
+        Query the replica for its replication lag
+
+        Returns:
+            Optional[float]: Lag in seconds, or None if the backend cannot report it
+        """
+        with self.engine.connect() as connection:
+            if self.engine.dialect.name == "postgresql":
+                return float(connection.execute(POSTGRESQL_LAG_SQL).scalar_one())
+            connection.execute(text("SELECT 1"))
+            return None
+
+
+class ReplicaSet:
+    """
+    Read replicas in round-robin rotation, skipping any that lag behind
+    the primary or cannot be reached
+    """
+
+    def __init__(self, replicas: List[Replica], max_lag: float = 5.0):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Pick the replica for the next read
+
+        Returns:
+            Optional[Replica]: A healthy replica, or None to read from the primary
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def check(self) -> None:
+        """
+        Measure every replica's lag and take lagging or unreachable ones out
+        of rotation until they catch up
+        """
+        with self._lock:
+            for replica in self.replicas:
+                try:
+                    lag = replica.measure_lag()
+                except Exception as e:
+                    replica.lag, replica.healthy, replica.error = None, False, str(e)
+                    logger.warning("Read replica %s is unreachable: %s", replica.name, e)
+                    continue
+                healthy = lag is None or lag <= self.max_lag
+                if replica.healthy and not healthy:
+                    logger.warning(
+                        "Read replica %s lags %.1f s behind the primary, reading from the primary",
+                        replica.name, lag,
+                    )
+                elif healthy and not replica.healthy:
+                    logger.info("Read replica %s is back in rotation", replica.name)
+                replica.lag, replica.healthy, replica.error = lag, healthy, None
+
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Report the last measured state of every replica
+
+        Returns:
+            List[Dict[str, Any]]: Name, lag in seconds and health per replica
+        """
+        return [
+            {"name": replica.name, "lag": replica.lag, "healthy": replica.healthy, "error": replica.error}
+            for replica in self.replicas
+        ]
+
+    def dispose_after_fork(self) -> None:
+        """
+        Drop pooled connections inherited from the parent process without
+        closing the parent's sockets
+        """
+        for replica in self.replicas:
+            replica.engine.dispose(close=False)
+            replica.async_engine.sync_engine.dispose(close=False)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica and everything else to the primary
+
+    A session reads from the primary once it has written (read-your-writes),
+    inside flushes, for SELECT ... FOR UPDATE, for statements with the
+    READ_PRIMARY_OPTION execution option, and when USE_PRIMARY_KEY is set in
+    session.info.
+    """
+
+    # Route to the replicas' async engines, for use as an AsyncSession's sync_session_class
+    use_async_engines = False
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def _reads_from_primary(self, clause: Any) -> bool:
+        if self._flushing or self.info.get(WROTE_KEY) or self.info.get(USE_PRIMARY_KEY):
+            return True
+        if not isinstance(clause, Select):
+            # DML, DDL and textual statements may write
+            if clause is not None:
+                self.info[WROTE_KEY] = True
+            return True
+        return clause._for_update_arg is not None or bool(clause.get_execution_options().get(READ_PRIMARY_OPTION))
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kw: Any) -> Any:
+        if self.replicas and not self._reads_from_primary(clause):
+            replica = self.replicas.choose()
+            if replica is not None:
+                return replica.async_engine.sync_engine if self.use_async_engines else replica.engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class AsyncRoutingSession(RoutingSession):
+    """
+    RoutingSession for use behind an AsyncSession
+    """
+
+    use_async_engines = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_wrote(session: Session, flush_context: Any) -> None:
+    session.info[WROTE_KEY] = True
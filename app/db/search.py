@@ -0,0 +1,67 @@
+from typing import List
+
+from sqlalchemy import DDL, Table, event
+
+# Weighted full-text document for a vacancy on PostgreSQL. Every field is
+# indexed with both the Russian and the English configuration so either
+# language is stemmed. The GIN index is an expression index over exactly
+# this text: queries must use it verbatim for the planner to pick the index,
+# and changing it requires a migration that rebuilds the index.
+VACANCY_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(full_description, '')), 'C') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(full_description, '')), 'C')"
+)
+
+VACANCY_SEARCH_INDEX = "ix_vacancies_search"
+
+# SQLite fallback: an external-content FTS5 table kept in sync by triggers
+VACANCY_FTS_TABLE = "vacancies_fts"
+VACANCY_FTS_COLUMNS = ("name", "short_description", "full_description")
+# bm25 weights per FTS column, mirroring the A/B/C weights above
+VACANCY_FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+_FTS_COLUMNS = ", ".join(VACANCY_FTS_COLUMNS)
+_NEW_VALUES = ", ".join(f"new.{name}" for name in VACANCY_FTS_COLUMNS)
+_OLD_VALUES = ", ".join(f"old.{name}" for name in VACANCY_FTS_COLUMNS)
+
+POSTGRESQL_SEARCH_DDL: List[str] = [
+    f"CREATE INDEX IF NOT EXISTS {VACANCY_SEARCH_INDEX} ON vacancies "
+    f"USING gin (({VACANCY_SEARCH_DOCUMENT}))",
+]
+
+SQLITE_SEARCH_DDL: List[str] = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {VACANCY_FTS_TABLE} USING fts5("
+    f"{_FTS_COLUMNS}, content='vacancies', content_rowid='id', "
+    f"tokenize='porter unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {VACANCY_FTS_TABLE}_ai AFTER INSERT ON vacancies BEGIN "
+    f"INSERT INTO {VACANCY_FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_NEW_VALUES}); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {VACANCY_FTS_TABLE}_ad AFTER DELETE ON vacancies BEGIN "
+    f"INSERT INTO {VACANCY_FTS_TABLE}({VACANCY_FTS_TABLE}, rowid, {_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {_OLD_VALUES}); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {VACANCY_FTS_TABLE}_au AFTER UPDATE OF {_FTS_COLUMNS} ON vacancies BEGIN "
+    f"INSERT INTO {VACANCY_FTS_TABLE}({VACANCY_FTS_TABLE}, rowid, {_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {_OLD_VALUES}); "
+    f"INSERT INTO {VACANCY_FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_NEW_VALUES}); "
+    f"END",
+    f"INSERT INTO {VACANCY_FTS_TABLE}({VACANCY_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def register_search_ddl(table: Table) -> None:
+    """
+    Create the full-text search structures whenever the vacancies table is
+    created through metadata.create_all (tests, benchmarks, scratch databases)
+
+    Args:
+        table (Table): The vacancies table
+    """
+    for statement in POSTGRESQL_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -1,26 +1,268 @@
+from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from typing import Any, AsyncIterator, Dict, Optional, Type, Union
 import os
 
-from app.core.config import settings
+from app.core.config import settings, Settings
+from app.db.pool import PoolMetrics, TimedAsyncAdaptedQueuePool, TimedPoolMixin, TimedQueuePool
+from app.db.routing import AsyncRoutingSession, Replica, ReplicaSet, RoutingSession
+from app.db.sqlite import configure_sqlite_engine
+from app.db.unit_of_work import aend_unit_of_work, begin_unit_of_work, end_unit_of_work, leave_unit_of_work
 
-# Использовать SQLite для тестирования
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ravamet.db"
+# Async drivers used when deriving the async URL from the sync one
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Только для SQLite
+
+def get_async_database_url(url: URL) -> URL:
+    """
+    Convert a database URL to use the backend's async driver
+
+    Args:
+        url (URL): Database URL, possibly with a sync driver
+
+    Returns:
+        URL: Database URL with an async driver
+    """
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def _engine_kwargs(url: URL, config: Settings, poolclass: Type[TimedPoolMixin]) -> Dict[str, Any]:
+    """
+    Build engine keyword arguments shared by the sync and async engines
+
+    Args:
+        url (URL): Database URL
+        config (Settings): Settings providing the pool options
+        poolclass (Type[TimedPoolMixin]): Pool class for pooled connections
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for create_engine/create_async_engine
+    """
+    engine_kwargs: Dict[str, Any] = {"echo": config.DB_ECHO}
+
+    if url.get_backend_name() == "sqlite":
+        # Pooled connections are handed between threadpool threads, but each
+        # is only used by one thread at a time. The sqlite3 timeout is the
+        # busy timeout used before the connect-time pragmas have run.
+        engine_kwargs["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases live inside a single connection
+            engine_kwargs["poolclass"] = StaticPool
+            return engine_kwargs
+        # Local file connections do not go stale: skip pings and recycling.
+        # With WAL, pooled connections read concurrently while writers queue
+        # on the busy timeout.
+        engine_kwargs.update(
+            poolclass=poolclass,
+            pool_size=config.SQLITE_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_pre_ping=False,
+            pool_recycle=-1,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_use_lifo=True,
+        )
+        return engine_kwargs
+
+    engine_kwargs.update(
+        poolclass=poolclass,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_use_lifo=True,
+    )
+    return engine_kwargs
+
+
+def _attach_pool_metrics(pool: Any, config: Settings) -> None:
+    if isinstance(pool, TimedPoolMixin):
+        pool.metrics = PoolMetrics(slow_checkout_ms=config.DB_POOL_SLOW_CHECKOUT_MS)
+
+
+def create_db_engine(config: Settings = settings, database_url: Optional[str] = None) -> Engine:
+    """
+    Create a database engine configured from settings
+
+    Args:
+        config (Settings): Settings providing the database URL and pool options
+        database_url (Optional[str]): URL to connect to instead of the primary database
+
+    Returns:
+        Engine: Configured SQLAlchemy engine
+    """
+    url = make_url(database_url or config.get_database_url())
+    engine = create_engine(url, **_engine_kwargs(url, config, TimedQueuePool))
+    _attach_pool_metrics(engine.pool, config)
+    if url.get_backend_name() == "sqlite":
+        configure_sqlite_engine(engine, config)
+    return engine
+
+
+def create_async_db_engine(config: Settings = settings, database_url: Optional[str] = None) -> AsyncEngine:
+    """
+    Create an async database engine configured from settings
+
+    Args:
+        config (Settings): Settings providing the database URL and pool options
+        database_url (Optional[str]): URL to connect to instead of the primary database
+
+    Returns:
+        AsyncEngine: Configured SQLAlchemy async engine
+    """
+    url = get_async_database_url(make_url(database_url or config.get_database_url()))
+    engine = create_async_engine(url, **_engine_kwargs(url, config, TimedAsyncAdaptedQueuePool))
+    _attach_pool_metrics(engine.pool, config)
+    if url.get_backend_name() == "sqlite":
+        configure_sqlite_engine(engine.sync_engine, config)
+    return engine
+
+
+def get_pool_stats(db_engine: Union[Engine, AsyncEngine] = None) -> Dict[str, Any]:
+    """
+    Get connection pool usage and checkout wait statistics
+
+    Args:
+        db_engine (Union[Engine, AsyncEngine]): Engine to inspect, defaults to the application engine
+
+    Returns:
+        Dict[str, Any]: Pool status and checkout metrics
+    """
+    db_engine = db_engine or engine
+    pool = db_engine.pool
+    stats: Dict[str, Any] = {"pool": pool.__class__.__name__}
+    if isinstance(pool, TimedPoolMixin):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            checked_in=pool.checkedin(),
+        )
+        stats.update(pool.metrics.snapshot())
+    return stats
+
+
+def create_replica_set(config: Settings = settings) -> ReplicaSet:
+    """
+    Create engines for the read replicas configured in settings
+
+    Args:
+        config (Settings): Settings providing the replica URLs and lag limit
+
+    Returns:
+        ReplicaSet: Replicas to route reads to; empty if none are configured
+    """
+    replicas = [
+        Replica(create_db_engine(config, url), create_async_db_engine(config, url))
+        for url in config.DATABASE_REPLICA_URLS
+    ]
+    return ReplicaSet(replicas, max_lag=config.DB_REPLICA_MAX_LAG_SECONDS)
+
+
+def _dispose_engine_after_fork() -> None:
+    # Connections inherited from the parent process must not be reused by
+    # the child; drop them without closing the parent's sockets.
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    replicas.dispose_after_fork()
+
+
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+replicas = create_replica_set()
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    # Writes return their rows with RETURNING; expiring them on commit would
+    # only reload the same values with another SELECT
+    expire_on_commit=False,
+    bind=engine,
+    replicas=replicas,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=AsyncRoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+    replicas=replicas,
+)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engine_after_fork)
 
 Base = declarative_base()
 
 
-# Dependency для FastAPI
+# Dependency для FastAPI: one transaction per request, committed at the end
 def get_db():
     db = SessionLocal()
+    begin_unit_of_work(db)
     try:
         yield db
+    except BaseException:
+        end_unit_of_work(db, failed=True)
+        raise
+    else:
+        end_unit_of_work(db)
     finally:
         db.close()
+
+
+# Async dependency для FastAPI
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        begin_unit_of_work(db)
+        try:
+            yield db
+        except BaseException:
+            await aend_unit_of_work(db, failed=True)
+            raise
+        await aend_unit_of_work(db)
+
+
+def autocommit_db(db: Session = Depends(get_db)) -> Session:
+    """
+    Opt a request out of the unit of work, so its services commit as they go
+
+    For long-running requests, and for writes that must persist even when
+    the request fails. Add it to the route's dependencies.
+
+    Args:
+        db (Session): Database session of the request
+
+    Returns:
+        Session: The same session
+    """
+    leave_unit_of_work(db)
+    return db
+
+
+async def autocommit_async_db(db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    """
+    Async version of autocommit_db
+
+    Args:
+        db (AsyncSession): Database session of the request
+
+    Returns:
+        AsyncSession: The same session
+    """
+    leave_unit_of_work(db)
+    return db
@@ -0,0 +1,94 @@
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Pragmas read back by the startup self-check
+CHECKED_PRAGMAS = ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size")
+
+_SYNCHRONOUS_LEVELS = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+
+
+def sqlite_pragmas(config: Settings) -> Dict[str, Any]:
+    """
+    Build the pragmas applied to every new SQLite connection
+
+    Args:
+        config (Settings): Settings providing the SQLite options
+
+    Returns:
+        Dict[str, Any]: Pragma names and values, in the order they are applied
+    """
+    return {
+        # busy_timeout first, so switching the journal mode waits for other
+        # connections instead of failing
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        # WAL lets readers run while a writer commits; NORMAL only syncs at
+        # checkpoints, which is durable against application crashes
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -config.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    }
+
+
+def configure_sqlite_engine(engine: Engine, config: Settings) -> None:
+    """
+    Apply the SQLite pragmas whenever the engine opens a connection
+
+    Args:
+        engine (Engine): SQLite engine; for async engines pass engine.sync_engine
+        config (Settings): Settings providing the SQLite options
+    """
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def check_sqlite_pragmas(engine: Engine, config: Settings) -> Dict[str, Any]:
+    """
+    Read the effective pragmas of a pooled connection and log them, warning
+    about settings that did not take effect
+
+    Args:
+        engine (Engine): SQLite engine
+        config (Settings): Settings holding the requested values
+
+    Returns:
+        Dict[str, Any]: Effective pragma values
+    """
+    with engine.connect() as connection:
+        effective = {
+            name: connection.execute(text(f"PRAGMA {name}")).scalar()
+            for name in CHECKED_PRAGMAS
+        }
+    effective["synchronous"] = _SYNCHRONOUS_LEVELS.get(effective["synchronous"], effective["synchronous"])
+
+    logger.info(
+        "SQLite %s: %s",
+        engine.url.database,
+        ", ".join(f"{name}={value}" for name, value in effective.items()),
+    )
+    if str(effective["journal_mode"]).lower() != config.SQLITE_JOURNAL_MODE.lower():
+        # e.g. in-memory databases, or file systems without shared memory support
+        logger.warning(
+            "SQLite journal_mode is %s instead of %s; concurrent writers may see 'database is locked'",
+            effective["journal_mode"], config.SQLITE_JOURNAL_MODE,
+        )
+    if effective["synchronous"] != config.SQLITE_SYNCHRONOUS.upper():
+        logger.warning("SQLite synchronous is %s instead of %s", effective["synchronous"], config.SQLITE_SYNCHRONOUS)
+    return effective
@@ -0,0 +1,187 @@
+import logging
+from typing import Any, Awaitable, Callable, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Session.info key set while a request-scoped unit of work owns the
+# transaction: services flush their writes and the request commits once
+UNIT_OF_WORK_KEY = "unit_of_work"
+# Session.info key set when a service abandoned a write; the unit of work
+# then rolls back instead of committing the rest of the request
+ROLLBACK_ONLY_KEY = "unit_of_work_rollback_only"
+# Session.info key holding callbacks to run once the unit of work commits
+AFTER_COMMIT_KEY = "unit_of_work_after_commit"
+
+
+def in_unit_of_work(db: Union[Session, AsyncSession]) -> bool:
+    """
+    Check whether a request-scoped unit of work owns the session's transaction
+
+    Args:
+        db (Union[Session, AsyncSession]): Database session
+
+    Returns:
+        bool: True if commits are deferred to the end of the request
+    """
+    return bool(db.info.get(UNIT_OF_WORK_KEY))
+
+
+def begin_unit_of_work(db: Union[Session, AsyncSession]) -> None:
+    """
+    Defer the session's commits to end_unit_of_work
+
+    Args:
+        db (Union[Session, AsyncSession]): Database session
+    """
+    db.info[UNIT_OF_WORK_KEY] = True
+
+
+def leave_unit_of_work(db: Union[Session, AsyncSession]) -> None:
+    """
+    Let services commit as they go again, for long-running requests
+
+    Must be called before the request writes anything.
+
+    Args:
+        db (Union[Session, AsyncSession]): Database session
+    """
+    db.info[UNIT_OF_WORK_KEY] = False
+
+
+def commit(db: Session) -> None:
+    """
+    Commit, or only flush when a unit of work commits later
+
+    Args:
+        db (Session): Database session
+    """
+    if in_unit_of_work(db):
+        db.flush()
+    else:
+        db.commit()
+
+
+async def acommit(db: AsyncSession) -> None:
+    """
+    Async version of commit
+
+    Args:
+        db (AsyncSession): Database session
+    """
+    if in_unit_of_work(db):
+        await db.flush()
+    else:
+        await db.commit()
+
+
+def rollback(db: Session) -> None:
+    """
+    Roll back, or make the unit of work roll back instead of committing
+
+    Rolling back on the spot would also discard the request's earlier
+    writes, and the rest of the request would then commit without them.
+
+    Args:
+        db (Session): Database session
+    """
+    if in_unit_of_work(db):
+        db.info[ROLLBACK_ONLY_KEY] = True
+    else:
+        db.rollback()
+
+
+async def arollback(db: AsyncSession) -> None:
+    """
+    Async version of rollback
+
+    Args:
+        db (AsyncSession): Database session
+    """
+    if in_unit_of_work(db):
+        db.info[ROLLBACK_ONLY_KEY] = True
+    else:
+        await db.rollback()
+
+
+def after_commit(db: Session, callback: Callable[[], Any]) -> None:
+    """
+    Run a callback once the session's writes are committed
+
+    Cache invalidation and index updates must not run before the commit:
+    a concurrent read could bring the old row back, or the write could
+    still be rolled back.
+
+    Args:
+        db (Session): Database session
+        callback (Callable[[], Any]): Function to call
+    """
+    if in_unit_of_work(db):
+        db.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+    else:
+        callback()
+
+
+async def aafter_commit(db: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Async version of after_commit
+
+    Args:
+        db (AsyncSession): Database session
+        callback (Callable[[], Awaitable[Any]]): Coroutine function to await
+    """
+    if in_unit_of_work(db):
+        db.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+    else:
+        await callback()
+
+
+def end_unit_of_work(db: Session, failed: bool = False) -> None:
+    """
+    Commit the request's writes in one transaction, or roll them back
+
+    Args:
+        db (Session): Database session
+        failed (bool): The request raised an exception
+    """
+    callbacks = db.info.pop(AFTER_COMMIT_KEY, [])
+    abandoned = db.info.pop(ROLLBACK_ONLY_KEY, False)
+    active = bool(db.info.pop(UNIT_OF_WORK_KEY, False))
+    if not active:
+        return
+    if failed or abandoned:
+        db.rollback()
+        return
+    db.commit()
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            # The writes are committed; a stale cache entry expires on its own
+            logger.error("Error in after-commit callback: %s", e, exc_info=True)
+
+
+async def aend_unit_of_work(db: AsyncSession, failed: bool = False) -> None:
+    """
+    Async version of end_unit_of_work
+
+    Args:
+        db (AsyncSession): Database session
+        failed (bool): The request raised an exception
+    """
+    callbacks = db.info.pop(AFTER_COMMIT_KEY, [])
+    abandoned = db.info.pop(ROLLBACK_ONLY_KEY, False)
+    active = bool(db.info.pop(UNIT_OF_WORK_KEY, False))
+    if not active:
+        return
+    if failed or abandoned:
+        await db.rollback()
+        return
+    await db.commit()
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception as e:
+            logger.error("Error in after-commit callback: %s", e, exc_info=True)
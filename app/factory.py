@@ -1,11 +1,23 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import logging
+
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from typing import List, Optional, Dict, Any, Callable
 
 from app.core.config import settings
 from app.api import auth, users, vacancies, responses
-from app.db.session import get_db
+from app.db.session import SessionLocal, async_engine, engine, get_db, get_pool_stats, replicas
+from app.db.sqlite import check_sqlite_pragmas
+from app.core.auth import login_throttle, password_hasher, revocation_list, token_verifier
+from app.core.log import REQUEST_ID_HEADER, RequestIdMiddleware, configure_logging, logging_info
+from app.core.passwords import PasswordHasherBusy
+from app.services.factory import container, principal_cache, vacancy_cache
+from app.services.vacancy_index import vacancy_index
+
+logger = logging.getLogger(__name__)
 
 
 class AppFactory:
@@ -30,6 +42,8 @@ class AppFactory:
                 if hasattr(settings, key):
                     setattr(settings, key, value)
         
+        configure_logging(settings)
+        
         # Create FastAPI instance
         app = FastAPI(
             title=settings.PROJECT_NAME,
@@ -49,6 +63,9 @@ class AppFactory:
         # Add base endpoints
         AppFactory._add_base_endpoints(app)
         
+        # Add exception handlers
+        AppFactory._add_exception_handlers(app)
+        
         # Add event handlers
         AppFactory._add_event_handlers(app)
         
@@ -69,7 +86,10 @@ class AppFactory:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=[REQUEST_ID_HEADER],
         )
+        # Outermost, so every response and log record carries the request ID
+        app.add_middleware(RequestIdMiddleware)
     
     @staticmethod
     def _include_routers(app: FastAPI) -> None:
@@ -110,6 +130,68 @@ class AppFactory:
                 "status": "ok",
                 "api_version": settings.PROJECT_VERSION,
             }
+        
+        @app.get("/health/db", tags=["health"])
+        def database_health_check():
+            return {
+                "status": "ok",
+                "pool": get_pool_stats(),
+                "async_pool": get_pool_stats(async_engine),
+                "replicas": [
+                    dict(status, pool=get_pool_stats(replica.engine))
+                    for replica, status in zip(replicas.replicas, replicas.status())
+                ],
+            }
+        
+        @app.get("/health/cache", tags=["health"])
+        def cache_health_check():
+            return {
+                "status": "ok",
+                "vacancy_cache": vacancy_cache.info() if vacancy_cache is not None else None,
+                "principal_cache": principal_cache.info() if principal_cache is not None else None,
+                "token_cache": token_verifier.cache.info(),
+                "revocations": revocation_list.info(),
+            }
+        
+        @app.get("/health/container", tags=["health"])
+        def container_health_check():
+            return {
+                "status": "ok",
+                "container": container.info(),
+            }
+        
+        @app.get("/health/logging", tags=["health"])
+        def logging_health_check():
+            return {
+                "status": "ok",
+                "logging": logging_info(),
+            }
+        
+        @app.get("/health/passwords", tags=["health"])
+        def password_hasher_health_check():
+            return {
+                "status": "ok",
+                "hasher": password_hasher.info(),
+                "login_throttle": login_throttle.info() if login_throttle is not None else None,
+            }
+    
+    @staticmethod
+    def _add_exception_handlers(app: FastAPI) -> None:
+        """
+        Map service exceptions to HTTP responses
+        
+        Args:
+            app (FastAPI): FastAPI application instance
+        """
+        
+        @app.exception_handler(PasswordHasherBusy)
+        async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+            # Fail fast: waiting would only grow the backlog
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Too many concurrent password operations, try again shortly"},
+                headers={"Retry-After": "1"},
+            )
     
     @staticmethod
     def _add_event_handlers(app: FastAPI) -> None:
@@ -122,13 +204,62 @@ class AppFactory:
         
         @app.on_event("startup")
         async def startup_event():
-            # Add startup actions here (e.g. database connection check)
-            pass
+            if engine.dialect.name == "sqlite":
+                await asyncio.to_thread(check_sqlite_pragmas, engine, settings)
+            if replicas:
+                await asyncio.to_thread(replicas.check)
+                app.state.replica_check_task = asyncio.create_task(AppFactory._check_replicas())
+            if settings.VACANCY_INDEX_ENABLED:
+                await asyncio.to_thread(AppFactory._sync_vacancy_index)
+                app.state.vacancy_index_task = asyncio.create_task(AppFactory._refresh_vacancy_index())
         
         @app.on_event("shutdown")
         async def shutdown_event():
-            # Add shutdown actions here (e.g. close connections)
-            pass
+            for name in ("vacancy_index_task", "replica_check_task"):
+                task = getattr(app.state, name, None)
+                if task is not None:
+                    task.cancel()
+            await async_engine.dispose()
+            for replica in replicas.replicas:
+                await replica.async_engine.dispose()
+    
+    @staticmethod
+    def _sync_vacancy_index() -> int:
+        """
+        Build the vacancy search index, or pick up changes made since the last sync
+        
+        Returns:
+            int: Number of vacancies (re)indexed
+        """
+        db = SessionLocal()
+        try:
+            return vacancy_index.refresh(db, batch_size=settings.VACANCY_INDEX_BATCH_SIZE)
+        finally:
+            db.close()
+    
+    @staticmethod
+    async def _refresh_vacancy_index() -> None:
+        """
+        Periodically re-index vacancies changed by other workers
+        """
+        while True:
+            await asyncio.sleep(settings.VACANCY_INDEX_REFRESH_SECONDS)
+            try:
+                await asyncio.to_thread(AppFactory._sync_vacancy_index)
+            except Exception:
+                logger.exception("Failed to refresh the vacancy search index")
+    
+    @staticmethod
+    async def _check_replicas() -> None:
+        """
+        Periodically measure replica lag, taking lagging replicas out of rotation
+        """
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_SECONDS)
+            try:
+                await asyncio.to_thread(replicas.check)
+            except Exception:
+                logger.exception("Failed to check read replicas")
     
     @staticmethod
     def run_app(app: Optional[FastAPI] = None, **kwargs) -> None:
@@ -152,6 +283,8 @@ class AppFactory:
                 host=host,
                 port=port,
                 reload=reload,
+                proxy_headers=True,
+                forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
             )
         else:
             # If reload is False, we can pass the application instance directly
@@ -159,6 +292,8 @@ class AppFactory:
                 app,
                 host=host,
                 port=port,
+                proxy_headers=True,
+                forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
             )
 
 
@@ -1,13 +1,22 @@
-from typing import List, Optional
+from typing import Generic, List, Optional, TypeVar
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from app.schemas.models import UserStatus, ResponseStatus, VacancyStatus
 
 
+T = TypeVar("T")
+
+
 # Pagination schema
 class PaginationParams(BaseModel):
     page: int = Field(1, ge=1, description="Page number")
     per_page: int = Field(20, ge=1, le=100, description="Items per page")
+    cursor: Optional[str] = Field(None, description="Cursor from the previous page; takes precedence over page")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
 
 
 # User schemas
@@ -42,10 +51,33 @@ class UserResponse(UserInDB):
     pass
 
 
+# Fields returned by list endpoints unless the client asks for others with fields=
+USER_SUMMARY_FIELDS = ("id", "email", "phone", "name", "surname", "patronymic", "created", "updated", "status")
+
+
+class UserSummary(BaseModel):
+    """List item for users; only the requested fields are present"""
+    id: Optional[int] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    patronymic: Optional[str] = None
+    cv_text: Optional[str] = None
+    created: Optional[datetime] = None
+    updated: Optional[datetime] = None
+    status: Optional[UserStatus] = None
+
+
 # Auth schemas
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenPayload(BaseModel):
@@ -82,6 +114,38 @@ class VacancyResponse(VacancyInDB):
     pass
 
 
+# Fields returned by list endpoints unless the client asks for others with fields=
+VACANCY_SUMMARY_FIELDS = ("id", "name", "salary", "short_description", "created", "updated", "status")
+
+
+class VacancySummary(BaseModel):
+    """List item for vacancies; only the requested fields are present"""
+    id: Optional[int] = None
+    name: Optional[str] = None
+    salary: Optional[float] = None
+    short_description: Optional[str] = None
+    full_description: Optional[str] = None
+    created: Optional[datetime] = None
+    updated: Optional[datetime] = None
+    status: Optional[VacancyStatus] = None
+
+
+# Bulk import schemas
+class ImportRowErrorResponse(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Outcome of a bulk import; resume a stopped import after last_line"""
+    imported: int
+    skipped: int
+    failed: int
+    errors: List[ImportRowErrorResponse]
+    last_line: int
+    aborted: Optional[str] = None
+
+
 # Response schemas
 class ResponseBase(BaseModel):
     user_id: int
@@ -96,6 +160,24 @@ class ResponseUpdate(BaseModel):
     status: ResponseStatus
 
 
+class ResponseStatusBulkUpdate(BaseModel):
+    """Move the listed responses to a new status"""
+    status: ResponseStatus
+    ids: List[int] = Field(..., min_length=1, max_length=1000, description="Response IDs")
+    from_status: Optional[ResponseStatus] = Field(None, description="Only move responses currently in this status")
+
+
+class ResponseStatusOutcome(BaseModel):
+    id: int
+    outcome: str = Field(description="updated, unchanged, not_found or invalid_transition")
+    status: Optional[ResponseStatus] = Field(None, description="Status after the request")
+
+
+class ResponseStatusBulkResult(BaseModel):
+    updated: int
+    results: List[ResponseStatusOutcome]
+
+
 class ResponseInDB(ResponseBase):
     id: int
     created: datetime
@@ -112,9 +194,3 @@ class ResponseResponse(ResponseInDB):
 
 class ResponseResponse(ResponseInDB):
     pass
-
-
-# Pagination
-class PaginationParams(BaseModel):
-    page: int = 1
-    per_page: int = 20
@@ -0,0 +1,198 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    ArchivedResponse,
+    ArchivedVacancy,
+    Response,
+    ResponseStatus,
+    Vacancy,
+    VacancyStatus,
+)
+from app.db.routing import USE_PRIMARY_KEY
+from app.services.pagination import paginate
+
+logger = logging.getLogger(__name__)
+
+# Vacancies in these states are finished and may be moved to the archive
+ARCHIVABLE_STATUSES = (VacancyStatus.CLOSED, VacancyStatus.DELETED)
+
+_VACANCY_COLUMNS = ("id", "name", "salary", "short_description", "full_description", "created", "updated", "status")
+_RESPONSE_COLUMNS = ("id", "user_id", "vacancy_id", "created", "updated", "status")
+
+
+class ArchiveResult(NamedTuple):
+    """
+    Totals of one archival run
+    """
+    vacancies: int
+    responses: int
+    batches: int
+
+
+class ArchiveService:
+    """
+    Service that moves finished vacancies and their responses to the archive tables
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        # The job must see and delete current rows, never a replica's copy
+        self.db.info[USE_PRIMARY_KEY] = True
+
+    @staticmethod
+    def _archivable(cutoff: datetime) -> tuple:
+        last_change = func.coalesce(Vacancy.updated, Vacancy.created)
+        return (Vacancy.status.in_(ARCHIVABLE_STATUSES), last_change < cutoff)
+
+    def _archivable_ids(self, cutoff: datetime, limit: Optional[int] = None) -> List[int]:
+        query = select(Vacancy.id).where(*self._archivable(cutoff)).order_by(Vacancy.id)
+        if limit is not None:
+            query = query.limit(limit)
+            if self.db.get_bind().dialect.name == "postgresql":
+                # Let concurrent runs work on different batches
+                query = query.with_for_update(skip_locked=True)
+        return list(self.db.execute(query).scalars())
+
+    def count_archivable(self, older_than: timedelta) -> int:
+        """
+        Count vacancies the archival job would move
+
+        Args:
+            older_than (timedelta): Minimum time since the vacancy last changed
+
+        Returns:
+            int: Number of archivable vacancies
+        """
+        cutoff = datetime.now(timezone.utc) - older_than
+        query = select(func.count()).select_from(Vacancy).where(*self._archivable(cutoff))
+        return self.db.execute(query).scalar_one()
+
+    def _archive_batch(self, vacancy_ids: Sequence[int]) -> int:
+        vacancy_columns = [getattr(Vacancy, name) for name in _VACANCY_COLUMNS]
+        response_columns = [getattr(Response, name) for name in _RESPONSE_COLUMNS]
+        self.db.execute(
+            insert(ArchivedVacancy).from_select(
+                list(_VACANCY_COLUMNS),
+                select(*vacancy_columns).where(Vacancy.id.in_(vacancy_ids)),
+            )
+        )
+        responses = self.db.execute(
+            insert(ArchivedResponse).from_select(
+                list(_RESPONSE_COLUMNS),
+                select(*response_columns).where(Response.vacancy_id.in_(vacancy_ids)),
+            )
+        ).rowcount
+        self.db.execute(
+            delete(Response).where(Response.vacancy_id.in_(vacancy_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.execute(
+            delete(Vacancy).where(Vacancy.id.in_(vacancy_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        return responses
+
+    def archive_vacancies(self, older_than: timedelta, batch_size: int = 500) -> ArchiveResult:
+        """
+        Move closed and deleted vacancies, with their responses, to the archive
+
+        Each batch is copied and removed from the hot tables in its own
+        transaction, so an interrupted run loses nothing and can be restarted.
+
+        Args:
+            older_than (timedelta): Minimum time since the vacancy last changed
+            batch_size (int): Number of vacancies moved per transaction
+
+        Returns:
+            ArchiveResult: Numbers of archived vacancies and responses
+        """
+        cutoff = datetime.now(timezone.utc) - older_than
+        vacancies = responses = batches = 0
+        while True:
+            try:
+                vacancy_ids = self._archivable_ids(cutoff, limit=batch_size)
+                if not vacancy_ids:
+                    self.db.rollback()
+                    break
+                responses += self._archive_batch(vacancy_ids)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            vacancies += len(vacancy_ids)
+            batches += 1
+            logger.info("Archived batch %d: %d vacancies", batches, len(vacancy_ids))
+        logger.info("Archived %d vacancies and %d responses", vacancies, responses)
+        return ArchiveResult(vacancies, responses, batches)
+
+    def vacuum(self) -> None:
+        """
+        Reclaim space freed in the hot tables and refresh planner statistics
+        """
+        bind = self.db.get_bind()
+        self.db.close()
+        with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            if bind.dialect.name == "postgresql":
+                connection.execute(text("VACUUM (ANALYZE) responses, vacancies"))
+            elif bind.dialect.name == "sqlite":
+                connection.execute(text("VACUUM"))
+
+
+class AsyncArchiveService:
+    """
+    Async service for reading archived vacancies and responses
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_archived_vacancy(self, vacancy_id: int) -> Optional[ArchivedVacancy]:
+        """
+        Get an archived vacancy by ID
+
+        Args:
+            vacancy_id (int): Vacancy ID
+
+        Returns:
+            Optional[ArchivedVacancy]: Archived vacancy or None if not archived
+        """
+        result = await self.db.execute(select(ArchivedVacancy).where(ArchivedVacancy.id == vacancy_id))
+        return result.scalars().first()
+
+    async def get_archived_responses_for_vacancy(
+        self,
+        vacancy_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        status: Optional[ResponseStatus] = None,
+        cursor: Optional[str] = None
+    ) -> List[ArchivedResponse]:
+        """
+        Get archived responses for an archived vacancy
+
+        Args:
+            vacancy_id (int): Vacancy ID
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            status (Optional[ResponseStatus]): Filter by response status
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
+
+        Returns:
+            List[ArchivedResponse]: List of archived responses, newest first
+        """
+        query = select(ArchivedResponse).where(ArchivedResponse.vacancy_id == vacancy_id)
+
+        if status:
+            query = query.where(ArchivedResponse.status == status)
+
+        query = paginate(
+            query, ArchivedResponse.created, ArchivedResponse.id, skip=skip, limit=limit, cursor=cursor
+        )
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
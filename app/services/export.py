@@ -0,0 +1,170 @@
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Response, ResponseStatus, Vacancy, VacancyStatus
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# Exported columns, in CSV column order; the fields of the API's responses
+VACANCY_EXPORT_COLUMNS = ("id", "name", "salary", "short_description", "full_description", "created", "updated", "status")
+RESPONSE_EXPORT_COLUMNS = ("id", "user_id", "vacancy_id", "created", "updated", "status")
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def encode_rows(
+    batches: AsyncIterator[Sequence[Sequence[Any]]],
+    columns: Sequence[str],
+    fmt: str,
+) -> AsyncIterator[bytes]:
+    """
+    Encode batches of rows as NDJSON or CSV, one chunk per batch
+
+    Args:
+        batches (AsyncIterator[Sequence[Sequence[Any]]]): Rows with values in column order
+        columns (Sequence[str]): Column names
+        fmt (str): "ndjson" or "csv" (with a header row)
+
+    Returns:
+        AsyncIterator[bytes]: UTF-8 encoded chunks
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        async for rows in batches:
+            writer.writerows([_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Header of an empty export
+            yield buffer.getvalue().encode()
+        return
+    async for rows in batches:
+        lines = [
+            json.dumps({column: _value(value) for column, value in zip(columns, row)}, ensure_ascii=False)
+            for row in rows
+        ]
+        lines.append("")
+        yield "\n".join(lines).encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """
+    Compress a stream of chunks into one gzip stream as they arrive
+
+    Args:
+        chunks (AsyncIterator[bytes]): Uncompressed chunks
+        level (int): zlib compression level, 1 (fastest) to 9 (smallest)
+
+    Returns:
+        AsyncIterator[bytes]: Compressed chunks
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class AsyncExportService:
+    """
+    Service that streams vacancies and responses for export
+
+    Rows are read through a server-side cursor batch_size at a time (or,
+    where the driver has none, fetched in batches of that size), so memory
+    stays constant however many rows match. Only the exported columns are
+    selected, as plain rows rather than ORM objects.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+
+    async def _stream(self, query: Select) -> AsyncIterator[Sequence[Any]]:
+        result = await self.db.stream(query.execution_options(yield_per=self.batch_size))
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    def stream_vacancies(
+        self,
+        status: Optional[VacancyStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Sequence[Any]]:
+        """
+        Stream vacancies in ID order
+
+        Deleted vacancies are left out, as in the vacancy list, unless
+        status asks for them.
+
+        Args:
+            status (Optional[VacancyStatus]): Filter by status
+            created_from (Optional[datetime]): Only vacancies created at or after this time
+            created_to (Optional[datetime]): Only vacancies created before this time
+
+        Returns:
+            AsyncIterator[Sequence[Any]]: Batches of rows with VACANCY_EXPORT_COLUMNS
+        """
+        query = select(*[getattr(Vacancy, name) for name in VACANCY_EXPORT_COLUMNS]).order_by(Vacancy.id)
+        if status is not None:
+            query = query.where(Vacancy.status == status)
+        else:
+            query = query.where(Vacancy.status != VacancyStatus.DELETED)
+        if created_from is not None:
+            query = query.where(Vacancy.created >= created_from)
+        if created_to is not None:
+            query = query.where(Vacancy.created < created_to)
+        return self._stream(query)
+
+    def stream_responses(
+        self,
+        vacancy_id: int,
+        status: Optional[ResponseStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Sequence[Any]]:
+        """
+        Stream the responses to a vacancy in ID order
+
+        Args:
+            vacancy_id (int): Vacancy ID
+            status (Optional[ResponseStatus]): Filter by status
+            created_from (Optional[datetime]): Only responses created at or after this time
+            created_to (Optional[datetime]): Only responses created before this time
+
+        Returns:
+            AsyncIterator[Sequence[Any]]: Batches of rows with RESPONSE_EXPORT_COLUMNS
+        """
+        query = (
+            select(*[getattr(Response, name) for name in RESPONSE_EXPORT_COLUMNS])
+            .where(Response.vacancy_id == vacancy_id)
+            .order_by(Response.id)
+        )
+        if status is not None:
+            query = query.where(Response.status == status)
+        if created_from is not None:
+            query = query.where(Response.created >= created_from)
+        if created_to is not None:
+            query = query.where(Response.created < created_to)
+        return self._stream(query)
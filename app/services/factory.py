@@ -1,11 +1,50 @@
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Callable, Type, Dict, Any
+from datetime import timedelta
+from typing import Callable, Type, Dict, Any, Optional
 
-from app.db.session import get_db
-from app.services.user import UserService
-from app.services.vacancy import VacancyService
-from app.services.response import ResponseService
+from app.core.auth import pwd_context, revocation_list
+from app.core.cache import CacheBackend, create_cache
+from app.core.config import settings
+from app.core.container import Container, container
+from app.db.session import get_async_db, get_db
+from app.services.archive import ArchiveService, AsyncArchiveService
+from app.services.export import AsyncExportService
+from app.services.importer import ImportService
+from app.services.refresh_token import AsyncRefreshTokenService
+from app.services.user import AsyncUserService, UserService
+from app.services.vacancy import AsyncVacancyService, VacancyService
+from app.services.response import AsyncResponseService, ResponseService
+from app.services.vacancy_index import VacancyIndex, vacancy_index
+
+
+def _invalidated_everywhere(cache: Optional[CacheBackend]) -> Optional[CacheBackend]:
+    """
+    Drop a per-process cache when several workers would each hold a copy
+
+    A write only invalidates the cache of the worker that made it, so the
+    other workers would keep serving the old entry until it expired.
+
+    Args:
+        cache (Optional[CacheBackend]): Cache created from settings
+
+    Returns:
+        Optional[CacheBackend]: The cache if it is shared or there is one
+        worker, otherwise None
+    """
+    if cache is not None and not cache.shared and settings.WEB_CONCURRENCY > 1:
+        return None
+    return cache
+
+
+# Process-wide cache in front of VacancyService.get_vacancy
+vacancy_cache: Optional[CacheBackend] = _invalidated_everywhere(create_cache(settings, "vacancy"))
+# Cache of authenticated users, see UserService.get_principal. In other
+# workers a stale entry would keep letting a banned user in until it expired
+principal_cache: Optional[CacheBackend] = _invalidated_everywhere(
+    create_cache(settings, "principal", ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+)
 
 
 class ServiceFactory:
@@ -13,6 +52,16 @@ class ServiceFactory:
     Factory class to create service instances
     """
     
+    @staticmethod
+    def get_vacancy_index() -> Optional[VacancyIndex]:
+        """
+        Get the in-memory vacancy search index, if enabled
+        
+        Returns:
+            Optional[VacancyIndex]: Process-wide index or None
+        """
+        return vacancy_index if settings.VACANCY_INDEX_ENABLED else None
+    
     @staticmethod
     def create_user_service(db: Session = Depends(get_db)) -> UserService:
         """
@@ -24,7 +73,7 @@ class ServiceFactory:
         Returns:
             UserService: UserService instance
         """
-        return UserService(db)
+        return UserService(db, principal_cache, revocation_list)
     
     @staticmethod
     def create_vacancy_service(db: Session = Depends(get_db)) -> VacancyService:
@@ -37,7 +86,7 @@ class ServiceFactory:
         Returns:
             VacancyService: VacancyService instance
         """
-        return VacancyService(db)
+        return VacancyService(db, ServiceFactory.get_vacancy_index(), vacancy_cache)
     
     @staticmethod
     def create_response_service(
@@ -57,3 +106,139 @@ class ServiceFactory:
             ResponseService: ResponseService instance
         """
         return ResponseService(db, user_service, vacancy_service)
+    
+    @staticmethod
+    def create_async_user_service(db: AsyncSession = Depends(get_async_db)) -> AsyncUserService:
+        """
+        Create an AsyncUserService instance
+        
+        Args:
+            db (AsyncSession): Async database session
+            
+        Returns:
+            AsyncUserService: AsyncUserService instance
+        """
+        return AsyncUserService(db, principal_cache, revocation_list)
+    
+    @staticmethod
+    def create_async_refresh_token_service(db: AsyncSession = Depends(get_async_db)) -> AsyncRefreshTokenService:
+        """
+        Create an AsyncRefreshTokenService instance
+        
+        Args:
+            db (AsyncSession): Async database session
+            
+        Returns:
+            AsyncRefreshTokenService: AsyncRefreshTokenService instance
+        """
+        return AsyncRefreshTokenService(db, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+    
+    @staticmethod
+    def create_async_vacancy_service(db: AsyncSession = Depends(get_async_db)) -> AsyncVacancyService:
+        """
+        Create an AsyncVacancyService instance
+        
+        Args:
+            db (AsyncSession): Async database session
+            
+        Returns:
+            AsyncVacancyService: AsyncVacancyService instance
+        """
+        return AsyncVacancyService(db, ServiceFactory.get_vacancy_index(), vacancy_cache)
+    
+    @staticmethod
+    def create_async_response_service(
+        db: AsyncSession = Depends(get_async_db),
+        user_service: AsyncUserService = Depends(create_async_user_service),
+        vacancy_service: AsyncVacancyService = Depends(create_async_vacancy_service),
+    ) -> AsyncResponseService:
+        """
+        Create an AsyncResponseService instance
+        
+        Args:
+            db (AsyncSession): Async database session
+            user_service (AsyncUserService): AsyncUserService instance
+            vacancy_service (AsyncVacancyService): AsyncVacancyService instance
+            
+        Returns:
+            AsyncResponseService: AsyncResponseService instance
+        """
+        return AsyncResponseService(db, user_service, vacancy_service)
+    
+    @staticmethod
+    def create_archive_service(db: Session = Depends(get_db)) -> ArchiveService:
+        """
+        Create an ArchiveService instance
+        
+        Args:
+            db (Session): Database session
+            
+        Returns:
+            ArchiveService: ArchiveService instance
+        """
+        return ArchiveService(db)
+    
+    @staticmethod
+    def create_async_archive_service(db: AsyncSession = Depends(get_async_db)) -> AsyncArchiveService:
+        """
+        Create an AsyncArchiveService instance
+        
+        Args:
+            db (AsyncSession): Async database session
+            
+        Returns:
+            AsyncArchiveService: AsyncArchiveService instance
+        """
+        return AsyncArchiveService(db)
+    
+    @staticmethod
+    def create_import_service(db: Session = Depends(get_db)) -> ImportService:
+        """
+        Create an ImportService instance
+        
+        Args:
+            db (Session): Database session
+            
+        Returns:
+            ImportService: ImportService instance
+        """
+        return ImportService(db, pwd_context, settings.PASSWORD_HASH_WORKERS)
+    
+    @staticmethod
+    def create_async_export_service(db: AsyncSession = Depends(get_async_db)) -> AsyncExportService:
+        """
+        Create an AsyncExportService instance
+        
+        Args:
+            db (AsyncSession): Async database session
+            
+        Returns:
+            AsyncExportService: AsyncExportService instance
+        """
+        return AsyncExportService(db, settings.EXPORT_BATCH_SIZE)
+
+
+def register_services(target: Container) -> None:
+    """
+    Register the services and their request-scoped sessions in a container
+    
+    Args:
+        target (Container): Container to register in
+    """
+    target.register_provided("db", get_db)
+    target.register_provided("async_db", get_async_db)
+    target.register_scoped("user_service", ServiceFactory.create_user_service)
+    target.register_scoped("vacancy_service", ServiceFactory.create_vacancy_service)
+    target.register_scoped("response_service", ServiceFactory.create_response_service)
+    target.register_scoped("archive_service", ServiceFactory.create_archive_service)
+    target.register_scoped("import_service", ServiceFactory.create_import_service)
+    target.register_scoped("async_user_service", ServiceFactory.create_async_user_service)
+    target.register_scoped("async_refresh_token_service", ServiceFactory.create_async_refresh_token_service)
+    target.register_scoped("async_vacancy_service", ServiceFactory.create_async_vacancy_service)
+    target.register_scoped("async_response_service", ServiceFactory.create_async_response_service)
+    target.register_scoped("async_archive_service", ServiceFactory.create_async_archive_service)
+    target.register_scoped("async_export_service", ServiceFactory.create_async_export_service)
+
+
+# Routers resolve services through the container, so register them on import
+register_services(container)
@@ -0,0 +1,245 @@
+import csv
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import User, Vacancy, VacancyStatus
+from app.db.routing import USE_PRIMARY_KEY
+from app.schemas.requests import UserCreate, VacancyCreate
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("jsonl", "csv")
+
+
+class ImportRowError(NamedTuple):
+    """
+    A row that was not imported
+    """
+    line: int
+    error: str
+
+
+class ImportResult(NamedTuple):
+    """
+    Outcome of an import run
+
+    last_line is the last input line whose outcome is final: a resumed run
+    should start after it. aborted holds the database error that stopped
+    the run early, if any.
+    """
+    imported: int
+    skipped: int
+    failed: int
+    errors: List[ImportRowError]
+    last_line: int
+    aborted: Optional[str] = None
+
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Parse JSON Lines or CSV lazily, one record at a time
+
+    Args:
+        lines (Iterable[str]): Input text, line by line; CSV files must be
+            opened with newline=""
+        fmt (str): "jsonl" or "csv" (with a header row)
+
+    Returns:
+        Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]: Line
+        number, and either the record or a parse error
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Empty cells are missing values, not empty strings
+            record = {key: value if value != "" else None for key, value in row.items() if key is not None}
+            yield reader.line_num, record, None
+        return
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+class ImportService:
+    """
+    Service for bulk imports of vacancies and users
+
+    Rows are validated with the same schemas as the API, then inserted in
+    chunks with one executemany per chunk. Each chunk is committed on its
+    own, so a failed run keeps everything before it and can be resumed
+    with start_line.
+    """
+
+    def __init__(self, db: Session, password_context: Any = None, hash_workers: int = 1):
+        self.db = db
+        # Bulk writes must go to the primary, and stay readable there
+        self.db.info[USE_PRIMARY_KEY] = True
+        self.password_context = password_context
+        self.hash_workers = hash_workers
+
+    def _insert(self, model: Any):
+        insert_ = postgresql.insert if self.db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        return insert_(model)
+
+    def import_vacancies(
+        self,
+        lines: Iterable[str],
+        fmt: str = "jsonl",
+        chunk_size: int = 1000,
+        start_line: int = 1,
+        max_errors: int = 1000,
+    ) -> ImportResult:
+        """
+        Import vacancies, created with status "created"
+
+        Args:
+            lines (Iterable[str]): Input text, line by line
+            fmt (str): "jsonl" or "csv"
+            chunk_size (int): Rows inserted and committed together
+            start_line (int): Skip records before this input line
+            max_errors (int): Most row errors to report; all are counted
+
+        Returns:
+            ImportResult: Counts, row errors and the last committed line
+        """
+        return self._run(lines, fmt, VacancyCreate, self._insert_vacancies, chunk_size, start_line, max_errors)
+
+    def import_users(
+        self,
+        lines: Iterable[str],
+        fmt: str = "jsonl",
+        chunk_size: int = 1000,
+        start_line: int = 1,
+        max_errors: int = 1000,
+    ) -> ImportResult:
+        """
+        Import users, skipping those whose email or phone is already taken
+
+        Passwords are hashed with bcrypt on hash_workers threads, which
+        bounds the throughput. For the import_data.py CLI only: the pool is
+        its own, outside the request-serving PasswordHasher, whose queue
+        bound would reject a chunk, so this must not be called from the API.
+
+        Args:
+            lines (Iterable[str]): Input text, line by line
+            fmt (str): "jsonl" or "csv"
+            chunk_size (int): Rows inserted and committed together
+            start_line (int): Skip records before this input line
+            max_errors (int): Most row errors to report; all are counted
+
+        Returns:
+            ImportResult: Counts, row errors and the last committed line
+        """
+        return self._run(lines, fmt, UserCreate, self._insert_users, chunk_size, start_line, max_errors)
+
+    def _insert_vacancies(self, rows: Sequence[Tuple[int, BaseModel]]) -> List[int]:
+        self.db.execute(
+            insert(Vacancy),
+            [dict(vacancy.model_dump(), status=VacancyStatus.CREATED) for _, vacancy in rows],
+        )
+        return []
+
+    def _insert_users(self, rows: Sequence[Tuple[int, BaseModel]]) -> List[int]:
+        # Repeats within the chunk would be skipped by the database too, but
+        # RETURNING could not tell them apart from the first occurrence
+        unique: List[Tuple[int, BaseModel]] = []
+        duplicates: List[int] = []
+        seen = set()
+        for line, user in rows:
+            keys = {("email", user.email)} | ({("phone", user.phone)} if user.phone else set())
+            if keys & seen:
+                duplicates.append(line)
+                continue
+            seen |= keys
+            unique.append((line, user))
+
+        # Not password_hasher: a whole chunk at once would exceed its queue (CLI only)
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as pool:
+            hashes = list(pool.map(self.password_context.hash, [user.password for _, user in unique]))
+        values = [
+            dict(user.model_dump(exclude={"password"}), password=password_hash)
+            for (_, user), password_hash in zip(unique, hashes)
+        ]
+        # DO NOTHING without a target covers both the email and phone constraints
+        statement = self._insert(User).on_conflict_do_nothing().returning(User.email)
+        inserted = set(self.db.execute(statement, values).scalars())
+        duplicates.extend(line for line, user in unique if user.email not in inserted)
+        return sorted(duplicates)
+
+    def _run(
+        self,
+        lines: Iterable[str],
+        fmt: str,
+        schema: Type[BaseModel],
+        insert_chunk: Callable[[Sequence[Tuple[int, BaseModel]]], List[int]],
+        chunk_size: int,
+        start_line: int,
+        max_errors: int,
+    ) -> ImportResult:
+        imported = skipped = failed = 0
+        errors: List[ImportRowError] = []
+        chunk: List[Tuple[int, BaseModel]] = []
+        last_line = start_line - 1
+        line = last_line
+
+        def report(line: int, message: str) -> None:
+            if len(errors) < max_errors:
+                errors.append(ImportRowError(line, message))
+
+        def flush() -> None:
+            nonlocal imported, skipped
+            if chunk:
+                duplicates = insert_chunk(chunk)
+                self.db.commit()
+                imported += len(chunk) - len(duplicates)
+                skipped += len(duplicates)
+                for duplicate in duplicates:
+                    report(duplicate, "Already exists")
+                chunk.clear()
+
+        try:
+            for line, record, error in read_records(lines, fmt):
+                if line < start_line:
+                    continue
+                if error is None:
+                    try:
+                        chunk.append((line, schema.model_validate(record)))
+                    except ValidationError as e:
+                        error = _validation_message(e)
+                if error is not None:
+                    failed += 1
+                    report(line, error)
+                if len(chunk) >= chunk_size:
+                    flush()
+                    last_line = line
+                    logger.info("Imported %s %s rows through line %s", imported, schema.__name__, line)
+            flush()
+            last_line = line
+        except Exception as e:
+            self.db.rollback()
+            logger.error("Import stopped after line %s: %s", last_line, e, exc_info=True)
+            return ImportResult(imported, skipped, failed, errors, last_line, aborted=str(e))
+        return ImportResult(imported, skipped, failed, errors, last_line)
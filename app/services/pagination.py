@@ -0,0 +1,140 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence, TypeVar
+
+from sqlalchemy import ColumnElement, Float, literal, tuple_
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+QueryT = TypeVar("QueryT")
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded
+    """
+
+
+class Cursor(NamedTuple):
+    """
+    Keyset position of the last item on a page
+    """
+    created: datetime
+    id: int
+    rank: Optional[float] = None
+
+
+def encode_cursor(created: Optional[datetime], item_id: int, rank: Optional[float] = None) -> str:
+    """
+    Encode a keyset position as an opaque cursor
+
+    Args:
+        created (Optional[datetime]): Creation time of the last item on the page
+        item_id (int): ID of the last item on the page
+        rank (Optional[float]): Search relevance of the last item, for ranked results
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    position = [created.isoformat() if created else None, item_id]
+    if rank is not None:
+        position.append(rank)
+    payload = json.dumps(position, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor (str): Cursor string
+
+    Returns:
+        Cursor: Position of the last item seen
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(position, list) or len(position) not in (2, 3):
+            raise ValueError("Unexpected cursor payload")
+        rank = float(position[2]) if len(position) == 3 else None
+        return Cursor(datetime.fromisoformat(position[0]), int(position[1]), rank)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def paginate(
+    query: QueryT,
+    created_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    rank: Optional[ColumnElement] = None,
+) -> QueryT:
+    """
+    Order a query newest first (or most relevant first) and select one page of it
+
+    With a cursor the page starts right after the cursor position (keyset
+    pagination), so its cost does not depend on how deep it is. Without one
+    the legacy offset is used.
+
+    Args:
+        query (QueryT): ORM Query or Select statement
+        created_column (InstrumentedAttribute): Creation time column
+        id_column (InstrumentedAttribute): Primary key column
+        skip (int): Number of records to skip when no cursor is given
+        limit (int): Maximum number of records to return
+        cursor (Optional[str]): Cursor returned with the previous page
+        rank (Optional[ColumnElement]): Relevance expression to order by first, higher is better
+
+    Returns:
+        QueryT: Query limited to the requested page
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or belongs to a different ordering
+    """
+    if rank is not None:
+        query = query.order_by(rank.desc(), created_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(created_column.desc(), id_column.desc())
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if (position.rank is None) != (rank is None):
+            raise InvalidCursorError("Pagination cursor does not match this query")
+        columns = [created_column, id_column]
+        values = [
+            literal(position.created, created_column.type),
+            literal(position.id, id_column.type),
+        ]
+        if rank is not None:
+            columns.insert(0, rank)
+            values.insert(0, literal(position.rank, Float()))
+        query = query.where(tuple_(*columns) < tuple_(*values))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def next_cursor(items: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Build the cursor for the page following the given one
+
+    Args:
+        items (Sequence[Any]): Items of the current page, with created and id
+            attributes (and search_rank for ranked search results)
+        limit (int): Page size the items were fetched with
+
+    Returns:
+        Optional[str]: Cursor for the next page, or None if this was the last page
+    """
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created, last.id, getattr(last, "search_rank", None))
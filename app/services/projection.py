@@ -0,0 +1,71 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
+# Columns every list query loads: the keyset pagination cursor is built from them
+KEY_FIELDS = ("id", "created")
+
+
+class InvalidFieldsError(ValueError):
+    """
+    Raised when a sparse fieldset names unknown fields
+    """
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], default: Sequence[str]) -> List[str]:
+    """
+    Parse a comma-separated sparse fieldset
+
+    Args:
+        fields (Optional[str]): Requested fields, e.g. "id,name,salary"
+        allowed (Iterable[str]): Fields clients may request
+        default (Sequence[str]): Fields returned when none are requested
+
+    Returns:
+        List[str]: Requested fields in request order, without duplicates
+
+    Raises:
+        InvalidFieldsError: If a requested field is not allowed
+    """
+    if not fields:
+        return list(default)
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown fields: {', '.join(unknown)}. Valid fields are: {', '.join(allowed)}"
+        )
+    return requested or list(default)
+
+
+def load_fields(model: Any, fields: Sequence[str]) -> LoaderOption:
+    """
+    Build a loader option that selects only the given columns of a model
+
+    Other columns are deferred with raiseload, so touching one by mistake
+    fails loudly instead of issuing a query per row.
+
+    Args:
+        model (Any): Mapped class
+        fields (Sequence[str]): Column attribute names to load
+
+    Returns:
+        LoaderOption: Option for Query.options or Select.options
+    """
+    names = dict.fromkeys([*KEY_FIELDS, *fields])
+    return load_only(*(getattr(model, name) for name in names), raiseload=True)
+
+
+def project(items: Iterable[Any], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Reduce objects to dictionaries holding only the given fields
+
+    Args:
+        items (Iterable[Any]): ORM instances or other objects with those attributes
+        fields (Sequence[str]): Attribute names to keep
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary per item
+    """
+    return [{field: getattr(item, field) for field in fields} for item in items]
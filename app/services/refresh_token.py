@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import RefreshToken
+from app.db.unit_of_work import acommit, arollback
+
+logger = logging.getLogger(__name__)
+
+
+class RotatedRefreshToken(NamedTuple):
+    """
+    Result of a successful refresh
+    """
+    user_id: int
+    token: str
+
+
+def _hash_secret(secret: str) -> str:
+    # The secret is 256 random bits, so a fast hash is enough; bcrypt would
+    # only bring back the cost refresh tokens are meant to avoid
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def _split_token(token: str) -> Optional[Tuple[str, str]]:
+    session_id, _, secret = token.partition(".")
+    if len(session_id) != 32 or not secret:
+        return None
+    return session_id, secret
+
+
+class AsyncRefreshTokenService:
+    """
+    Async service for refresh tokens, rotated on every use
+
+    A refresh token is "<session ID>.<secret>"; only a SHA-256 hash of the
+    secret is stored, in the session's row. Each refresh replaces it, so
+    checking and rotating a token is one conditional UPDATE by primary key.
+    Presenting a token that was already rotated means it was copied: the
+    whole session is revoked, for the thief and the legitimate client alike.
+    """
+
+    def __init__(self, db: AsyncSession, lifetime: timedelta):
+        self.db = db
+        self.lifetime = lifetime
+
+    async def issue(self, user_id: int) -> str:
+        """
+        Start a session and return its first refresh token
+
+        Args:
+            user_id (int): User ID
+
+        Returns:
+            str: Refresh token
+        """
+        now = datetime.now(timezone.utc)
+        session_id = secrets.token_hex(16)
+        secret = secrets.token_urlsafe(32)
+        try:
+            # Sessions that ran out are only kept until their user logs in again
+            await self.db.execute(
+                delete(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.expires <= now)
+            )
+            self.db.add(RefreshToken(
+                id=session_id,
+                user_id=user_id,
+                token_hash=_hash_secret(secret),
+                expires=now + self.lifetime,
+            ))
+            await acommit(self.db)
+        except Exception as e:
+            await arollback(self.db)
+            logger.error("Error issuing refresh token for user with ID %s: %s", user_id, e, exc_info=True)
+            raise
+        return f"{session_id}.{secret}"
+
+    async def rotate(self, token: str) -> Optional[RotatedRefreshToken]:
+        """
+        Exchange a refresh token for the next one of its session
+
+        Args:
+            token (str): Refresh token
+
+        Returns:
+            Optional[RotatedRefreshToken]: User ID and new refresh token, or None
+            if the token is unknown, expired, revoked or was already used
+        """
+        parts = _split_token(token)
+        if parts is None:
+            return None
+        session_id, secret = parts
+        now = datetime.now(timezone.utc)
+        new_secret = secrets.token_urlsafe(32)
+        try:
+            result = await self.db.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.id == session_id,
+                    RefreshToken.token_hash == _hash_secret(secret),
+                    RefreshToken.expires > now,
+                )
+                .values(token_hash=_hash_secret(new_secret), expires=now + self.lifetime)
+                .returning(RefreshToken.user_id)
+                .execution_options(synchronize_session=False)
+            )
+            user_id = result.scalar()
+            if user_id is None:
+                # Either no such live session, or an earlier token of it: revoke
+                result = await self.db.execute(
+                    delete(RefreshToken)
+                    .where(RefreshToken.id == session_id, RefreshToken.expires > now)
+                    .returning(RefreshToken.user_id)
+                )
+                reused_by = result.scalar()
+                if reused_by is not None:
+                    logger.warning("Refresh token reuse detected for user with ID: %s; session revoked.", reused_by)
+            await acommit(self.db)
+        except Exception as e:
+            await arollback(self.db)
+            logger.error("Error rotating refresh token: %s", e, exc_info=True)
+            raise
+        if user_id is None:
+            return None
+        return RotatedRefreshToken(user_id, f"{session_id}.{new_secret}")
+
+    async def revoke(self, token: str, user_id: int) -> bool:
+        """
+        End the session of a refresh token
+
+        Args:
+            token (str): Current refresh token of the session
+            user_id (int): ID of the user the session must belong to
+
+        Returns:
+            bool: True if a session was ended
+        """
+        parts = _split_token(token)
+        if parts is None:
+            return False
+        session_id, secret = parts
+        try:
+            result = await self.db.execute(
+                delete(RefreshToken).where(
+                    RefreshToken.id == session_id,
+                    RefreshToken.user_id == user_id,
+                    RefreshToken.token_hash == _hash_secret(secret),
+                )
+            )
+            await acommit(self.db)
+        except Exception as e:
+            await arollback(self.db)
+            logger.error("Error revoking refresh token of user with ID %s: %s", user_id, e, exc_info=True)
+            raise
+        return result.rowcount > 0
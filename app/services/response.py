@@ -1,9 +1,166 @@
+from sqlalchemy import literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.models import Response, ResponseStatus
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+
+from app.db.models import Response, ResponseStatus, Vacancy
+from app.db.routing import READ_PRIMARY_OPTION
+from app.db.unit_of_work import acommit, arollback, commit, rollback
 from app.schemas.requests import ResponseCreate, ResponseUpdate
-from app.services.user import UserService
-from app.services.vacancy import VacancyService
+from app.services.pagination import paginate
+from app.services.user import AsyncUserService, UserService
+from app.services.vacancy import AsyncVacancyService, VacancyService
+
+logger = logging.getLogger(__name__)
+
+
+# Statuses a response may move to from each status; approved and rejected are final
+RESPONSE_TRANSITIONS: Dict[ResponseStatus, Tuple[ResponseStatus, ...]] = {
+    ResponseStatus.CREATED: (ResponseStatus.VIEWED, ResponseStatus.APPROVED, ResponseStatus.REJECTED),
+    ResponseStatus.VIEWED: (ResponseStatus.APPROVED, ResponseStatus.REJECTED),
+    ResponseStatus.APPROVED: (),
+    ResponseStatus.REJECTED: (),
+}
+
+
+class InvalidStatusTransition(Exception):
+    """
+    Raised when a response's current status does not allow the requested one
+    """
+
+    def __init__(self, current: ResponseStatus, status: ResponseStatus):
+        super().__init__(f"Response is {current.value} and cannot become {status.value}")
+        self.current = current
+        self.status = status
+
+
+def transition_sources(status: ResponseStatus, from_status: Optional[ResponseStatus] = None) -> List[ResponseStatus]:
+    """
+    Get the statuses a response may move to status from (RESPONSE_TRANSITIONS)
+    
+    Updates match only rows in these statuses, so the rules hold even
+    against concurrent changes.
+    
+    Args:
+        status (ResponseStatus): New status
+        from_status (Optional[ResponseStatus]): Only consider this current status
+        
+    Returns:
+        List[ResponseStatus]: Allowed current statuses
+    """
+    return [
+        source for source, targets in RESPONSE_TRANSITIONS.items()
+        if status in targets and from_status in (None, source)
+    ]
+
+
+class StatusChange(NamedTuple):
+    """
+    Outcome of a bulk status update for one response
+    """
+    id: int
+    outcome: str
+    status: Optional[ResponseStatus]
+
+
+def _bulk_status_update(status: ResponseStatus, from_status: Optional[ResponseStatus], ids: Sequence[int]):
+    # Build the single UPDATE of a bulk status change
+    return (
+        update(Response)
+        .where(Response.id.in_(ids), Response.status.in_(transition_sources(status, from_status)))
+        .values(status=status)
+        .returning(Response.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _update_status(response_id: int, status: ResponseStatus):
+    statement = (
+        update(Response)
+        .where(Response.id == response_id, Response.status.in_(transition_sources(status)))
+        .values(status=status)
+        .returning(Response)
+    )
+    return select(Response).from_statement(statement).execution_options(populate_existing=True)
+
+
+def _current_response(response_id: int):
+    # Read back after a refused update, so from the primary
+    return select(Response).where(Response.id == response_id).execution_options(**{READ_PRIMARY_OPTION: True})
+
+
+def _current_statuses(ids: Sequence[int]):
+    return select(Response.id, Response.status).where(Response.id.in_(ids))
+
+
+def _status_outcomes(
+    status: ResponseStatus,
+    ids: Sequence[int],
+    updated: Sequence[int],
+    current: Dict[int, ResponseStatus],
+) -> List[StatusChange]:
+    updated = set(updated)
+    outcomes = []
+    for response_id in ids:
+        if response_id in updated:
+            outcomes.append(StatusChange(response_id, "updated", status))
+        elif response_id not in current:
+            outcomes.append(StatusChange(response_id, "not_found", None))
+        elif current[response_id] == status:
+            outcomes.append(StatusChange(response_id, "unchanged", status))
+        else:
+            outcomes.append(StatusChange(response_id, "invalid_transition", current[response_id]))
+    return outcomes
+
+
+def _insert_response(dialect_name: str, response: ResponseCreate):
+    """
+    Build an INSERT that creates a response in a single statement
+    
+    The row is selected from the vacancy, so nothing is inserted for a
+    missing vacancy even where foreign keys are not enforced (SQLite), and
+    ON CONFLICT on uq_responses_user_vacancy turns a concurrent duplicate
+    into a no-op instead of an error. RETURNING yields the new row, if any.
+    
+    Args:
+        dialect_name (str): Name of the database dialect
+        response (ResponseCreate): Response data
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    source = select(
+        literal(response.user_id),
+        Vacancy.id,
+        literal(ResponseStatus.CREATED, Response.status.type),
+    ).where(Vacancy.id == response.vacancy_id)
+    return (
+        insert(Response)
+        .from_select(["user_id", "vacancy_id", "status"], source)
+        .on_conflict_do_nothing(index_elements=["user_id", "vacancy_id"])
+        .returning(Response)
+    )
+
+
+# Name PostgreSQL gives the foreign key of responses.vacancy_id
+_VACANCY_FOREIGN_KEY = "responses_vacancy_id_fkey"
+
+
+def _vacancy_deleted(error: IntegrityError) -> bool:
+    # Only the vacancy's foreign key means the vacancy went away between the
+    # SELECT and the INSERT; any other violation, e.g. a deleted user, is not
+    # a missing vacancy and must not be reported as one
+    return _VACANCY_FOREIGN_KEY in str(error.orig)
+
+
+def _existing_response(response: ResponseCreate):
+    # After a conflict the winning row may be too new for a replica
+    return (
+        select(Response)
+        .where(Response.user_id == response.user_id, Response.vacancy_id == response.vacancy_id)
+        .execution_options(**{READ_PRIMARY_OPTION: True})
+    )
 
 
 class ResponseService:
@@ -33,7 +190,8 @@ class ResponseService:
         user_id: int,
         skip: int = 0, 
         limit: int = 20,
-        status: Optional[ResponseStatus] = None
+        status: Optional[ResponseStatus] = None,
+        cursor: Optional[str] = None
     ) -> List[Response]:
         """
         Get responses for a user
@@ -43,28 +201,26 @@ class ResponseService:
             skip (int): Number of records to skip
             limit (int): Maximum number of records to return
             status (Optional[ResponseStatus]): Filter by response status
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
             
         Returns:
-            List[Response]: List of responses
+            List[Response]: List of responses, newest first
         """
-        # Check if user exists
-        user = self.user_service.get_user(user_id)
-        if not user:
-            return []
-        
         query = self.db.query(Response).filter(Response.user_id == user_id)
         
         if status:
             query = query.filter(Response.status == status)
         
-        return query.offset(skip).limit(limit).all()
+        query = paginate(query, Response.created, Response.id, skip=skip, limit=limit, cursor=cursor)
+        return query.all()
     
     def get_responses_for_vacancy(
         self, 
         vacancy_id: int,
         skip: int = 0, 
         limit: int = 20,
-        status: Optional[ResponseStatus] = None
+        status: Optional[ResponseStatus] = None,
+        cursor: Optional[str] = None
     ) -> List[Response]:
         """
         Get responses for a vacancy
@@ -74,56 +230,49 @@ class ResponseService:
             skip (int): Number of records to skip
             limit (int): Maximum number of records to return
             status (Optional[ResponseStatus]): Filter by response status
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
             
         Returns:
-            List[Response]: List of responses
+            List[Response]: List of responses, newest first
         """
-        # Check if vacancy exists
-        vacancy = self.vacancy_service.get_vacancy(vacancy_id)
-        if not vacancy:
-            return []
-        
         query = self.db.query(Response).filter(Response.vacancy_id == vacancy_id)
         
         if status:
             query = query.filter(Response.status == status)
         
-        return query.offset(skip).limit(limit).all()
+        query = paginate(query, Response.created, Response.id, skip=skip, limit=limit, cursor=cursor)
+        return query.all()
     
     def create_response(self, response: ResponseCreate) -> Optional[Response]:
         """
-        Create a new response
+        Create a new response, or get the user's existing one for the vacancy
+        
+        The user is not looked up: callers pass the authenticated user's ID.
         
         Args:
             response (ResponseCreate): Response data
             
         Returns:
-            Optional[Response]: Created response instance or None if validation fails
+            Optional[Response]: Created or existing response instance, or None
+            if the vacancy does not exist
+            
+        Raises:
+            IntegrityError: On any other constraint violation, e.g. if the
+                user does not exist
         """
-        # Validate user and vacancy exist
-        user = self.user_service.get_user(response.user_id)
-        vacancy = self.vacancy_service.get_vacancy(response.vacancy_id)
-        
-        if not user or not vacancy:
+        statement = _insert_response(self.db.get_bind().dialect.name, response)
+        try:
+            db_response = self.db.execute(statement).scalars().first()
+            if db_response is None:
+                # Already applied, or no such vacancy
+                db_response = self.db.execute(_existing_response(response)).scalars().first()
+            commit(self.db)
+        except IntegrityError as e:
+            rollback(self.db)
+            if not _vacancy_deleted(e):
+                raise
+            logger.warning("Response of user %s to vacancy %s: vacancy deleted meanwhile.", response.user_id, response.vacancy_id)
             return None
-        
-        # Check if response already exists
-        existing_response = self.db.query(Response).filter(
-            Response.user_id == response.user_id,
-            Response.vacancy_id == response.vacancy_id
-        ).first()
-        
-        if existing_response:
-            return existing_response
-        
-        db_response = Response(
-            user_id=response.user_id,
-            vacancy_id=response.vacancy_id,
-            status=ResponseStatus.CREATED
-        )
-        self.db.add(db_response)
-        self.db.commit()
-        self.db.refresh(db_response)
         return db_response
     
     def update_response_status(self, response_id: int, status: ResponseStatus) -> Optional[Response]:
@@ -135,22 +284,255 @@ class ResponseService:
             status (ResponseStatus): New status
             
         Returns:
-            Optional[Response]: Updated response instance or None if not found
+            Optional[Response]: Updated (or already so) response instance or
+            None if not found
+            
+        Raises:
+            InvalidStatusTransition: If the current status does not allow the new one
         """
-        db_response = self.get_response(response_id)
+        db_response = self.db.execute(_update_status(response_id, status)).scalars().first()
         if not db_response:
+            rollback(self.db)
+            db_response = self.db.execute(_current_response(response_id)).scalars().first()
+            if db_response is not None and db_response.status != status:
+                raise InvalidStatusTransition(db_response.status, status)
+            return db_response
+        
+        commit(self.db)
+        return db_response
+    
+    def update_response_statuses(
+        self,
+        status: ResponseStatus,
+        ids: Sequence[int],
+        from_status: Optional[ResponseStatus] = None,
+    ) -> List[StatusChange]:
+        """
+        Move several responses to a new status with a single UPDATE
+        
+        Responses whose current status does not allow the move (see
+        RESPONSE_TRANSITIONS) are left unchanged. Only when some of the
+        given IDs were not updated is a second query run to tell why.
+        
+        Args:
+            status (ResponseStatus): New status
+            ids (Sequence[int]): Response IDs
+            from_status (Optional[ResponseStatus]): Only move responses currently in this status
+            
+        Returns:
+            List[StatusChange]: Outcome per given ID
+        """
+        ids = list(dict.fromkeys(ids))
+        try:
+            updated = list(self.db.execute(_bulk_status_update(status, from_status, ids)).scalars())
+            current: Dict[int, ResponseStatus] = {}
+            if len(updated) < len(ids):
+                rest = set(ids).difference(updated)
+                current = dict(self.db.execute(_current_statuses(rest)).tuples().all())
+            commit(self.db)
+        except Exception:
+            rollback(self.db)
+            raise
+        return _status_outcomes(status, ids, updated, current)
+
+
+class AsyncResponseService:
+    """
+    Async service for response-related operations
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        user_service: AsyncUserService,
+        vacancy_service: AsyncVacancyService,
+    ):
+        self.db = db
+        self.user_service = user_service
+        self.vacancy_service = vacancy_service
+    
+    async def get_response(self, response_id: int) -> Optional[Response]:
+        """
+        Get a response by ID
+        
+        Args:
+            response_id (int): Response ID
+            
+        Returns:
+            Optional[Response]: Response instance or None if not found
+        """
+        result = await self.db.execute(select(Response).where(Response.id == response_id))
+        return result.scalars().first()
+    
+    async def get_responses_for_user(
+        self, 
+        user_id: int,
+        skip: int = 0, 
+        limit: int = 20,
+        status: Optional[ResponseStatus] = None,
+        cursor: Optional[str] = None
+    ) -> List[Response]:
+        """
+        Get responses for a user
+        
+        Args:
+            user_id (int): User ID
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            status (Optional[ResponseStatus]): Filter by response status
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
+            
+        Returns:
+            List[Response]: List of responses, newest first
+        """
+        query = select(Response).where(Response.user_id == user_id)
+        
+        if status:
+            query = query.where(Response.status == status)
+        
+        query = paginate(query, Response.created, Response.id, skip=skip, limit=limit, cursor=cursor)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+    
+    async def get_responses_for_vacancy(
+        self, 
+        vacancy_id: int,
+        skip: int = 0, 
+        limit: int = 20,
+        status: Optional[ResponseStatus] = None,
+        cursor: Optional[str] = None
+    ) -> List[Response]:
+        """
+        Get responses for a vacancy
+        
+        Args:
+            vacancy_id (int): Vacancy ID
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            status (Optional[ResponseStatus]): Filter by response status
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
+            
+        Returns:
+            List[Response]: List of responses, newest first
+        """
+        query = select(Response).where(Response.vacancy_id == vacancy_id)
+        
+        if status:
+            query = query.where(Response.status == status)
+        
+        query = paginate(query, Response.created, Response.id, skip=skip, limit=limit, cursor=cursor)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+    
+    async def create_response(self, response: ResponseCreate) -> Optional[Response]:
+        """
+        Create a new response, or get the user's existing one for the vacancy
+        
+        The user is not looked up: callers pass the authenticated user's ID.
+        
+        Args:
+            response (ResponseCreate): Response data
+            
+        Returns:
+            Optional[Response]: Created or existing response instance, or None
+            if the vacancy does not exist
+            
+        Raises:
+            IntegrityError: On any other constraint violation, e.g. if the
+                user does not exist
+        """
+        statement = _insert_response(self.db.get_bind().dialect.name, response)
+        try:
+            result = await self.db.execute(statement)
+            db_response = result.scalars().first()
+            if db_response is None:
+                # Already applied, or no such vacancy
+                result = await self.db.execute(_existing_response(response))
+                db_response = result.scalars().first()
+            await acommit(self.db)
+        except IntegrityError as e:
+            await arollback(self.db)
+            if not _vacancy_deleted(e):
+                raise
+            logger.warning("Response of user %s to vacancy %s: vacancy deleted meanwhile.", response.user_id, response.vacancy_id)
             return None
+        return db_response
+    
+    async def update_response_status(self, response_id: int, status: ResponseStatus) -> Optional[Response]:
+        """
+        Update response status
+        
+        Args:
+            response_id (int): Response ID
+            status (ResponseStatus): New status
+            
+        Returns:
+            Optional[Response]: Updated (or already so) response instance or
+            None if not found
+            
+        Raises:
+            InvalidStatusTransition: If the current status does not allow the new one
+        """
+        result = await self.db.execute(_update_status(response_id, status))
+        db_response = result.scalars().first()
+        if not db_response:
+            await arollback(self.db)
+            result = await self.db.execute(_current_response(response_id))
+            db_response = result.scalars().first()
+            if db_response is not None and db_response.status != status:
+                raise InvalidStatusTransition(db_response.status, status)
+            return db_response
         
-        db_response.status = status
-        self.db.commit()
-        self.db.refresh(db_response)
+        await acommit(self.db)
         return db_response
+    
+    async def update_response_statuses(
+        self,
+        status: ResponseStatus,
+        ids: Sequence[int],
+        from_status: Optional[ResponseStatus] = None,
+    ) -> List[StatusChange]:
+        """
+        Move several responses to a new status with a single UPDATE
+        
+        Responses whose current status does not allow the move (see
+        RESPONSE_TRANSITIONS) are left unchanged. Only when some of the
+        given IDs were not updated is a second query run to tell why.
+        
+        Args:
+            status (ResponseStatus): New status
+            ids (Sequence[int]): Response IDs
+            from_status (Optional[ResponseStatus]): Only move responses currently in this status
+            
+        Returns:
+            List[StatusChange]: Outcome per given ID
+        """
+        ids = list(dict.fromkeys(ids))
+        try:
+            result = await self.db.execute(_bulk_status_update(status, from_status, ids))
+            updated = list(result.scalars())
+            current: Dict[int, ResponseStatus] = {}
+            if len(updated) < len(ids):
+                rest = set(ids).difference(updated)
+                result = await self.db.execute(_current_statuses(rest))
+                current = dict(result.tuples().all())
+            await acommit(self.db)
+        except Exception:
+            await arollback(self.db)
+            raise
+        return _status_outcomes(status, ids, updated, current)
+
+
+def _response_service(db: Session) -> ResponseService:
+    from app.services.factory import ServiceFactory
+    return ServiceFactory.create_response_service(
+        db, ServiceFactory.create_user_service(db), ServiceFactory.create_vacancy_service(db)
+    )
 
 
 # For backwards compatibility with function-based approach
 def get_response(db: Session, response_id: int) -> Optional[Response]:
-    from app.services.factory import ServiceFactory
-    response_service = ServiceFactory.create_response_service(db)
+    response_service = _response_service(db)
     return response_service.get_response(response_id)
 
 
@@ -159,15 +541,16 @@ def get_responses_for_user(
     user_id: int,
     skip: int = 0, 
     limit: int = 20,
-    status: Optional[ResponseStatus] = None
+    status: Optional[ResponseStatus] = None,
+    cursor: Optional[str] = None
 ) -> List[Response]:
-    from app.services.factory import ServiceFactory
-    response_service = ServiceFactory.create_response_service(db)
+    response_service = _response_service(db)
     return response_service.get_responses_for_user(
         user_id=user_id,
         skip=skip,
         limit=limit,
-        status=status
+        status=status,
+        cursor=cursor
     )
 
 
@@ -176,25 +559,24 @@ def get_responses_for_vacancy(
     vacancy_id: int,
     skip: int = 0, 
     limit: int = 20,
-    status: Optional[ResponseStatus] = None
+    status: Optional[ResponseStatus] = None,
+    cursor: Optional[str] = None
 ) -> List[Response]:
-    from app.services.factory import ServiceFactory
-    response_service = ServiceFactory.create_response_service(db)
+    response_service = _response_service(db)
     return response_service.get_responses_for_vacancy(
         vacancy_id=vacancy_id,
         skip=skip,
         limit=limit,
-        status=status
+        status=status,
+        cursor=cursor
     )
 
 
 def create_response(db: Session, response: ResponseCreate) -> Response:
-    from app.services.factory import ServiceFactory
-    response_service = ServiceFactory.create_response_service(db)
+    response_service = _response_service(db)
     return response_service.create_response(response)
 
 
 def update_response_status(db: Session, response_id: int, status: ResponseStatus) -> Optional[Response]:
-    from app.services.factory import ServiceFactory
-    response_service = ServiceFactory.create_response_service(db)
+    response_service = _response_service(db)
     return response_service.update_response_status(response_id, status)
@@ -0,0 +1,147 @@
+import re
+from typing import Any, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import ColumnElement, func, literal_column, or_, select, table, column
+
+from app.db.models import Vacancy
+from app.db.search import VACANCY_FTS_TABLE, VACANCY_FTS_WEIGHTS, VACANCY_SEARCH_DOCUMENT
+
+QueryT = TypeVar("QueryT")
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+CYRILLIC_RE = re.compile(r"[а-яё]", re.IGNORECASE)
+
+# Common Russian inflection endings, longest first. FTS5 has no Russian
+# stemmer, so query words are reduced to a stem and matched as a prefix.
+_RUSSIAN_ENDINGS = sorted(
+    (
+        "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ией", "ий", "ый", "ой",
+        "ая", "яя", "ое", "ее", "ую", "юю", "ах", "ях", "ов", "ев", "ей", "ам", "ям", "ом",
+        "ем", "ию", "ия", "ие", "а", "я", "о", "е", "ы", "и", "у", "ю", "ь",
+    ),
+    key=len,
+    reverse=True,
+)
+_MIN_RUSSIAN_STEM = 3
+
+
+def stem_russian(word: str) -> str:
+    """
+    Strip a common Russian inflection ending from a lowercase word
+
+    Args:
+        word (str): Lowercase word
+
+    Returns:
+        str: Approximate stem
+    """
+    for ending in _RUSSIAN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_RUSSIAN_STEM:
+            return word[: -len(ending)]
+    return word
+
+
+def build_fts5_query(search_term: str) -> Optional[str]:
+    """
+    Convert user input into an FTS5 MATCH expression
+
+    Every word must match. English words are stemmed by the porter tokenizer;
+    Russian words are stemmed here and matched as prefixes.
+
+    Args:
+        search_term (str): Raw search input
+
+    Returns:
+        Optional[str]: FTS5 query, or None if the input has no searchable words
+    """
+    terms = []
+    for word in WORD_RE.findall(search_term.lower()):
+        if CYRILLIC_RE.search(word):
+            terms.append(f'"{stem_russian(word)}"*')
+        else:
+            terms.append(f'"{word}"')
+    return " ".join(terms) or None
+
+
+def _postgresql_search(query: QueryT, search_term: str) -> Tuple[QueryT, ColumnElement]:
+    document = literal_column(f"({VACANCY_SEARCH_DOCUMENT})")
+    ts_query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), search_term).op("||")(
+        func.websearch_to_tsquery(literal_column("'english'::regconfig"), search_term)
+    )
+    query = query.where(document.op("@@")(ts_query))
+    return query, func.ts_rank_cd(document, ts_query)
+
+
+def _sqlite_search(query: QueryT, search_term: str) -> Tuple[QueryT, Optional[ColumnElement]]:
+    fts_query = build_fts5_query(search_term)
+    if fts_query is None:
+        return query, None
+    fts = table(VACANCY_FTS_TABLE, column("rowid"))
+    fts_table = literal_column(VACANCY_FTS_TABLE)
+    ranked = (
+        select(
+            fts.c.rowid.label("vacancy_id"),
+            # bm25 is lower for better matches; negate it so higher ranks first
+            (-func.bm25(fts_table, *VACANCY_FTS_WEIGHTS)).label("rank"),
+        )
+        .select_from(fts)
+        .where(fts_table.op("MATCH")(fts_query))
+        .subquery("vacancy_search")
+    )
+    query = query.join(ranked, ranked.c.vacancy_id == Vacancy.id)
+    return query, ranked.c.rank
+
+
+def _like_search(query: QueryT, search_term: str) -> QueryT:
+    search_term = f"%{search_term}%"
+    return query.where(
+        or_(
+            Vacancy.name.ilike(search_term),
+            Vacancy.short_description.ilike(search_term),
+            Vacancy.full_description.ilike(search_term)
+        )
+    )
+
+
+def apply_vacancy_search(
+    query: QueryT,
+    search_term: str,
+    dialect_name: str,
+) -> Tuple[QueryT, Optional[ColumnElement]]:
+    """
+    Restrict a vacancy query to full-text matches of the search term
+
+    PostgreSQL uses the tsvector expression index, SQLite the FTS5 table.
+    Other databases fall back to unranked ILIKE matching.
+
+    Args:
+        query (QueryT): ORM Query or Select over Vacancy
+        search_term (str): Raw search input
+        dialect_name (str): Name of the database dialect
+
+    Returns:
+        Tuple[QueryT, Optional[ColumnElement]]: Filtered query and its relevance
+        expression (higher is better), or None if results are unranked
+    """
+    if dialect_name == "postgresql":
+        return _postgresql_search(query, search_term)
+    if dialect_name == "sqlite":
+        return _sqlite_search(query, search_term)
+    return _like_search(query, search_term), None
+
+
+def attach_rank(rows: Sequence[Any]) -> List[Vacancy]:
+    """
+    Unpack (vacancy, rank) rows, keeping the rank on each vacancy
+
+    Args:
+        rows (Sequence[Any]): Rows selected with the relevance column
+
+    Returns:
+        List[Vacancy]: Vacancies with a search_rank attribute
+    """
+    vacancies = []
+    for vacancy, rank in rows:
+        vacancy.search_rank = rank
+        vacancies.append(vacancy)
+    return vacancies
@@ -1,24 +1,97 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
 from fastapi import Depends
 import logging
 
-from app.db.models import User, UserStatus
+from app.core.cache import CacheBackend, CacheFullError
+from app.core.tokens import RevocationList
+from app.db.models import RefreshToken, User, UserStatus
+from app.db.routing import READ_PRIMARY_OPTION
+from app.db.unit_of_work import aafter_commit, acommit, after_commit, arollback, commit, rollback
 from app.schemas.requests import UserCreate, UserUpdate
-from app.core.auth import get_password_hash
+from app.core.auth import get_password_hash, password_hasher
 from app.db.session import get_db
+from app.services.pagination import paginate
+from app.services.projection import load_fields
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class Principal(NamedTuple):
+    """
+    Authenticated user, reduced to the fields needed for authorization
+    """
+    id: int
+    email: str
+    status: UserStatus
+
+
+def _principal_key(user_id: int) -> str:
+    return f"principal:v1:{user_id}"
+
+
+def _principal_query(user_id: int):
+    # Always the primary: a lagging replica could still show a banned user as active
+    return (
+        select(User.id, User.email, User.status)
+        .where(User.id == user_id)
+        .execution_options(**{READ_PRIMARY_OPTION: True})
+    )
+
+
+def _insert_user(user: UserCreate, password_hash: str):
+    return (
+        insert(User)
+        .values(**user.model_dump(exclude={"password"}), password=password_hash, status=UserStatus.CREATED)
+        .returning(User)
+    )
+
+
+def _update_user(user_id: int, values: Dict[str, Any]):
+    # The row comes back with the UPDATE, so no SELECT before or after it
+    statement = update(User).where(User.id == user_id).values(**values).returning(User)
+    return select(User).from_statement(statement).execution_options(populate_existing=True)
+
+
+def _principal_to_cache(principal: Principal) -> Dict[str, Any]:
+    return {"id": principal.id, "email": principal.email, "status": principal.status.name}
+
+
+def _principal_from_cache(data: Dict[str, Any]) -> Principal:
+    return Principal(data["id"], data["email"], UserStatus[data["status"]])
+
+
 class UserService:
     """
     Service for user-related operations
     """
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        principal_cache: Optional[CacheBackend] = None,
+        revocations: Optional[RevocationList] = None,
+    ):
         self.db = db
+        self.principal_cache = principal_cache
+        self.revocations = revocations
+    
+    def _invalidate_principal(self, user_id: int) -> None:
+        if self.principal_cache is not None:
+            self.principal_cache.invalidate(_principal_key(user_id))
+    
+    def _after_ban(self, user_id: int) -> None:
+        self._invalidate_principal(user_id)
+        if self.revocations is not None:
+            # Reject the user's outstanding tokens without a users lookup
+            try:
+                self.revocations.revoke_subject(str(user_id))
+            except CacheFullError:
+                # A full list is process-local, so principals are not cached
+                # and every request still sees the banned status
+                logger.error("Revocation list is full; tokens of banned user %s not revoked", user_id)
     
     def get_user(self, user_id: int) -> Optional[User]:
         """
@@ -30,13 +103,36 @@ class UserService:
         Returns:
             Optional[User]: User instance or None if not found
         """
-        logger.info(f"Fetching user by ID: {user_id}")
+        logger.debug("Fetching user by ID: %s", user_id)
         user = self.db.query(User).filter(User.id == user_id).first()
         if user:
-            logger.info(f"User found with ID: {user_id}")
+            logger.debug("User found with ID: %s", user_id)
         else:
-            logger.warning(f"User not found with ID: {user_id}")
+            logger.warning("User not found with ID: %s", user_id)
         return user
+    
+    def get_principal(self, user_id: int) -> Optional[Principal]:
+        """
+        Get the fields needed to authorize a user, from the cache when possible
+        
+        Args:
+            user_id (int): User ID
+            
+        Returns:
+            Optional[Principal]: Principal or None if the user does not exist
+        """
+        if self.principal_cache is not None:
+            cached = self.principal_cache.get(_principal_key(user_id))
+            if cached is not None:
+                return _principal_from_cache(cached)
+        row = self.db.execute(_principal_query(user_id)).first()
+        if row is None:
+            return None
+        principal = Principal(*row)
+        if self.principal_cache is not None:
+            # add(), not set(): never overwrite an invalidation that raced this read
+            self.principal_cache.add(_principal_key(user_id), _principal_to_cache(principal))
+        return principal
 
     
     def get_user_by_email(self, email: str) -> Optional[User]:
@@ -49,12 +145,12 @@ class UserService:
         Returns:
             Optional[User]: User instance or None if not found
         """
-        logger.info(f"Fetching user by email: {email}")
+        logger.debug("Fetching user by email: %s", email)
         user = self.db.query(User).filter(User.email == email).first()
         if user:
-            logger.info(f"User found with email: {email}")
+            logger.debug("User found with email: %s", email)
         else:
-            logger.info(f"User not found with email: {email}") # Changed to info as this is a common check
+            logger.debug("User not found with email: %s", email)
         return user
         
     
@@ -62,7 +158,9 @@ class UserService:
         self, 
         skip: int = 0, 
         limit: int = 100,
-        status: Optional[UserStatus] = None
+        status: Optional[UserStatus] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
     ) -> List[User]:
         """
         Get a list of users
@@ -71,16 +169,20 @@ class UserService:
             skip (int): Number of records to skip
             limit (int): Maximum number of records to return
             status (Optional[UserStatus]): Filter by user status
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
+            fields (Optional[Sequence[str]]): Columns to load; others are deferred
             
         Returns:
-            List[User]: List of users
+            List[User]: List of users, newest first
         """
-        logger.info(f"Fetching users with skip: {skip}, limit: {limit}, status: {status}")
+        logger.debug("Fetching users with skip: %s, limit: %s, status: %s", skip, limit, status)
         query = self.db.query(User)
+        if fields:
+            query = query.options(load_fields(User, fields))
         if status:
             query = query.filter(User.status == status)
-        users = query.offset(skip).limit(limit).all()
-        logger.info(f"Found {len(users)} users.")
+        users = paginate(query, User.created, User.id, skip=skip, limit=limit, cursor=cursor).all()
+        logger.debug("Found %s users.", len(users))
         return users
         
     
@@ -94,27 +196,17 @@ class UserService:
         Returns:
             User: Created user instance
         """
-        logger.info(f"Creating user with email: {user.email}")
+        logger.info("Creating user with email: %s", user.email)
         hashed_password = get_password_hash(user.password)
-        db_user = User(
-            email=user.email,
-            phone=user.phone,
-            name=user.name,
-            surname=user.surname,
-            patronymic=user.patronymic,
-            cv_text=user.cv_text,
-            password=hashed_password,
-            status=UserStatus.CREATED
-        )
         try:
-            self.db.add(db_user)
-            self.db.commit()
-            self.db.refresh(db_user)
-            logger.info(f"User created successfully with ID: {db_user.id} and email: {db_user.email}")
+            result = self.db.execute(_insert_user(user, hashed_password))
+            db_user = result.scalars().one()
+            commit(self.db)
+            logger.info("User created successfully with ID: %s and email: %s", db_user.id, db_user.email)
             return db_user
         except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error creating user with email {user.email}: {e}", exc_info=True)
+            rollback(self.db)
+            logger.error("Error creating user with email %s: %s", user.email, e, exc_info=True)
             raise
         
     
@@ -129,12 +221,7 @@ class UserService:
         Returns:
             Optional[User]: Updated user instance or None if not found
         """
-        logger.info(f"Updating user with ID: {user_id}")
-        db_user = self.get_user(user_id)
-        if not db_user:
-            logger.warning(f"Update failed: User not found with ID: {user_id}")
-            return None
-
+        logger.info("Updating user with ID: %s", user_id)
         update_data = user.model_dump(exclude_unset=True)
         if 'password' in update_data and update_data['password']:
             hashed_password = get_password_hash(update_data['password'])
@@ -142,17 +229,21 @@ class UserService:
         elif 'password' in update_data: # Password field exists but is empty or None
             del update_data['password'] # Don't update password if not provided
 
-        for key, value in update_data.items():
-            setattr(db_user, key, value)
-        
         try:
-            self.db.commit()
-            self.db.refresh(db_user)
-            logger.info(f"User with ID: {user_id} updated successfully.")
+            db_user = self.db.execute(_update_user(user_id, update_data)).scalars().first()
+            if not db_user:
+                rollback(self.db)
+                logger.warning("Update failed: User not found with ID: %s", user_id)
+                return None
+            # Also before the commit, so no request sees the old entry meanwhile
+            self._invalidate_principal(user_id)
+            commit(self.db)
+            after_commit(self.db, lambda: self._invalidate_principal(user_id))
+            logger.info("User with ID: %s updated successfully.", user_id)
             return db_user
         except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error updating user with ID {user_id}: {e}", exc_info=True)
+            rollback(self.db)
+            logger.error("Error updating user with ID %s: %s", user_id, e, exc_info=True)
             raise
         
     
@@ -166,21 +257,250 @@ class UserService:
         Returns:
             Optional[User]: Updated user instance or None if not found
         """
-        logger.info(f"Attempting to ban user with ID: {user_id}")
-        db_user = self.get_user(user_id)
-        if not db_user:
-            logger.warning(f"Ban failed: User not found with ID: {user_id}")
+        logger.info("Attempting to ban user with ID: %s", user_id)
+        try:
+            db_user = self.db.execute(_update_user(user_id, {"status": UserStatus.BANNED})).scalars().first()
+            if not db_user:
+                rollback(self.db)
+                logger.warning("Ban failed: User not found with ID: %s", user_id)
+                return None
+            # End all sessions, so no new access tokens can be refreshed
+            self.db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+            self._invalidate_principal(user_id)
+            commit(self.db)
+            after_commit(self.db, lambda: self._after_ban(user_id))
+            logger.info("User with ID: %s banned successfully.", user_id)
+            return db_user
+        except Exception as e:
+            rollback(self.db)
+            logger.error("Error banning user with ID %s: %s", user_id, e, exc_info=True)
+            raise
+
+
+class AsyncUserService:
+    """
+    Async service for user-related operations
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        principal_cache: Optional[CacheBackend] = None,
+        revocations: Optional[RevocationList] = None,
+    ):
+        self.db = db
+        self.principal_cache = principal_cache
+        self.revocations = revocations
+    
+    async def _invalidate_principal(self, user_id: int) -> None:
+        if self.principal_cache is not None:
+            await self.principal_cache.ainvalidate(_principal_key(user_id))
+    
+    async def _after_ban(self, user_id: int) -> None:
+        await self._invalidate_principal(user_id)
+        if self.revocations is not None:
+            try:
+                await self.revocations.arevoke_subject(str(user_id))
+            except CacheFullError:
+                logger.error("Revocation list is full; tokens of banned user %s not revoked", user_id)
+    
+    async def get_user(self, user_id: int) -> Optional[User]:
+        """
+        Get a user by ID
+        
+        Args:
+            user_id (int): User ID
+            
+        Returns:
+            Optional[User]: User instance or None if not found
+        """
+        logger.debug("Fetching user by ID: %s", user_id)
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        user = result.scalars().first()
+        if user:
+            logger.debug("User found with ID: %s", user_id)
+        else:
+            logger.warning("User not found with ID: %s", user_id)
+        return user
+    
+    async def get_principal(self, user_id: int) -> Optional[Principal]:
+        """
+        Get the fields needed to authorize a user, from the cache when possible
+        
+        Args:
+            user_id (int): User ID
+            
+        Returns:
+            Optional[Principal]: Principal or None if the user does not exist
+        """
+        if self.principal_cache is not None:
+            cached = await self.principal_cache.aget(_principal_key(user_id))
+            if cached is not None:
+                return _principal_from_cache(cached)
+        result = await self.db.execute(_principal_query(user_id))
+        row = result.first()
+        if row is None:
             return None
+        principal = Principal(*row)
+        if self.principal_cache is not None:
+            await self.principal_cache.aadd(_principal_key(user_id), _principal_to_cache(principal))
+        return principal
+    
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """
+        Get a user by email
         
-        db_user.status = UserStatus.BANNED
+        Args:
+            email (str): User email
+            
+        Returns:
+            Optional[User]: User instance or None if not found
+        """
+        logger.debug("Fetching user by email: %s", email)
+        result = await self.db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+        if user:
+            logger.debug("User found with email: %s", email)
+        else:
+            logger.debug("User not found with email: %s", email)
+        return user
+    
+    async def get_users(
+        self, 
+        skip: int = 0, 
+        limit: int = 100,
+        status: Optional[UserStatus] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[User]:
+        """
+        Get a list of users
+        
+        Args:
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            status (Optional[UserStatus]): Filter by user status
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
+            fields (Optional[Sequence[str]]): Columns to load; others are deferred
+            
+        Returns:
+            List[User]: List of users, newest first
+        """
+        logger.debug("Fetching users with skip: %s, limit: %s, status: %s", skip, limit, status)
+        query = select(User)
+        if fields:
+            query = query.options(load_fields(User, fields))
+        if status:
+            query = query.where(User.status == status)
+        query = paginate(query, User.created, User.id, skip=skip, limit=limit, cursor=cursor)
+        result = await self.db.execute(query)
+        users = list(result.scalars().all())
+        logger.debug("Found %s users.", len(users))
+        return users
+    
+    async def create_user(self, user: UserCreate) -> User:
+        """
+        Create a new user
+        
+        Args:
+            user (UserCreate): User data
+            
+        Returns:
+            User: Created user instance
+        """
+        logger.info("Creating user with email: %s", user.email)
+        hashed_password = await password_hasher.ahash(user.password)
+        try:
+            result = await self.db.execute(_insert_user(user, hashed_password))
+            db_user = result.scalars().one()
+            await acommit(self.db)
+            logger.info("User created successfully with ID: %s and email: %s", db_user.id, db_user.email)
+            return db_user
+        except Exception as e:
+            await arollback(self.db)
+            logger.error("Error creating user with email %s: %s", user.email, e, exc_info=True)
+            raise
+    
+    async def update_user(self, user_id: int, user: UserUpdate) -> Optional[User]:
+        """
+        Update a user
+        
+        Args:
+            user_id (int): User ID
+            user (UserUpdate): User data
+            
+        Returns:
+            Optional[User]: Updated user instance or None if not found
+        """
+        logger.info("Updating user with ID: %s", user_id)
+        update_data = user.model_dump(exclude_unset=True)
+        if 'password' in update_data and update_data['password']:
+            update_data['password'] = await password_hasher.ahash(update_data['password'])
+        elif 'password' in update_data:
+            del update_data['password']
+
+        try:
+            result = await self.db.execute(_update_user(user_id, update_data))
+            db_user = result.scalars().first()
+            if not db_user:
+                await arollback(self.db)
+                logger.warning("Update failed: User not found with ID: %s", user_id)
+                return None
+            # Also before the commit, so no request sees the old entry meanwhile
+            await self._invalidate_principal(user_id)
+            await acommit(self.db)
+            await aafter_commit(self.db, lambda: self._invalidate_principal(user_id))
+            logger.info("User with ID: %s updated successfully.", user_id)
+            return db_user
+        except Exception as e:
+            await arollback(self.db)
+            logger.error("Error updating user with ID %s: %s", user_id, e, exc_info=True)
+            raise
+    
+    async def set_password_hash(self, db_user: User, password_hash: str) -> None:
+        """
+        Store a recomputed hash of the user's unchanged password
+        
+        Args:
+            db_user (User): User instance
+            password_hash (str): New password hash
+        """
+        db_user.password = password_hash
+        try:
+            await acommit(self.db)
+            logger.info("Password hash of user with ID: %s upgraded.", db_user.id)
+        except Exception as e:
+            await arollback(self.db)
+            logger.error("Error upgrading password hash of user with ID %s: %s", db_user.id, e, exc_info=True)
+            raise
+    
+    async def ban_user(self, user_id: int) -> Optional[User]:
+        """
+        Ban a user
+        
+        Args:
+            user_id (int): User ID
+            
+        Returns:
+            Optional[User]: Updated user instance or None if not found
+        """
+        logger.info("Attempting to ban user with ID: %s", user_id)
         try:
-            self.db.commit()
-            self.db.refresh(db_user)
-            logger.info(f"User with ID: {user_id} banned successfully.")
+            result = await self.db.execute(_update_user(user_id, {"status": UserStatus.BANNED}))
+            db_user = result.scalars().first()
+            if not db_user:
+                await arollback(self.db)
+                logger.warning("Ban failed: User not found with ID: %s", user_id)
+                return None
+            await self.db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+            await self._invalidate_principal(user_id)
+            await acommit(self.db)
+            await aafter_commit(self.db, lambda: self._after_ban(user_id))
+            logger.info("User with ID: %s banned successfully.", user_id)
             return db_user
         except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error banning user with ID {user_id}: {e}", exc_info=True)
+            await arollback(self.db)
+            logger.error("Error banning user with ID %s: %s", user_id, e, exc_info=True)
             raise
 
 
@@ -197,9 +517,11 @@ def get_users(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
-    status: Optional[UserStatus] = None
+    status: Optional[UserStatus] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
 ) -> List[User]:
-    return UserService(db).get_users(skip=skip, limit=limit, status=status)
+    return UserService(db).get_users(skip=skip, limit=limit, status=status, cursor=cursor, fields=fields)
 
 
 def create_user(db: Session, user: UserCreate) -> User:
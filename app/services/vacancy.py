@@ -1,8 +1,78 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from sqlalchemy import or_, and_
+from typing import List, NamedTuple, Optional, Dict, Any, Sequence
+from sqlalchemy import func, insert, select, update
+from app.core.cache import CacheBackend
 from app.db.models import Vacancy, VacancyStatus
+from app.db.routing import READ_PRIMARY_OPTION
+from app.db.unit_of_work import aafter_commit, acommit, after_commit, arollback, commit, rollback
 from app.schemas.requests import VacancyCreate, VacancyUpdate
+from app.services.pagination import paginate
+from app.services.projection import load_fields
+from app.services.search import apply_vacancy_search, attach_rank
+from app.services.vacancy_index import VacancyIndex
+
+_CACHED_COLUMNS = ("id", "name", "salary", "short_description", "full_description", "version")
+
+
+class VacancyVersion(NamedTuple):
+    """
+    Validators of a vacancy, for conditional HTTP requests
+    """
+    version: int
+    modified: Optional[datetime]
+
+
+def _cache_key(vacancy_id: int) -> str:
+    return f"vacancy:v2:{vacancy_id}"
+
+
+def _cached_version(data: Dict[str, Any]) -> VacancyVersion:
+    modified = data["updated"] or data["created"]
+    return VacancyVersion(data["version"], datetime.fromisoformat(modified) if modified else None)
+
+
+def _vacancy_to_cache(vacancy: Vacancy) -> Dict[str, Any]:
+    data = {column: getattr(vacancy, column) for column in _CACHED_COLUMNS}
+    data["created"] = vacancy.created.isoformat() if vacancy.created else None
+    data["updated"] = vacancy.updated.isoformat() if vacancy.updated else None
+    data["status"] = vacancy.status.name
+    return data
+
+
+def _vacancy_from_cache(data: Dict[str, Any]) -> Vacancy:
+    # A transient instance: fine for reading, never add it to a session
+    return Vacancy(
+        **{column: data[column] for column in _CACHED_COLUMNS},
+        created=datetime.fromisoformat(data["created"]) if data["created"] else None,
+        updated=datetime.fromisoformat(data["updated"]) if data["updated"] else None,
+        status=VacancyStatus[data["status"]],
+    )
+
+
+def _vacancy_query(vacancy_id: int, primary: bool = False):
+    query = select(Vacancy).where(Vacancy.id == vacancy_id)
+    if primary:
+        # What goes into the cache must not come from a lagging replica
+        query = query.execution_options(**{READ_PRIMARY_OPTION: True})
+    return query
+
+
+def _insert_vacancy(vacancy: VacancyCreate):
+    return (
+        insert(Vacancy)
+        .values(**vacancy.model_dump(), status=VacancyStatus.CREATED)
+        .returning(Vacancy)
+    )
+
+
+def _update_vacancy(vacancy_id: int, values: Dict[str, Any]):
+    # One UPDATE ... RETURNING instead of a SELECT, the UPDATE and a refresh;
+    # updated and version are set by the database and come back with the row.
+    # populate_existing makes it overwrite an instance the session already holds.
+    statement = update(Vacancy).where(Vacancy.id == vacancy_id).values(**values).returning(Vacancy)
+    return select(Vacancy).from_statement(statement).execution_options(populate_existing=True)
 
 
 class VacancyService:
@@ -10,20 +80,71 @@ class VacancyService:
     Service for vacancy-related operations
     """
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        search_index: Optional[VacancyIndex] = None,
+        cache: Optional[CacheBackend] = None,
+    ):
         self.db = db
+        self.search_index = search_index
+        self.cache = cache
+    
+    def _after_write(self, vacancy: Vacancy, created: bool = False) -> None:
+        if self.search_index is not None:
+            self.search_index.add(vacancy)
+        # Lookups of a missing vacancy are not cached, so a new one has no
+        # entry to replace; a tombstone would only keep it out of the cache
+        if self.cache is not None and not created:
+            self.cache.invalidate(_cache_key(vacancy.id))
+    
+    def _load_vacancy(self, vacancy_id: int, primary: bool = False) -> Optional[Vacancy]:
+        return self.db.execute(_vacancy_query(vacancy_id, primary)).scalars().first()
     
     def get_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
         """
-        Get a vacancy by ID
+        Get a vacancy by ID, from the cache when possible
+        
+        Misses are read from the primary and stored with add(), so a read
+        racing a write cannot put the old row back after the write
+        invalidated it.
         
         Args:
             vacancy_id (int): Vacancy ID
             
         Returns:
-            Optional[Vacancy]: Vacancy instance or None if not found
+            Optional[Vacancy]: Vacancy instance or None if not found; cached
+            vacancies are detached copies
         """
-        return self.db.query(Vacancy).filter(Vacancy.id == vacancy_id).first()
+        if self.cache is None:
+            return self._load_vacancy(vacancy_id)
+        cached = self.cache.get(_cache_key(vacancy_id))
+        if cached is not None:
+            return _vacancy_from_cache(cached)
+        db_vacancy = self._load_vacancy(vacancy_id, primary=True)
+        if db_vacancy is not None:
+            self.cache.add(_cache_key(vacancy_id), _vacancy_to_cache(db_vacancy))
+        return db_vacancy
+    
+    def get_vacancy_version(self, vacancy_id: int) -> Optional[VacancyVersion]:
+        """
+        Get the version and modification time of a vacancy without loading it
+        
+        Args:
+            vacancy_id (int): Vacancy ID
+            
+        Returns:
+            Optional[VacancyVersion]: Validators or None if not found
+        """
+        if self.cache is not None:
+            cached = self.cache.get(_cache_key(vacancy_id))
+            if cached is not None:
+                return _cached_version(cached)
+        row = self.db.execute(
+            select(Vacancy.version, func.coalesce(Vacancy.updated, Vacancy.created))
+            .where(Vacancy.id == vacancy_id)
+        ).first()
+        return VacancyVersion(*row) if row is not None else None
     
     def get_vacancies(
         self, 
@@ -32,7 +153,9 @@ class VacancyService:
         status: Optional[VacancyStatus] = None,
         min_salary: Optional[float] = None,
         max_salary: Optional[float] = None,
-        search_term: Optional[str] = None
+        search_term: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
     ) -> List[Vacancy]:
         """
         Get a list of vacancies with filters
@@ -43,12 +166,28 @@ class VacancyService:
             status (Optional[VacancyStatus]): Filter by vacancy status
             min_salary (Optional[float]): Minimum salary filter
             max_salary (Optional[float]): Maximum salary filter
-            search_term (Optional[str]): Search term for text search
+            search_term (Optional[str]): Full-text search query
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
+            fields (Optional[Sequence[str]]): Columns to load; others are deferred
             
         Returns:
-            List[Vacancy]: List of vacancies
+            List[Vacancy]: List of vacancies, most relevant first when searching, otherwise newest first
         """
+        if search_term and self.search_index is not None and self.search_index.ready:
+            # Answered from memory without a database round trip
+            return self.search_index.search(
+                search_term,
+                skip=skip,
+                limit=limit,
+                status=status,
+                min_salary=min_salary,
+                max_salary=max_salary,
+                cursor=cursor,
+            )
+        
         query = self.db.query(Vacancy)
+        if fields:
+            query = query.options(load_fields(Vacancy, fields))
         
         # Apply filters
         if status:
@@ -63,17 +202,16 @@ class VacancyService:
         if max_salary is not None:
             query = query.filter(Vacancy.salary <= max_salary)
         
+        rank = None
         if search_term:
-            search_term = f"%{search_term}%"
-            query = query.filter(
-                or_(
-                    Vacancy.name.ilike(search_term),
-                    Vacancy.short_description.ilike(search_term),
-                    Vacancy.full_description.ilike(search_term)
-                )
-            )
+            query, rank = apply_vacancy_search(query, search_term, self.db.get_bind().dialect.name)
+            if rank is not None:
+                query = query.add_columns(rank)
         
-        return query.offset(skip).limit(limit).all()
+        query = paginate(query, Vacancy.created, Vacancy.id, skip=skip, limit=limit, cursor=cursor, rank=rank)
+        if rank is not None:
+            return attach_rank(query.all())
+        return query.all()
     
     def create_vacancy(self, vacancy: VacancyCreate) -> Vacancy:
         """
@@ -85,16 +223,9 @@ class VacancyService:
         Returns:
             Vacancy: Created vacancy instance
         """
-        db_vacancy = Vacancy(
-            name=vacancy.name,
-            salary=vacancy.salary,
-            short_description=vacancy.short_description,
-            full_description=vacancy.full_description,
-            status=VacancyStatus.CREATED
-        )
-        self.db.add(db_vacancy)
-        self.db.commit()
-        self.db.refresh(db_vacancy)
+        db_vacancy = self.db.execute(_insert_vacancy(vacancy)).scalars().one()
+        commit(self.db)
+        after_commit(self.db, lambda: self._after_write(db_vacancy, created=True))
         return db_vacancy
     
     def update_vacancy(self, vacancy_id: int, vacancy: VacancyUpdate) -> Optional[Vacancy]:
@@ -108,16 +239,14 @@ class VacancyService:
         Returns:
             Optional[Vacancy]: Updated vacancy instance or None if not found
         """
-        db_vacancy = self.get_vacancy(vacancy_id)
+        update_data = vacancy.model_dump(exclude_unset=True)
+        db_vacancy = self.db.execute(_update_vacancy(vacancy_id, update_data)).scalars().first()
         if not db_vacancy:
+            rollback(self.db)
             return None
         
-        update_data = vacancy.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_vacancy, key, value)
-        
-        self.db.commit()
-        self.db.refresh(db_vacancy)
+        commit(self.db)
+        after_commit(self.db, lambda: self._after_write(db_vacancy))
         return db_vacancy
     
     def update_vacancy_status(self, vacancy_id: int, status: VacancyStatus) -> Optional[Vacancy]:
@@ -131,13 +260,13 @@ class VacancyService:
         Returns:
             Optional[Vacancy]: Updated vacancy instance or None if not found
         """
-        db_vacancy = self.get_vacancy(vacancy_id)
+        db_vacancy = self.db.execute(_update_vacancy(vacancy_id, {"status": status})).scalars().first()
         if not db_vacancy:
+            rollback(self.db)
             return None
         
-        db_vacancy.status = status
-        self.db.commit()
-        self.db.refresh(db_vacancy)
+        commit(self.db)
+        after_commit(self.db, lambda: self._after_write(db_vacancy))
         return db_vacancy
     
     def delete_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
@@ -153,6 +282,219 @@ class VacancyService:
         return self.update_vacancy_status(vacancy_id, VacancyStatus.DELETED)
 
 
+class AsyncVacancyService:
+    """
+    Async service for vacancy-related operations
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        search_index: Optional[VacancyIndex] = None,
+        cache: Optional[CacheBackend] = None,
+    ):
+        self.db = db
+        self.search_index = search_index
+        self.cache = cache
+    
+    async def _after_write(self, vacancy: Vacancy, created: bool = False) -> None:
+        if self.search_index is not None:
+            self.search_index.add(vacancy)
+        # Lookups of a missing vacancy are not cached, so a new one has no
+        # entry to replace; a tombstone would only keep it out of the cache
+        if self.cache is not None and not created:
+            await self.cache.ainvalidate(_cache_key(vacancy.id))
+    
+    async def _load_vacancy(self, vacancy_id: int, primary: bool = False) -> Optional[Vacancy]:
+        result = await self.db.execute(_vacancy_query(vacancy_id, primary))
+        return result.scalars().first()
+    
+    async def get_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
+        """
+        Get a vacancy by ID, from the cache when possible
+        
+        Misses are read from the primary and stored with add(), so a read
+        racing a write cannot put the old row back after the write
+        invalidated it.
+        
+        Args:
+            vacancy_id (int): Vacancy ID
+            
+        Returns:
+            Optional[Vacancy]: Vacancy instance or None if not found; cached
+            vacancies are detached copies
+        """
+        if self.cache is None:
+            return await self._load_vacancy(vacancy_id)
+        cached = await self.cache.aget(_cache_key(vacancy_id))
+        if cached is not None:
+            return _vacancy_from_cache(cached)
+        db_vacancy = await self._load_vacancy(vacancy_id, primary=True)
+        if db_vacancy is not None:
+            await self.cache.aadd(_cache_key(vacancy_id), _vacancy_to_cache(db_vacancy))
+        return db_vacancy
+    
+    async def get_vacancy_version(self, vacancy_id: int) -> Optional[VacancyVersion]:
+        """
+        Get the version and modification time of a vacancy without loading it
+        
+        Args:
+            vacancy_id (int): Vacancy ID
+            
+        Returns:
+            Optional[VacancyVersion]: Validators or None if not found
+        """
+        if self.cache is not None:
+            cached = await self.cache.aget(_cache_key(vacancy_id))
+            if cached is not None:
+                return _cached_version(cached)
+        result = await self.db.execute(
+            select(Vacancy.version, func.coalesce(Vacancy.updated, Vacancy.created))
+            .where(Vacancy.id == vacancy_id)
+        )
+        row = result.first()
+        return VacancyVersion(*row) if row is not None else None
+    
+    async def get_vacancies(
+        self, 
+        skip: int = 0, 
+        limit: int = 20,
+        status: Optional[VacancyStatus] = None,
+        min_salary: Optional[float] = None,
+        max_salary: Optional[float] = None,
+        search_term: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Vacancy]:
+        """
+        Get a list of vacancies with filters
+        
+        Args:
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            status (Optional[VacancyStatus]): Filter by vacancy status
+            min_salary (Optional[float]): Minimum salary filter
+            max_salary (Optional[float]): Maximum salary filter
+            search_term (Optional[str]): Full-text search query
+            cursor (Optional[str]): Keyset cursor; takes precedence over skip
+            fields (Optional[Sequence[str]]): Columns to load; others are deferred
+            
+        Returns:
+            List[Vacancy]: List of vacancies, most relevant first when searching, otherwise newest first
+        """
+        if search_term and self.search_index is not None and self.search_index.ready:
+            # Answered from memory without a database round trip
+            return self.search_index.search(
+                search_term,
+                skip=skip,
+                limit=limit,
+                status=status,
+                min_salary=min_salary,
+                max_salary=max_salary,
+                cursor=cursor,
+            )
+        
+        query = select(Vacancy)
+        if fields:
+            query = query.options(load_fields(Vacancy, fields))
+        
+        # Apply filters
+        if status:
+            query = query.where(Vacancy.status == status)
+        else:
+            # By default, exclude deleted vacancies
+            query = query.where(Vacancy.status != VacancyStatus.DELETED)
+        
+        if min_salary is not None:
+            query = query.where(Vacancy.salary >= min_salary)
+        
+        if max_salary is not None:
+            query = query.where(Vacancy.salary <= max_salary)
+        
+        rank = None
+        if search_term:
+            query, rank = apply_vacancy_search(query, search_term, self.db.get_bind().dialect.name)
+            if rank is not None:
+                query = query.add_columns(rank)
+        
+        query = paginate(query, Vacancy.created, Vacancy.id, skip=skip, limit=limit, cursor=cursor, rank=rank)
+        result = await self.db.execute(query)
+        if rank is not None:
+            return attach_rank(result.all())
+        return list(result.scalars().all())
+    
+    async def create_vacancy(self, vacancy: VacancyCreate) -> Vacancy:
+        """
+        Create a new vacancy
+        
+        Args:
+            vacancy (VacancyCreate): Vacancy data
+            
+        Returns:
+            Vacancy: Created vacancy instance
+        """
+        result = await self.db.execute(_insert_vacancy(vacancy))
+        db_vacancy = result.scalars().one()
+        await acommit(self.db)
+        await aafter_commit(self.db, lambda: self._after_write(db_vacancy, created=True))
+        return db_vacancy
+    
+    async def update_vacancy(self, vacancy_id: int, vacancy: VacancyUpdate) -> Optional[Vacancy]:
+        """
+        Update a vacancy
+        
+        Args:
+            vacancy_id (int): Vacancy ID
+            vacancy (VacancyUpdate): Vacancy data
+            
+        Returns:
+            Optional[Vacancy]: Updated vacancy instance or None if not found
+        """
+        update_data = vacancy.model_dump(exclude_unset=True)
+        result = await self.db.execute(_update_vacancy(vacancy_id, update_data))
+        db_vacancy = result.scalars().first()
+        if not db_vacancy:
+            await arollback(self.db)
+            return None
+        
+        await acommit(self.db)
+        await aafter_commit(self.db, lambda: self._after_write(db_vacancy))
+        return db_vacancy
+    
+    async def update_vacancy_status(self, vacancy_id: int, status: VacancyStatus) -> Optional[Vacancy]:
+        """
+        Update vacancy status
+        
+        Args:
+            vacancy_id (int): Vacancy ID
+            status (VacancyStatus): New status
+            
+        Returns:
+            Optional[Vacancy]: Updated vacancy instance or None if not found
+        """
+        result = await self.db.execute(_update_vacancy(vacancy_id, {"status": status}))
+        db_vacancy = result.scalars().first()
+        if not db_vacancy:
+            await arollback(self.db)
+            return None
+        
+        await acommit(self.db)
+        await aafter_commit(self.db, lambda: self._after_write(db_vacancy))
+        return db_vacancy
+    
+    async def delete_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
+        """
+        Soft delete a vacancy
+        
+        Args:
+            vacancy_id (int): Vacancy ID
+            
+        Returns:
+            Optional[Vacancy]: Updated vacancy instance or None if not found
+        """
+        return await self.update_vacancy_status(vacancy_id, VacancyStatus.DELETED)
+
+
 # For backwards compatibility with function-based approach
 def get_vacancy(db: Session, vacancy_id: int) -> Optional[Vacancy]:
     return VacancyService(db).get_vacancy(vacancy_id)
@@ -165,7 +507,9 @@ def get_vacancies(
     status: Optional[VacancyStatus] = None,
     min_salary: Optional[float] = None,
     max_salary: Optional[float] = None,
-    search_term: Optional[str] = None
+    search_term: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
 ) -> List[Vacancy]:
     return VacancyService(db).get_vacancies(
         skip=skip,
@@ -173,7 +517,9 @@ def get_vacancies(
         status=status,
         min_salary=min_salary,
         max_salary=max_salary,
-        search_term=search_term
+        search_term=search_term,
+        cursor=cursor,
+        fields=fields
     )
 
 
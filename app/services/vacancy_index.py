@@ -0,0 +1,353 @@
+import logging
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.db.models import ArchivedVacancy, Vacancy, VacancyStatus
+from app.services.pagination import decode_cursor, InvalidCursorError
+from app.services.search import CYRILLIC_RE, WORD_RE, stem_russian
+
+logger = logging.getLogger(__name__)
+
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+
+_ENGLISH_SUFFIXES = ("ing", "ers", "ies", "ed", "er", "es", "s")
+_MIN_ENGLISH_STEM = 3
+
+# Per-field term frequency weights, mirroring the database search weights
+_FIELD_WEIGHTS = (("name", 3.0), ("short_description", 2.0), ("full_description", 1.0))
+# Position gap between fields so phrases never match across field boundaries
+_FIELD_GAP = 1000
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+# Re-read rows changed slightly before the last sync to tolerate clock skew
+# and timestamps with one-second resolution
+_REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+def _stem(word: str) -> str:
+    if CYRILLIC_RE.search(word):
+        return stem_russian(word)
+    for suffix in _ENGLISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_ENGLISH_STEM:
+            return word[: -len(suffix)]
+    return word
+
+
+def analyze(text: Optional[str]) -> List[str]:
+    """
+    Split text into normalized search terms
+
+    Args:
+        text (Optional[str]): Text to analyze
+
+    Returns:
+        List[str]: Lowercase, stemmed terms in order of appearance
+    """
+    if not text:
+        return []
+    return [_stem(word) for word in WORD_RE.findall(text.lower())]
+
+
+class IndexedVacancy:
+    """
+    Stored copy of the vacancy fields needed to answer list requests
+    """
+
+    __slots__ = (
+        "id", "name", "salary", "short_description", "full_description",
+        "created", "updated", "status", "version", "search_rank",
+    )
+
+    def __init__(self, vacancy: Any):
+        self.id = vacancy.id
+        self.name = vacancy.name
+        self.salary = vacancy.salary
+        self.short_description = vacancy.short_description
+        self.full_description = vacancy.full_description
+        self.created = vacancy.created
+        self.updated = vacancy.updated
+        self.status = vacancy.status
+        self.version = vacancy.version
+        self.search_rank: Optional[float] = None
+
+    def with_rank(self, rank: float) -> "IndexedVacancy":
+        result = IndexedVacancy(self)
+        result.search_rank = rank
+        return result
+
+
+class VacancyIndex:
+    """
+    In-memory inverted index over vacancy text fields
+
+    Postings are kept per term as two parallel arrays (sorted vacancy IDs and
+    weighted term frequencies); term positions live in a per-vacancy forward
+    index used for phrase matching and removal. Queries match every word
+    (AND), quoted parts must appear as phrases, and results are scored with
+    BM25. All public methods are thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._positions: Dict[int, Dict[str, array]] = {}
+        self._lengths: Dict[int, float] = {}
+        self._docs: Dict[int, IndexedVacancy] = {}
+        self._total_length = 0.0
+        self._synced_at: Optional[datetime] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _remove_locked(self, vacancy_id: int) -> None:
+        positions = self._positions.pop(vacancy_id, None)
+        if positions is None:
+            return
+        for term in positions:
+            ids, freqs = self._postings[term]
+            i = bisect_left(ids, vacancy_id)
+            del ids[i]
+            del freqs[i]
+            if not ids:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(vacancy_id)
+        del self._docs[vacancy_id]
+
+    def _add_locked(self, doc: IndexedVacancy) -> None:
+        existing = self._docs.get(doc.id)
+        if existing is not None:
+            if existing.version and doc.version and existing.version > doc.version:
+                # A newer version was indexed already (e.g. by a write hook
+                # while a rebuild was streaming older rows)
+                return
+            self._remove_locked(doc.id)
+
+        positions: Dict[str, array] = {}
+        frequencies: Dict[str, float] = {}
+        length = 0.0
+        offset = 0
+        for field, weight in _FIELD_WEIGHTS:
+            terms = analyze(getattr(doc, field))
+            for position, term in enumerate(terms, start=offset):
+                positions.setdefault(term, array("I")).append(position)
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+            length += weight * len(terms)
+            offset += len(terms) + _FIELD_GAP
+
+        for term, frequency in frequencies.items():
+            ids, freqs = self._postings.setdefault(term, (array("I"), array("f")))
+            i = bisect_left(ids, doc.id)
+            ids.insert(i, doc.id)
+            freqs.insert(i, frequency)
+
+        self._positions[doc.id] = positions
+        self._lengths[doc.id] = length
+        self._total_length += length
+        self._docs[doc.id] = doc
+
+    def add(self, vacancy: Any) -> None:
+        """
+        Index a vacancy, replacing any previous version of it
+
+        Args:
+            vacancy (Any): Vacancy ORM instance or object with the same attributes
+        """
+        doc = IndexedVacancy(vacancy)
+        with self._lock:
+            self._add_locked(doc)
+
+    def remove(self, vacancy_id: int) -> None:
+        """
+        Remove a vacancy from the index
+
+        Args:
+            vacancy_id (int): Vacancy ID
+        """
+        with self._lock:
+            self._remove_locked(vacancy_id)
+
+    def _stream(self, db: Session, since: Optional[datetime], batch_size: int) -> Iterable[Vacancy]:
+        query = select(Vacancy).execution_options(yield_per=batch_size)
+        if since is not None:
+            query = query.where(or_(Vacancy.created >= since, Vacancy.updated >= since))
+        for vacancy in db.execute(query).scalars():
+            yield vacancy
+
+    def build(self, db: Session, batch_size: int = 1000) -> None:
+        """
+        Index every vacancy, streaming rows from the database in batches
+
+        Args:
+            db (Session): Database session
+            batch_size (int): Number of rows fetched per round trip
+        """
+        started_at = datetime.now(timezone.utc)
+        count = 0
+        for vacancy in self._stream(db, None, batch_size):
+            self.add(vacancy)
+            count += 1
+        db.expunge_all()
+        with self._lock:
+            self._synced_at = started_at
+            self.ready = True
+        logger.info("Vacancy search index built with %d vacancies", count)
+
+    def refresh(self, db: Session, batch_size: int = 1000) -> int:
+        """
+        Re-index vacancies changed since the last build or refresh, including
+        changes made by other worker processes, and drop archived ones
+
+        Args:
+            db (Session): Database session
+            batch_size (int): Number of rows fetched per round trip
+
+        Returns:
+            int: Number of vacancies re-indexed
+        """
+        if self._synced_at is None:
+            self.build(db, batch_size)
+            return len(self)
+        started_at = datetime.now(timezone.utc)
+        since = self._synced_at - _REFRESH_OVERLAP
+        count = 0
+        for vacancy in self._stream(db, since, batch_size):
+            self.add(vacancy)
+            count += 1
+        # Vacancies moved to the archive are gone from the hot table
+        archived = db.execute(select(ArchivedVacancy.id).where(ArchivedVacancy.archived >= since))
+        for vacancy_id in archived.scalars():
+            self.remove(vacancy_id)
+            count += 1
+        db.expunge_all()
+        with self._lock:
+            self._synced_at = started_at
+        return count
+
+    @staticmethod
+    def _parse_query(search_term: str) -> Tuple[List[str], List[List[str]]]:
+        phrases = [analyze(phrase) for phrase in _PHRASE_RE.findall(search_term)]
+        phrases = [phrase for phrase in phrases if len(phrase) > 1]
+        terms = analyze(_PHRASE_RE.sub(" ", search_term))
+        for phrase in phrases:
+            terms.extend(phrase)
+        return list(dict.fromkeys(terms)), phrases
+
+    def _match_locked(self, terms: List[str]) -> List[int]:
+        postings = []
+        for term in terms:
+            if term not in self._postings:
+                return []
+            postings.append(self._postings[term][0])
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            matched = array("I")
+            for vacancy_id in candidates:
+                i = bisect_left(ids, vacancy_id)
+                if i < len(ids) and ids[i] == vacancy_id:
+                    matched.append(vacancy_id)
+            candidates = matched
+            if not candidates:
+                break
+        return list(candidates)
+
+    def _has_phrase_locked(self, vacancy_id: int, phrase: List[str]) -> bool:
+        positions = self._positions[vacancy_id]
+        following = [set(positions[term]) for term in phrase[1:]]
+        for start in positions[phrase[0]]:
+            if all(start + i + 1 in later for i, later in enumerate(following)):
+                return True
+        return False
+
+    def _score_locked(self, vacancy_id: int, terms: List[str]) -> float:
+        total = len(self._docs)
+        average_length = self._total_length / total if total else 1.0
+        length_norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * self._lengths[vacancy_id] / (average_length or 1.0))
+        score = 0.0
+        for term in terms:
+            ids, freqs = self._postings[term]
+            frequency = freqs[bisect_left(ids, vacancy_id)]
+            idf = math.log(1 + (total - len(ids) + 0.5) / (len(ids) + 0.5))
+            score += idf * frequency * (_BM25_K1 + 1) / (frequency + length_norm)
+        return score
+
+    def search(
+        self,
+        search_term: str,
+        skip: int = 0,
+        limit: int = 20,
+        status: Optional[VacancyStatus] = None,
+        min_salary: Optional[float] = None,
+        max_salary: Optional[float] = None,
+        cursor: Optional[str] = None,
+    ) -> List[IndexedVacancy]:
+        """
+        Find vacancies matching a query, most relevant first
+
+        Filters and pagination behave like VacancyService.get_vacancies.
+
+        Args:
+            search_term (str): Words to match; quoted parts must match as phrases
+            skip (int): Number of records to skip when no cursor is given
+            limit (int): Maximum number of records to return
+            status (Optional[VacancyStatus]): Filter by vacancy status
+            min_salary (Optional[float]): Minimum salary filter
+            max_salary (Optional[float]): Maximum salary filter
+            cursor (Optional[str]): Cursor returned with the previous page
+
+        Returns:
+            List[IndexedVacancy]: Matching vacancies with search_rank set
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or not from a search
+        """
+        position = decode_cursor(cursor) if cursor else None
+        if position is not None and position.rank is None:
+            raise InvalidCursorError("Pagination cursor does not match this query")
+
+        terms, phrases = self._parse_query(search_term)
+        if not terms:
+            return []
+
+        hits = []
+        with self._lock:
+            for vacancy_id in self._match_locked(terms):
+                doc = self._docs[vacancy_id]
+                if status is not None:
+                    if doc.status != status:
+                        continue
+                elif doc.status == VacancyStatus.DELETED:
+                    continue
+                if min_salary is not None and (doc.salary is None or doc.salary < min_salary):
+                    continue
+                if max_salary is not None and (doc.salary is None or doc.salary > max_salary):
+                    continue
+                if not all(self._has_phrase_locked(vacancy_id, phrase) for phrase in phrases):
+                    continue
+                hits.append(doc.with_rank(self._score_locked(vacancy_id, terms)))
+
+        def sort_key(doc: IndexedVacancy) -> Tuple[float, datetime, int]:
+            return doc.search_rank, doc.created or datetime.min, doc.id
+
+        hits.sort(key=sort_key, reverse=True)
+        if position is not None:
+            bound = (position.rank, position.created, position.id)
+            hits = [doc for doc in hits if sort_key(doc) < bound]
+        else:
+            hits = hits[skip:]
+        return hits[:limit]
+
+
+# Process-wide index, populated at startup when VACANCY_INDEX_ENABLED is set
+vacancy_index = VacancyIndex()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import argparse
+import logging
+import os
+import sys
+from datetime import timedelta
+
+# Add the parent directory to the path to make imports work correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.archive import ArchiveService
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move closed and deleted vacancies and their responses to the archive tables"
+    )
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=settings.ARCHIVE_AFTER_DAYS,
+        help=f"Archive vacancies unchanged for this many days (default: {settings.ARCHIVE_AFTER_DAYS})"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.ARCHIVE_BATCH_SIZE,
+        help=f"Vacancies moved per transaction (default: {settings.ARCHIVE_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many vacancies would be archived"
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Reclaim the freed space in the hot tables afterwards"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    older_than = timedelta(days=args.older_than_days)
+
+    db = SessionLocal()
+    try:
+        archive_service = ArchiveService(db)
+        if args.dry_run:
+            count = archive_service.count_archivable(older_than)
+            print(f"{count} vacancies would be archived.")
+            return
+
+        result = archive_service.archive_vacancies(older_than, batch_size=args.batch_size)
+        print(
+            f"Archived {result.vacancies} vacancies and {result.responses} responses "
+            f"in {result.batches} batches."
+        )
+        if args.vacuum and result.vacancies:
+            archive_service.vacuum()
+            print("Hot tables vacuumed.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
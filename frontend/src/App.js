@@ -7,6 +7,7 @@ import Vacancies from './pages/Vacancies'; // Import the Vacancies page
 import VacancyDetail from './pages/VacancyDetail'; // Import the VacancyDetail page
 import CreateVacancy from './pages/CreateVacancy'; // Import the CreateVacancy page
 import NotFound from './pages/NotFound'; // Import the NotFound page
+import { logout } from './auth';
 // You can also import a Home page or other components here
 // import ravametIcon from './assets/ravamet-icon.png'; // Original import causing error
 import ravametIcon from './logo.svg'; // Using existing logo.svg to fix compilation
@@ -17,8 +18,8 @@ const App = () => {
     const isAuthenticated = !!localStorage.getItem('accessToken');
 
     // Function to handle logout
-    const handleLogout = () => {
-        localStorage.removeItem('accessToken');
+    const handleLogout = async () => {
+        await logout();
         // Navigate to login and force re-render if necessary by changing state or using window.location
         window.location.href = '/login'; // Simple way to ensure full refresh and state clear
     };
@@ -0,0 +1,67 @@
+import axios from 'axios';
+
+// Refresh tokens are rotated on every use and reusing an old one ends the
+// session, so concurrent requests that hit 401 must share one refresh call.
+let refreshing = null;
+
+const refreshTokens = () => {
+    if (!refreshing) {
+        refreshing = axios
+            .post('/api/auth/refresh', { refresh_token: localStorage.getItem('refreshToken') })
+            .then((response) => {
+                localStorage.setItem('accessToken', response.data.access_token);
+                localStorage.setItem('refreshToken', response.data.refresh_token);
+                return response.data.access_token;
+            })
+            .finally(() => {
+                refreshing = null;
+            });
+    }
+    return refreshing;
+};
+
+// When an access token expires, get a new one with the refresh token and
+// retry the request once, instead of sending the user back to the login form.
+export const setupTokenRefresh = () => {
+    axios.interceptors.response.use(undefined, async (error) => {
+        const { config, response } = error;
+        if (
+            response?.status !== 401 ||
+            !config ||
+            config._retried ||
+            config.url.includes('/auth/') ||
+            !localStorage.getItem('refreshToken')
+        ) {
+            return Promise.reject(error);
+        }
+        let accessToken;
+        try {
+            accessToken = await refreshTokens();
+        } catch (refreshError) {
+            localStorage.removeItem('accessToken');
+            localStorage.removeItem('refreshToken');
+            return Promise.reject(error);
+        }
+        config._retried = true;
+        config.headers.Authorization = `Bearer ${accessToken}`;
+        return axios(config);
+    });
+};
+
+export const logout = async () => {
+    const accessToken = localStorage.getItem('accessToken');
+    const refreshToken = localStorage.getItem('refreshToken');
+    localStorage.removeItem('accessToken');
+    localStorage.removeItem('refreshToken');
+    if (accessToken) {
+        try {
+            await axios.post(
+                '/api/auth/logout',
+                refreshToken ? { refresh_token: refreshToken } : undefined,
+                { headers: { Authorization: `Bearer ${accessToken}` } },
+            );
+        } catch (err) {
+            // The tokens are gone locally; an expired access token is fine
+        }
+    }
+};
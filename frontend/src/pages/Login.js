@@ -39,6 +39,7 @@ const Login = () => {
                 headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
             });
             localStorage.setItem('accessToken', response.data.access_token);
+            localStorage.setItem('refreshToken', response.data.refresh_token);
             setMessage('Login successful! Redirecting...');
             // Redirect to profile or previous page if stored
             const from = location.state?.from || '/profile';
@@ -89,6 +89,7 @@ const Profile = () => {
             setError(errorMsg);
             if (err.response?.status === 401 || err.response?.status === 403) {
                 localStorage.removeItem('accessToken'); // Clear token
+                localStorage.removeItem('refreshToken');
                 navigate('/login', { state: { message: 'Session expired. Please login again.' } });
             }
         }
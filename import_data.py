@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import argparse
+import logging
+import os
+import sys
+
+# Add the parent directory to the path to make imports work correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.factory import ServiceFactory
+from app.services.importer import IMPORT_FORMATS
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import vacancies or users from a JSON Lines or CSV file"
+    )
+    parser.add_argument("kind", choices=("vacancies", "users"), help="What the file contains")
+    parser.add_argument("path", help="File to import, or - for standard input")
+    parser.add_argument(
+        "--format",
+        choices=IMPORT_FORMATS,
+        help="File format (default: csv for .csv files, jsonl otherwise)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.IMPORT_CHUNK_SIZE,
+        help=f"Rows inserted per transaction (default: {settings.IMPORT_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--start-line",
+        type=int,
+        default=1,
+        help="Skip records before this line, to resume a stopped import"
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=settings.IMPORT_MAX_ERRORS,
+        help=f"Most row errors to print (default: {settings.IMPORT_MAX_ERRORS})"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+
+    if args.path == "-":
+        source = open(sys.stdin.fileno(), encoding="utf-8-sig", newline="", closefd=False)
+    else:
+        source = open(args.path, encoding="utf-8-sig", newline="")
+
+    db = SessionLocal()
+    try:
+        import_service = ServiceFactory.create_import_service(db)
+        run = import_service.import_vacancies if args.kind == "vacancies" else import_service.import_users
+        result = run(
+            source,
+            fmt,
+            chunk_size=args.chunk_size,
+            start_line=args.start_line,
+            max_errors=args.max_errors,
+        )
+    finally:
+        db.close()
+        source.close()
+
+    for error in result.errors:
+        print(f"line {error.line}: {error.error}", file=sys.stderr)
+    print(
+        f"Imported {result.imported} {args.kind}; {result.skipped} already existed, "
+        f"{result.failed} invalid."
+    )
+    if result.aborted is not None:
+        print(
+            f"Stopped by a database error: {result.aborted}\n"
+            f"Resume with --start-line {result.last_line + 1}.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
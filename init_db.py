@@ -4,6 +4,8 @@ import os
 # Add the parent directory to the path to make imports work correctly
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from alembic import command
+from alembic.config import Config
 from sqlalchemy import text
 from app.db.session import engine, SessionLocal
 from app.db.models import Base, UserStatus, VacancyStatus, ResponseStatus, User
@@ -11,10 +13,22 @@ from app.core.auth import get_password_hash
 from app.services.factory import ServiceFactory
 
 
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def run_migrations():
+    """Bring the database schema up to date with Alembic migrations"""
+    alembic_config = Config(ALEMBIC_INI)
+    alembic_config.set_main_option(
+        "script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic")
+    )
+    command.upgrade(alembic_config, "head")
+
+
 def init_db():
     """Initialize the database with tables and initial data"""
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create or upgrade all tables
+    run_migrations()
     
     # Create a session
     db = SessionLocal()
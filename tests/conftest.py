@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+# Settings are read on import: point the app at a scratch SQLite database
+# before any test module imports it
+_data_dir = tempfile.mkdtemp(prefix="ravamet-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_data_dir, 'test.db')}"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+
+from app.db.models import Base
+from app.db.session import SessionLocal, engine
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def tables():
+    """Create the schema for one test and drop it afterwards"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db(tables):
+    session = SessionLocal()
+    yield session
+    session.close()
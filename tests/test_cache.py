@@ -0,0 +1,90 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import CacheFullError, MemoryCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_get_set_and_expiry(clock):
+    cache = MemoryCache(max_size=10, ttl=60)
+    cache.set("a", {"id": 1})
+    assert cache.get("a") == {"id": 1}
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.stats.snapshot()["expirations"] == 1
+
+
+def test_lru_eviction(clock):
+    cache = MemoryCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats.snapshot()["evictions"] == 1
+
+
+def test_add_does_not_replace_live_entry(clock):
+    cache = MemoryCache(max_size=10, ttl=60)
+    assert cache.add("a", 1)
+    assert not cache.add("a", 2)
+    assert cache.get("a") == 1
+
+
+def test_add_after_invalidate_is_refused_until_the_tombstone_expires(clock):
+    cache = MemoryCache(max_size=10, ttl=60)
+    cache.set("a", "old")
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    # A reader that loaded the old row before the write committed
+    assert not cache.add("a", "old")
+    assert cache.get("a") is None
+
+    clock.now += 61
+    assert cache.add("a", "new")
+    assert cache.get("a") == "new"
+
+
+def test_set_replaces_tombstone(clock):
+    cache = MemoryCache(max_size=10, ttl=60)
+    cache.invalidate("a")
+    cache.set("a", "new")
+    assert cache.get("a") == "new"
+
+
+def test_delete_allows_add(clock):
+    cache = MemoryCache(max_size=10, ttl=60)
+    cache.set("a", "old")
+    cache.delete("a")
+    assert cache.add("a", "new")
+
+
+def test_without_eviction_a_full_cache_refuses_new_keys(clock):
+    cache = MemoryCache(max_size=2, ttl=60, evict=False)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+    with pytest.raises(CacheFullError):
+        cache.set("c", 3)
+    # Existing keys can still be replaced
+    cache.set("a", 4)
+
+    clock.now += 11
+    cache.set("c", 3)
+    assert cache.get("a") == 4
+    assert cache.get("c") == 3
+    assert cache.stats.snapshot()["evictions"] == 0
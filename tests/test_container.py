@@ -0,0 +1,127 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.container import Container, Lifetime
+
+
+class Service:
+    def __init__(self, **dependencies):
+        self.__dict__.update(dependencies)
+
+
+def get_db():
+    yield "db"
+
+
+def create_repository(db):
+    return Service(db=db)
+
+
+def create_service(repository, db=Depends(get_db)):
+    return Service(repository=repository, db=db)
+
+
+@pytest.fixture
+def container():
+    container = Container()
+    container.register_provided("db", get_db)
+    container.register("repository", create_repository)
+    container.register_scoped("service", create_service)
+    return container
+
+
+def test_plan_lists_dependencies_in_creation_order(container):
+    plan = container.plan("service")
+    assert [step.name for step in plan.steps] == ["repository", "service"]
+    assert plan.provided == ("db",)
+    assert dict(plan.steps[1].arguments) == {"repository": "repository", "db": "db"}
+    assert container.plan("service") is plan
+
+
+def test_scope_shares_scoped_and_provided_instances(container):
+    scope = container.scope(db="session")
+    service = scope.get("service")
+    assert service is scope.get("service")
+    assert service.db == "session"
+    assert service.repository.db == "session"
+    assert scope.get("repository") is not service.repository
+    assert container.scope(db="session").get("service") is not service
+
+
+def test_provided_value_must_be_in_scope(container):
+    with pytest.raises(KeyError):
+        container.get("service")
+
+
+def test_singletons_are_created_once(container):
+    container.register_singleton("settings", lambda: Service())
+    container.register("client", lambda settings: Service(settings=settings))
+    first = container.get("client")
+    second = container.get("client")
+    assert first is not second
+    assert first.settings is second.settings
+
+
+def test_unregistered_dependency():
+    container = Container()
+    container.register("service", create_repository)
+    with pytest.raises(KeyError, match="db"):
+        container.plan("service")
+
+
+def test_dependency_cycle():
+    container = Container()
+    container.register("a", lambda b: b)
+    container.register("b", lambda c: c)
+    container.register("c", lambda a: a)
+    with pytest.raises(ValueError, match="a -> b -> c -> a"):
+        container.plan("a")
+
+
+def test_singleton_cannot_depend_on_a_scoped_service(container):
+    container.register_singleton("cache", lambda service: Service(service=service))
+    with pytest.raises(ValueError, match="Singleton 'cache' cannot depend on scoped 'service'"):
+        container.plan("cache")
+
+
+def test_singleton_cannot_depend_on_a_transient_service(container):
+    container.register("clock", lambda: Service())
+    container.register("cache", lambda clock: Service(clock=clock), Lifetime.SINGLETON)
+    with pytest.raises(ValueError, match="transient 'clock'"):
+        container.plan("cache")
+
+
+def test_registering_again_recompiles_plans(container):
+    plan = container.plan("service")
+    container.register("repository", lambda: Service(db=None))
+    assert container.plan("service") is not plan
+    assert container.scope(db="session").get("service").repository.db is None
+
+
+def test_provider_resolves_once_per_request(container):
+    app = FastAPI()
+    created = []
+
+    def track(service):
+        created.append(service)
+        return service
+
+    container.register_scoped("tracked", track)
+
+    def current(service=Depends(container.deferred_provider("service"))):
+        return service
+
+    @app.get("/")
+    def route(
+        service=Depends(container.provider("service")),
+        tracked=Depends(container.provider("tracked")),
+        current=Depends(current),
+    ):
+        return {"shared": service is tracked is current, "db": service.db}
+
+    with TestClient(app) as client:
+        assert client.get("/").json() == {"shared": True, "db": "db"}
+        client.get("/")
+    assert len(created) == 2
+    assert created[0] is not created[1]
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.app import app_instance
+from app.services.user import AsyncUserService
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def client(tables):
+    with TestClient(app_instance.app) as client:
+        yield client
+
+
+@pytest.fixture
+def created(monkeypatch):
+    """Count the AsyncUserService instances created"""
+    created = []
+    init = AsyncUserService.__init__
+
+    def counting_init(self, *args, **kwargs):
+        created.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncUserService, "__init__", counting_init)
+    return created
+
+
+def test_current_user_shares_the_request_scope(client, created):
+    client.post(f"{API}/auth/register", json={"email": "user@example.com", "name": "User", "password": "pw"})
+    created.clear()
+    response = client.post(f"{API}/auth/login", data={"username": "user@example.com", "password": "pw"})
+    assert response.status_code == 200
+    assert len(created) == 1
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    created.clear()
+    response = client.get(f"{API}/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "user@example.com"
+    # get_current_user and the route get the same service
+    assert len(created) == 1
+
+
+def test_invalid_token(client):
+    assert client.get(f"{API}/users/me", headers={"Authorization": "Bearer invalid"}).status_code == 401
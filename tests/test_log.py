@@ -0,0 +1,47 @@
+import logging
+
+import pytest
+
+from app.core import log
+from app.core.log import SamplingFilter
+
+
+def _record(name, level=logging.INFO, created=1000.0):
+    record = logging.LogRecord(name, level, __file__, 1, "message", None, None)
+    record.created = created
+    return record
+
+
+def test_rates_apply_to_logger_prefixes(monkeypatch):
+    sampling = SamplingFilter({"app.api": 0.25, "app.api.auth": 1.0})
+    monkeypatch.setattr(log.random, "random", lambda: 0.5)
+    assert not sampling.filter(_record("app.api.vacancies"))
+    assert sampling.filter(_record("app.api.auth"))
+    assert sampling.filter(_record("app.services"))
+    monkeypatch.setattr(log.random, "random", lambda: 0.1)
+    assert sampling.filter(_record("app.api.vacancies"))
+    assert sampling.sampled_out == 1
+
+
+def test_warnings_always_pass(monkeypatch):
+    sampling = SamplingFilter({"app": 0.0}, per_second=1)
+    monkeypatch.setattr(log.random, "random", lambda: 0.5)
+    assert all(sampling.filter(_record("app", logging.WARNING)) for _ in range(5))
+    assert sampling.filter(_record("app", logging.ERROR))
+    assert not sampling.filter(_record("app"))
+
+
+def test_per_second_limit_per_logger():
+    sampling = SamplingFilter({}, per_second=2)
+    assert [sampling.filter(_record("app.a", created=1000.1)) for _ in range(3)] == [True, True, False]
+    # Other loggers have budgets of their own
+    assert sampling.filter(_record("app.b", created=1000.2))
+    # The budget renews every second
+    assert sampling.filter(_record("app.a", created=1001.0))
+    assert sampling.rate_limited == 1
+
+
+@pytest.mark.parametrize("rate", [0.0, 1.0])
+def test_extreme_rates(rate):
+    sampling = SamplingFilter({"app": rate})
+    assert sampling.filter(_record("app.x")) is bool(rate)
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from app.db.models import Response, Vacancy
+from app.services.pagination import (
+    Cursor,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+    paginate,
+)
+
+
+def test_cursor_round_trip():
+    created = datetime(2025, 5, 2, 12, 55, 1)
+    cursor = encode_cursor(created, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == Cursor(created, 42, None)
+
+
+def test_cursor_round_trip_with_rank():
+    created = datetime(2025, 5, 2, 12, 55, 1)
+    assert decode_cursor(encode_cursor(created, 7, 1.5)) == Cursor(created, 7, 1.5)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "W10", "WzEsMiwzLDRd", "eyJhIjoxfQ"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_next_cursor_only_for_full_pages():
+    items = [Vacancy(id=i, created=datetime(2025, 1, i)) for i in (3, 2, 1)]
+    assert next_cursor(items, 4) is None
+    assert next_cursor([], 3) is None
+    assert decode_cursor(next_cursor(items, 3)) == Cursor(datetime(2025, 1, 1), 1, None)
+
+
+def _add_vacancies(db, count, created):
+    db.add_all(Vacancy(name=f"v{i}", short_description="s") for i in range(count))
+    db.commit()
+    # Equal timestamps make id the tie-breaker
+    db.execute(text("UPDATE vacancies SET created = :created"), {"created": created})
+    db.commit()
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    _add_vacancies(db, 7, "2025-01-01 00:00:00")
+    db.execute(text("UPDATE vacancies SET created = '2025-01-02 00:00:00' WHERE id > 4"))
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        query = paginate(select(Vacancy), Vacancy.created, Vacancy.id, limit=3, cursor=cursor)
+        page = db.execute(query).scalars().all()
+        seen.extend(vacancy.id for vacancy in page)
+        cursor = next_cursor(page, 3)
+        if cursor is None:
+            break
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_offset_without_cursor(db):
+    _add_vacancies(db, 5, "2025-01-01 00:00:00")
+    query = paginate(select(Vacancy), Vacancy.created, Vacancy.id, skip=2, limit=2)
+    assert [vacancy.id for vacancy in db.execute(query).scalars()] == [3, 2]
+
+
+def test_cursor_must_match_ranking():
+    ranked = encode_cursor(datetime(2025, 1, 1), 1, 0.5)
+    with pytest.raises(InvalidCursorError):
+        paginate(select(Vacancy), Vacancy.created, Vacancy.id, cursor=ranked)
+
+
+@pytest.mark.parametrize(
+    "column, index",
+    [
+        (Response.user_id, "ix_responses_user_created_id"),
+        (Response.vacancy_id, "ix_responses_vacancy_created_id"),
+    ],
+)
+def test_response_pages_are_index_range_scans(db, column, index):
+    cursor = encode_cursor(datetime(2025, 1, 1), 10)
+    query = paginate(select(Response).where(column == 1), Response.created, Response.id, limit=20, cursor=cursor)
+    compiled = query.compile(db.bind, compile_kwargs={"literal_binds": True})
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
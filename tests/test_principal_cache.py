@@ -0,0 +1,34 @@
+import pytest
+
+from app.core.cache import MemoryCache
+from app.db.models import User, UserStatus
+from app.db.session import SessionLocal
+from app.services.user import UserService
+
+
+@pytest.fixture
+def cache():
+    return MemoryCache(max_size=100, ttl=60)
+
+
+@pytest.fixture
+def user_id(db):
+    user = User(email="user@example.com", name="User", password="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def test_principal_is_read_once(db, cache, user_id):
+    service = UserService(db, cache)
+    assert service.get_principal(user_id).email == "user@example.com"
+    assert service.get_principal(user_id).status == UserStatus.CREATED
+    assert cache.stats.snapshot()["hits"] == 1
+
+
+def test_ban_reaches_cached_principal(db, cache, user_id):
+    UserService(db, cache).get_principal(user_id)
+    with SessionLocal() as other_db:
+        UserService(other_db, cache).ban_user(user_id)
+    assert UserService(db, cache).get_principal(user_id).status == UserStatus.BANNED
+
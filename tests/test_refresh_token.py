@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+
+from app.db.models import User
+from app.db.session import AsyncSessionLocal
+from app.services.refresh_token import AsyncRefreshTokenService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def user_id(db):
+    user = User(email="user@example.com", name="User", password="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+async def _rotate(token, lifetime=timedelta(days=1)):
+    async with AsyncSessionLocal() as db:
+        return await AsyncRefreshTokenService(db, lifetime).rotate(token)
+
+
+async def _issue(user_id, lifetime=timedelta(days=1)):
+    async with AsyncSessionLocal() as db:
+        return await AsyncRefreshTokenService(db, lifetime).issue(user_id)
+
+
+async def test_rotation_replaces_the_token(user_id):
+    token = await _issue(user_id)
+    rotated = await _rotate(token)
+    assert rotated.user_id == user_id
+    assert rotated.token != token
+    assert rotated.token.split(".")[0] == token.split(".")[0]
+    assert (await _rotate(rotated.token)).user_id == user_id
+
+
+async def test_reusing_a_rotated_token_revokes_the_session(user_id):
+    token = await _issue(user_id)
+    rotated = await _rotate(token)
+    assert await _rotate(token) is None
+    # The legitimate client's newer token is gone as well
+    assert await _rotate(rotated.token) is None
+
+
+async def test_reuse_leaves_other_sessions_alone(user_id):
+    stolen = await _issue(user_id)
+    other = await _issue(user_id)
+    await _rotate(stolen)
+    assert await _rotate(stolen) is None
+    assert await _rotate(other) is not None
+
+
+async def test_expired_token_is_refused(user_id):
+    token = await _issue(user_id, lifetime=timedelta(seconds=-1))
+    assert await _rotate(token) is None
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "short.secret", "0" * 32 + ".", "0" * 32 + ".secret"])
+async def test_malformed_or_unknown_token(user_id, token):
+    assert await _rotate(token) is None
+
+
+async def test_revoke_needs_the_owner_and_current_token(user_id):
+    token = await _issue(user_id)
+    async with AsyncSessionLocal() as db:
+        service = AsyncRefreshTokenService(db, timedelta(days=1))
+        assert not await service.revoke(token, user_id + 1)
+        assert not await service.revoke(token.split(".")[0] + ".wrong", user_id)
+        assert await service.revoke(token, user_id)
+    assert await _rotate(token) is None
@@ -0,0 +1,108 @@
+import itertools
+
+import pytest
+
+from app.db.models import Response, ResponseStatus, User, Vacancy, VacancyStatus
+from app.services.factory import ServiceFactory
+from app.services.response import (
+    RESPONSE_TRANSITIONS,
+    InvalidStatusTransition,
+    StatusChange,
+    _status_outcomes,
+    transition_sources,
+)
+
+CREATED = ResponseStatus.CREATED
+VIEWED = ResponseStatus.VIEWED
+APPROVED = ResponseStatus.APPROVED
+REJECTED = ResponseStatus.REJECTED
+
+
+@pytest.fixture
+def vacancy(db):
+    vacancy = Vacancy(name="Python developer", short_description="Backend", status=VacancyStatus.OPENED)
+    db.add(vacancy)
+    db.commit()
+    return vacancy
+
+
+@pytest.fixture
+def make_responses(db, vacancy):
+    """Create responses of new users to the vacancy, with the given statuses"""
+    numbers = itertools.count()
+
+    def make(*statuses):
+        responses = []
+        for status in statuses:
+            user = User(email=f"user{next(numbers)}@example.com", name="User", password="x")
+            db.add(user)
+            db.flush()
+            responses.append(Response(user_id=user.id, vacancy_id=vacancy.id, status=status))
+        db.add_all(responses)
+        db.commit()
+        return [response.id for response in responses]
+    return make
+
+
+@pytest.fixture
+def service(db):
+    return ServiceFactory.create_response_service(
+        db,
+        ServiceFactory.create_user_service(db),
+        ServiceFactory.create_vacancy_service(db),
+    )
+
+
+def test_every_status_has_transition_rules():
+    assert set(RESPONSE_TRANSITIONS) == set(ResponseStatus)
+
+
+def test_transition_sources():
+    assert transition_sources(VIEWED) == [CREATED]
+    assert transition_sources(APPROVED) == [CREATED, VIEWED]
+    assert transition_sources(APPROVED, VIEWED) == [VIEWED]
+    assert transition_sources(APPROVED, APPROVED) == []
+    assert transition_sources(CREATED) == []
+
+
+def test_status_outcomes():
+    outcomes = _status_outcomes(APPROVED, [1, 2, 3, 4], [1], {2: APPROVED, 3: REJECTED})
+    assert outcomes == [
+        StatusChange(1, "updated", APPROVED),
+        StatusChange(2, "unchanged", APPROVED),
+        StatusChange(3, "invalid_transition", REJECTED),
+        StatusChange(4, "not_found", None),
+    ]
+
+
+def test_bulk_update_outcomes(service, make_responses):
+    created, viewed, approved, rejected = make_responses(CREATED, VIEWED, APPROVED, REJECTED)
+    outcomes = service.update_response_statuses(APPROVED, [created, viewed, approved, rejected, created, 99999])
+    assert outcomes == [
+        StatusChange(created, "updated", APPROVED),
+        StatusChange(viewed, "updated", APPROVED),
+        StatusChange(approved, "unchanged", APPROVED),
+        StatusChange(rejected, "invalid_transition", REJECTED),
+        StatusChange(99999, "not_found", None),
+    ]
+    assert service.get_response(rejected).status == REJECTED
+
+
+def test_bulk_update_from_status(service, make_responses):
+    created, viewed = make_responses(CREATED, VIEWED)
+    outcomes = service.update_response_statuses(REJECTED, [created, viewed], from_status=VIEWED)
+    assert outcomes == [
+        StatusChange(created, "invalid_transition", CREATED),
+        StatusChange(viewed, "updated", REJECTED),
+    ]
+
+
+def test_single_update(service, make_responses):
+    (response_id,) = make_responses(CREATED)
+    assert service.update_response_status(response_id, VIEWED).status == VIEWED
+    # Already in the requested status
+    assert service.update_response_status(response_id, VIEWED).status == VIEWED
+    with pytest.raises(InvalidStatusTransition) as error:
+        service.update_response_status(response_id, CREATED)
+    assert error.value.current == VIEWED
+    assert service.update_response_status(99999, VIEWED) is None
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.models import Vacancy, VacancyStatus
+from app.services.search import apply_vacancy_search, build_fts5_query, stem_russian
+
+
+@pytest.mark.parametrize(
+    "word, stem",
+    [
+        ("разработчика", "разработчик"),
+        ("разработчиками", "разработчик"),
+        ("программистов", "программист"),
+        ("новая", "нов"),
+        # Too short to strip an ending
+        ("уха", "уха"),
+        ("python", "python"),
+    ],
+)
+def test_stem_russian(word, stem):
+    assert stem_russian(word) == stem
+
+
+def test_fts5_query_matches_every_word():
+    assert build_fts5_query("Python Developers") == '"python" "developers"'
+
+
+def test_fts5_query_matches_russian_stems_as_prefixes():
+    assert build_fts5_query("Разработчика Python") == '"разработчик"* "python"'
+
+
+def test_fts5_query_drops_syntax():
+    assert build_fts5_query('c++ AND "sql" OR -django*') == '"c" "and" "sql" "or" "django"'
+
+
+@pytest.mark.parametrize("term", ["", "  ", "+-*\"()"])
+def test_fts5_query_without_words(term):
+    assert build_fts5_query(term) is None
+
+
+def test_sqlite_search_ranks_name_matches_first(db):
+    db.add_all([
+        Vacancy(name="Manager", short_description="Works with python developers", status=VacancyStatus.OPENED),
+        Vacancy(name="Python developer", short_description="Backend", status=VacancyStatus.OPENED),
+        Vacancy(name="Разработчик", short_description="Пишет на Go", status=VacancyStatus.OPENED),
+    ])
+    db.commit()
+
+    query, rank = apply_vacancy_search(select(Vacancy.name), "python developer", "sqlite")
+    assert db.execute(query.order_by(rank.desc())).scalars().all() == ["Python developer", "Manager"]
+
+    query, _ = apply_vacancy_search(select(Vacancy.name), "разработчики", "sqlite")
+    assert db.execute(query).scalars().all() == ["Разработчик"]
@@ -0,0 +1,107 @@
+import pytest
+
+from app.core import throttle as throttle_module
+from app.core.throttle import LoginThrottle, MemoryThrottleBackend
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "user@example.com"
+
+
+class Clock:
+    def __init__(self):
+        # Start of a 60 second window
+        self.now = 60.0 * 1000
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(throttle_module.time, "time", clock)
+    return clock
+
+
+def _throttle(ip_burst=100, ip_per_minute=60, max_failures=3, lock_failures=5):
+    return LoginThrottle(
+        MemoryThrottleBackend(max_keys=100),
+        ip_burst=ip_burst,
+        ip_per_minute=ip_per_minute,
+        max_failures=max_failures,
+        lock_failures=lock_failures,
+        window=60,
+        trusted_ttl=3600,
+    )
+
+
+async def _fail(throttle, times, ip, email=EMAIL):
+    for _ in range(times):
+        assert await throttle.check(email, ip) is None
+        await throttle.record_failure(email, ip)
+
+
+async def test_ip_bucket_allows_a_burst_then_the_rate(clock):
+    throttle = _throttle(ip_burst=2, ip_per_minute=30)
+    assert await throttle.check(EMAIL, "10.0.0.1") is None
+    assert await throttle.check(EMAIL, "10.0.0.1") is None
+    assert await throttle.check(EMAIL, "10.0.0.1") == pytest.approx(2)
+    assert await throttle.check(EMAIL, "10.0.0.2") is None
+    clock.now += 2
+    assert await throttle.check(EMAIL, "10.0.0.1") is None
+    assert throttle.rejected == 1
+
+
+async def test_failures_per_account_and_ip(clock):
+    throttle = _throttle()
+    await _fail(throttle, 3, "10.0.0.1")
+    clock.now += 15
+    # Blocked until the current window ends
+    assert await throttle.check(EMAIL, "10.0.0.1") == pytest.approx(45)
+    # Emails are compared case-insensitively
+    assert await throttle.check(" User@Example.com", "10.0.0.1") == pytest.approx(45)
+    assert await throttle.check(EMAIL, "10.0.0.2") is None
+    assert await throttle.check("other@example.com", "10.0.0.1") is None
+
+
+async def test_sliding_window_weighs_the_previous_window(clock):
+    throttle = _throttle()
+    await _fail(throttle, 3, "10.0.0.1")
+    # A quarter into the next window 3 * 0.75 failures still count, so one
+    # more failure reaches the limit again
+    clock.now += 75
+    assert await throttle.check(EMAIL, "10.0.0.1") is None
+    await throttle.record_failure(EMAIL, "10.0.0.1")
+    assert await throttle.check(EMAIL, "10.0.0.1") == pytest.approx(45)
+    # Three quarters in, 3 * 0.25 + 1 failures count
+    clock.now += 30
+    assert await throttle.check(EMAIL, "10.0.0.1") is None
+    # Two windows later nothing is left
+    clock.now += 120
+    assert await throttle.check(EMAIL, "10.0.0.1") is None
+
+
+async def test_account_lock_spares_trusted_ips(clock):
+    throttle = _throttle()
+    await throttle.record_success(EMAIL, "10.0.0.9")
+    for ip in ("10.0.1.1", "10.0.1.2", "10.0.1.3", "10.0.1.4", "10.0.1.5"):
+        await _fail(throttle, 1, ip)
+    assert await throttle.check(EMAIL, "10.0.1.6") == pytest.approx(60)
+    assert await throttle.check(EMAIL, "10.0.0.9") is None
+    # Trust expires
+    clock.now += 3600
+    for ip in ("10.0.2.1", "10.0.2.2", "10.0.2.3", "10.0.2.4", "10.0.2.5"):
+        await _fail(throttle, 1, ip)
+    assert await throttle.check(EMAIL, "10.0.0.9") == pytest.approx(60)
+
+
+async def test_memory_backend_bounds_keys_per_namespace(clock):
+    backend = MemoryThrottleBackend(max_keys=2)
+    for ip in ("a", "b", "c"):
+        await backend.record(f"fail:{ip}", 60, clock.now)
+    await backend.take("ip:x", 1, 1, clock.now)
+    assert await backend.count("fail:a", 60, clock.now) == 0
+    assert await backend.count("fail:c", 60, clock.now) == 1
+    # Another namespace did not evict these
+    assert await backend.count("fail:b", 60, clock.now) == 1
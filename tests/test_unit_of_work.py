@@ -0,0 +1,134 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.db.models import Vacancy
+from app.db.session import SessionLocal, get_async_db, get_db
+from app.db.unit_of_work import aafter_commit, acommit, after_commit, arollback, commit, rollback
+
+
+def _count():
+    with SessionLocal() as db:
+        return db.execute(select(func.count()).select_from(Vacancy)).scalar()
+
+
+def _add(db, name):
+    db.add(Vacancy(name=name, short_description="s"))
+
+
+def _finish(dependency):
+    with pytest.raises(StopIteration):
+        next(dependency)
+
+
+def test_request_commits_once_at_the_end(tables):
+    calls = []
+    dependency = get_db()
+    db = next(dependency)
+    _add(db, "a")
+    commit(db)
+    after_commit(db, lambda: calls.append(_count()))
+    _add(db, "b")
+    commit(db)
+    assert calls == []
+    assert _count() == 0
+    _finish(dependency)
+    assert _count() == 2
+    assert calls == [2]
+
+
+def test_rollback_only_discards_the_whole_request(tables):
+    calls = []
+    dependency = get_db()
+    db = next(dependency)
+    _add(db, "a")
+    commit(db)
+    _add(db, "b")
+    rollback(db)
+    after_commit(db, lambda: calls.append("called"))
+    _finish(dependency)
+    assert _count() == 0
+    assert calls == []
+
+
+def test_failed_request_rolls_back(tables):
+    calls = []
+    dependency = get_db()
+    db = next(dependency)
+    _add(db, "a")
+    commit(db)
+    after_commit(db, lambda: calls.append("called"))
+    with pytest.raises(RuntimeError):
+        dependency.throw(RuntimeError("handler failed"))
+    assert _count() == 0
+    assert calls == []
+
+
+def test_failing_callback_does_not_undo_the_commit(tables):
+    calls = []
+    dependency = get_db()
+    db = next(dependency)
+    _add(db, "a")
+    commit(db)
+    after_commit(db, lambda: 1 / 0)
+    after_commit(db, lambda: calls.append("called"))
+    _finish(dependency)
+    assert _count() == 1
+    assert calls == ["called"]
+
+
+def test_outside_a_unit_of_work_commits_at_once(tables):
+    calls = []
+    with SessionLocal() as db:
+        _add(db, "a")
+        commit(db)
+        after_commit(db, lambda: calls.append(_count()))
+    assert calls == [1]
+
+
+@pytest.mark.anyio
+async def test_async_request_commits_once_at_the_end(tables):
+    calls = []
+
+    async def callback():
+        calls.append(_count())
+
+    dependency = get_async_db()
+    db = await dependency.__anext__()
+    _add(db, "a")
+    await acommit(db)
+    await aafter_commit(db, callback)
+    assert _count() == 0
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    assert _count() == 1
+    assert calls == [1]
+
+
+@pytest.mark.anyio
+async def test_async_rollback_only(tables):
+    calls = []
+
+    async def callback():
+        calls.append("called")
+
+    dependency = get_async_db()
+    db = await dependency.__anext__()
+    _add(db, "a")
+    await acommit(db)
+    await arollback(db)
+    await aafter_commit(db, callback)
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    assert _count() == 0
+    assert calls == []
+
+
+@pytest.mark.anyio
+async def test_async_failed_request_rolls_back(tables):
+    dependency = get_async_db()
+    db = await dependency.__anext__()
+    _add(db, "a")
+    await acommit(db)
+    with pytest.raises(RuntimeError):
+        await dependency.athrow(RuntimeError("handler failed"))
+    assert _count() == 0
@@ -0,0 +1,91 @@
+import pytest
+
+from app.core.cache import MemoryCache
+from app.db.models import Vacancy, VacancyStatus
+from app.db.routing import READ_PRIMARY_OPTION
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.schemas.requests import VacancyCreate, VacancyUpdate
+from app.services import factory
+from app.services.vacancy import (
+    AsyncVacancyService,
+    VacancyService,
+    _cache_key,
+    _vacancy_query,
+    _vacancy_to_cache,
+)
+
+
+@pytest.fixture
+def cache():
+    return MemoryCache(max_size=100, ttl=60)
+
+
+@pytest.fixture
+def vacancy_id(db):
+    vacancy = Vacancy(name="Python developer", short_description="Backend", status=VacancyStatus.OPENED)
+    db.add(vacancy)
+    db.commit()
+    return vacancy.id
+
+
+def _update(name):
+    return VacancyUpdate(name=name, short_description="Backend")
+
+
+def test_misses_are_read_from_the_primary():
+    assert _vacancy_query(1, primary=True).get_execution_options()[READ_PRIMARY_OPTION]
+    assert READ_PRIMARY_OPTION not in _vacancy_query(1).get_execution_options()
+
+
+def test_read_through(db, cache, vacancy_id):
+    service = VacancyService(db, cache=cache)
+    assert service.get_vacancy(vacancy_id).name == "Python developer"
+    cached = service.get_vacancy(vacancy_id)
+    assert cached.name == "Python developer"
+    assert cached not in db
+    assert service.get_vacancy_version(vacancy_id).version == 1
+
+
+def test_write_invalidates(db, cache, vacancy_id):
+    service = VacancyService(db, cache=cache)
+    service.get_vacancy(vacancy_id)
+    service.update_vacancy(vacancy_id, _update("Go developer"))
+    assert service.get_vacancy(vacancy_id).name == "Go developer"
+    assert service.get_vacancy_version(vacancy_id).version == 2
+
+
+def test_read_overlapping_a_write_cannot_cache_the_old_row(db, cache, vacancy_id):
+    # A reader misses and loads the row, then the write commits before the
+    # reader fills the cache
+    with SessionLocal() as reader_db:
+        reader = VacancyService(reader_db, cache=cache)
+        stale = reader._load_vacancy(vacancy_id, primary=True)
+        VacancyService(db, cache=cache).update_vacancy(vacancy_id, _update("Go developer"))
+        assert not cache.add(_cache_key(vacancy_id), _vacancy_to_cache(stale))
+    with SessionLocal() as later_db:
+        later = VacancyService(later_db, cache=cache)
+        assert later.get_vacancy(vacancy_id).name == "Go developer"
+        assert later.get_vacancy_version(vacancy_id).version == 2
+
+
+@pytest.mark.anyio
+async def test_async_write_invalidates(tables, cache):
+    async with AsyncSessionLocal() as db:
+        service = AsyncVacancyService(db, cache=cache)
+        vacancy = await service.create_vacancy(VacancyCreate(name="Python developer", short_description="Backend"))
+        assert (await service.get_vacancy(vacancy.id)).name == "Python developer"
+        # A new vacancy is cached right away
+        assert (await service.get_vacancy(vacancy.id)).name == "Python developer"
+        assert cache.stats.snapshot()["hits"] == 1
+        await service.update_vacancy(vacancy.id, _update("Go developer"))
+        assert (await service.get_vacancy(vacancy.id)).name == "Go developer"
+        assert (await service.get_vacancy_version(vacancy.id)).version == 2
+
+
+@pytest.mark.parametrize("workers, kept", [(1, True), (4, False)])
+def test_memory_cache_only_with_one_worker(monkeypatch, cache, workers, kept):
+    monkeypatch.setattr(factory.settings, "WEB_CONCURRENCY", workers)
+    assert (factory._invalidated_everywhere(cache) is cache) == kept
+    shared = MemoryCache(max_size=100, ttl=60)
+    shared.shared = True
+    assert factory._invalidated_everywhere(shared) is shared
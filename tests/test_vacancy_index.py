@@ -0,0 +1,114 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.db.models import ArchivedVacancy, Vacancy, VacancyStatus
+from app.services.pagination import InvalidCursorError, encode_cursor, next_cursor
+from app.services.vacancy_index import VacancyIndex, analyze
+
+
+def _vacancy(vacancy_id, name, short_description="", status=VacancyStatus.OPENED, salary=None, version=1):
+    return SimpleNamespace(
+        id=vacancy_id,
+        name=name,
+        salary=salary,
+        short_description=short_description,
+        full_description=None,
+        created=datetime(2025, 1, 1),
+        updated=None,
+        status=status,
+        version=version,
+    )
+
+
+@pytest.fixture
+def index():
+    index = VacancyIndex()
+    index.add(_vacancy(1, "Senior Python developer", "Django and PostgreSQL", salary=300))
+    index.add(_vacancy(2, "Python teacher", "Teaching developers", salary=100))
+    index.add(_vacancy(3, "Go developer", "Python is a plus"))
+    index.add(_vacancy(4, "Python developer", "Closed position", status=VacancyStatus.DELETED))
+    return index
+
+
+def _ids(results):
+    return [doc.id for doc in results]
+
+
+def test_analyze_stems_and_lowercases():
+    assert analyze("Developers, Разработчика!") == ["develop", "разработчик"]
+    assert analyze(None) == []
+
+
+def test_every_word_must_match(index):
+    assert set(_ids(index.search("python developer"))) == {1, 2, 3}
+    assert _ids(index.search("python django")) == [1]
+    assert index.search("rust") == []
+
+
+def test_name_matches_rank_first(index):
+    ranks = {doc.id: doc.search_rank for doc in index.search("python developer")}
+    # Both words in the name beat one of them in the description
+    assert ranks[1] > ranks[3]
+    results = index.search("python developer")
+    assert [doc.search_rank for doc in results] == sorted(ranks.values(), reverse=True)
+
+
+def test_phrases(index):
+    assert _ids(index.search('"python developer"')) == [1]
+    # Phrases never span two fields
+    assert index.search('"developer django"') == []
+
+
+def test_filters(index):
+    assert _ids(index.search("python", min_salary=200)) == [1]
+    assert _ids(index.search("python", max_salary=200)) == [2]
+    assert _ids(index.search("python", status=VacancyStatus.DELETED)) == [4]
+
+
+def test_replacing_and_removing(index):
+    index.add(_vacancy(2, "Rust teacher", version=2))
+    assert 2 not in _ids(index.search("python"))
+    assert _ids(index.search("rust")) == [2]
+
+    # An older version does not replace a newer one
+    index.add(_vacancy(2, "Python teacher", version=1))
+    assert _ids(index.search("rust")) == [2]
+
+    index.remove(2)
+    assert index.search("rust") == []
+    assert len(index) == 3
+
+
+def test_cursor_pages(index):
+    first = index.search("python", limit=2)
+    second = index.search("python", limit=2, cursor=next_cursor(first, 2))
+    assert len(first) == 2
+    assert set(_ids(first + second)) == {1, 2, 3}
+    with pytest.raises(InvalidCursorError):
+        index.search("python", cursor=encode_cursor(datetime(2025, 1, 1), 1))
+
+
+def test_build_and_refresh(db):
+    db.add_all([
+        Vacancy(name="Python developer", short_description="s", status=VacancyStatus.OPENED),
+        Vacancy(name="Java developer", short_description="s", status=VacancyStatus.OPENED),
+    ])
+    db.commit()
+    index = VacancyIndex()
+    assert index.refresh(db) == 2
+    assert index.ready
+    assert _ids(index.search("java")) == [2]
+
+    db.execute(text("UPDATE vacancies SET name = 'Kotlin developer', version = version + 1 WHERE id = 2"))
+    db.add(Vacancy(name="Java architect", short_description="s", status=VacancyStatus.OPENED))
+    db.execute(text("DELETE FROM vacancies WHERE id = 1"))
+    db.add(ArchivedVacancy(id=1, name="Python developer", short_description="s", status=VacancyStatus.CLOSED))
+    db.commit()
+
+    index.refresh(db)
+    assert _ids(index.search("java")) == [3]
+    assert _ids(index.search("kotlin")) == [2]
+    assert index.search("python") == []